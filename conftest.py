@@ -0,0 +1,10 @@
+import pytest
+
+
+@pytest.fixture(autouse=True, scope='session')
+def test_environment():
+    """Те же настройки, что core.testing.TestRunner даёт manage.py test."""
+    from core.testing import test_environment
+
+    with test_environment():
+        yield
@@ -0,0 +1,72 @@
+"""Сериализация постов и комментариев из .values() без моделей.
+
+Связанные объекты отдаются по имени (author — username, group — slug)
+и подгружаются одним запросом на страницу, а не JOIN: в режиме
+шардирования пользователи и группы лежат в другой БД.
+"""
+from django.core.files.storage import default_storage
+
+from posts.models import Group, User
+
+POST_COLUMNS = {
+    'id': 'id',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'author': 'author_id',
+    'group': 'group_id',
+    'image': 'image',
+}
+COMMENT_COLUMNS = {
+    'id': 'id',
+    'post': 'post_id',
+    'text': 'text',
+    'created': 'created',
+    'author': 'author_id',
+}
+
+
+def parse_fields(value, columns):
+    """Поля из параметра fields=; неизвестное поле — ValueError."""
+    if not value:
+        return tuple(columns)
+    fields = tuple(field for field in value.split(',') if field)
+    unknown = set(fields) - set(columns)
+    if unknown:
+        raise ValueError(', '.join(sorted(unknown)))
+    return fields
+
+
+def values(queryset, columns, fields, order_field):
+    needed = {'id', order_field} | {columns[field] for field in fields}
+    return queryset.values(*needed)
+
+
+def names(model, field, ids):
+    ids = set(ids) - {None}
+    if not ids:
+        return {}
+    return dict(
+        model.objects.filter(id__in=ids).values_list('id', field)
+    )
+
+
+def serialize(rows, columns, fields):
+    usernames = {}
+    if 'author' in fields:
+        usernames = names(User, 'username', (r['author_id'] for r in rows))
+    slugs = {}
+    if 'group' in fields:
+        slugs = names(Group, 'slug', (r['group_id'] for r in rows))
+    related = {'author': usernames, 'group': slugs}
+    result = []
+    for row in rows:
+        item = {}
+        for field in fields:
+            value = row[columns[field]]
+            if field in related:
+                value = related[field].get(value)
+            elif field == 'image':
+                value = default_storage.url(value) if value else None
+            item[field] = value
+        result.append(item)
+    return result
@@ -0,0 +1,126 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.testing import run_on_commit
+from posts import polling
+from posts.models import Comment, Group, Post, User
+
+
+@override_settings(POSTS_PER_PAGE=2)
+class ApiViewsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='TestUserAuthor')
+        cls.group = Group.objects.create(
+            title='TestGroup',
+            slug='test_slug',
+            description='TestDescription'
+        )
+        cls.posts = [
+            Post.objects.create(
+                author=cls.author, text=f'TestText{number}', group=cls.group
+            )
+            for number in range(3)
+        ]
+        Comment.objects.create(
+            post=cls.posts[0], author=cls.author, text='TestComment'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_feed_is_paginated_by_cursor(self):
+        """Лента отдаётся страницами по курсору, от новых к старым."""
+        url = reverse('api:group_posts', kwargs={'slug': self.group.slug})
+        with self.assertNumQueries(4):
+            first = self.client.get(url).json()
+        self.assertEqual(
+            [post['id'] for post in first['results']],
+            [self.posts[2].id, self.posts[1].id]
+        )
+        self.assertEqual(first['results'][0]['author'], 'TestUserAuthor')
+        self.assertEqual(first['results'][0]['group'], 'test_slug')
+        second = self.client.get(url, {'cursor': first['next']}).json()
+        self.assertEqual(
+            [post['id'] for post in second['results']], [self.posts[0].id]
+        )
+        self.assertIsNone(second['next'])
+
+    def test_sparse_fieldsets(self):
+        """fields= ограничивает поля, неизвестное поле — 400."""
+        url = reverse('api:post_detail', kwargs={'post_id': self.posts[0].id})
+        response = self.client.get(url, {'fields': 'id,text'})
+        self.assertEqual(
+            response.json(), {'id': self.posts[0].id, 'text': 'TestText0'}
+        )
+        response = self.client.get(url, {'fields': 'id,password'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_comments_and_etag(self):
+        """Комментарии отдаются с ETag, повтор без изменений — 304."""
+        url = reverse(
+            'api:post_comments', kwargs={'post_id': self.posts[0].id}
+        )
+        response = self.client.get(url)
+        self.assertEqual(response.json()['results'][0]['text'], 'TestComment')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_follow_feed_requires_login(self):
+        """Лента подписок гостю — 401."""
+        response = self.client.get(reverse('api:follow_posts'))
+        self.assertEqual(response.status_code, 401)
+
+
+class PollTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='TestUserAuthor')
+        cls.post = Post.objects.create(author=cls.author, text='TestText')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.url = reverse('api:poll')
+
+    def test_no_new_posts_without_post_queries(self):
+        """Без новых постов ответ берётся из отметки в кэше."""
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, {'since': self.post.id})
+        self.assertEqual(response.json()['count'], 0)
+
+    def test_new_posts_are_counted(self):
+        """Новые посты после since возвращаются числом и id."""
+        self.client.get(self.url)
+        new_post = Post.objects.create(author=self.author, text='TestNew')
+        run_on_commit()
+        response = self.client.get(self.url, {'since': self.post.id})
+        self.assertEqual(response.json(), {
+            'count': 1, 'ids': [new_post.id], 'latest': new_post.id
+        })
+
+    def test_rolled_back_post_keeps_mark(self):
+        """Откаченный пост не поднимает отметку."""
+        self.client.get(self.url)
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            Post.objects.create(author=self.author, text='TestRolledBack')
+            raise RuntimeError
+        run_on_commit()
+        response = self.client.get(self.url, {'since': self.post.id})
+        self.assertEqual(response.json()['latest'], self.post.id)
+
+    def test_mark_is_never_lowered(self):
+        """Отметка только растёт, даже если меньший id пришёл позже."""
+        self.client.get(self.url)
+        polling.raise_marks(['feed'], self.post.id + 2)
+        polling.raise_marks(['feed'], self.post.id + 1)
+        self.assertEqual(
+            polling.get_store().get(polling.mark_key('feed')),
+            self.post.id + 2
+        )
@@ -0,0 +1,128 @@
+from django.conf import settings
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import require_GET
+
+from api.serializers import (
+    COMMENT_COLUMNS, POST_COLUMNS, parse_fields, serialize, values
+)
+from posts.models import Comment, Follow, Group, Post, User
+from posts.pagination import cursor_page, decode_cursor
+from posts.polling import Feed
+from posts.versions import conditional
+
+
+def error(message, status):
+    return JsonResponse({'detail': message}, status=status)
+
+
+def json_page(request, queryset, columns, order_field, descending=True):
+    try:
+        fields = parse_fields(request.GET.get('fields'), columns)
+    except ValueError as unknown:
+        return error(f'Неизвестные поля: {unknown}', 400)
+    after = None
+    if request.GET.get('cursor'):
+        after = decode_cursor(request.GET['cursor'])
+        if after is None:
+            return error('Неверный курсор', 400)
+    rows, next_cursor = cursor_page(
+        values(queryset, columns, fields, order_field),
+        order_field,
+        after,
+        descending=descending,
+        merge_shards=True
+    )
+    return JsonResponse({
+        'results': serialize(rows, columns, fields),
+        'next': next_cursor,
+    })
+
+
+def post_page(request, queryset):
+    return json_page(request, queryset, POST_COLUMNS, 'pub_date')
+
+
+@require_GET
+@conditional(lambda request: ['feed'])
+def index(request):
+    return post_page(request, Post.objects.all())
+
+
+@require_GET
+@conditional(lambda request, slug: [f'group:{slug}'])
+def group_posts(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    return post_page(request, Post.objects.filter(group_id=group.id))
+
+
+@require_GET
+@conditional(lambda request, username: [f'author:{username}'])
+def profile_posts(request, username):
+    author = get_object_or_404(User, username=username)
+    return post_page(request, Post.objects.filter(author_id=author.id))
+
+
+@require_GET
+@conditional(lambda request: ['feed', f'follows:{request.user.pk}'])
+def follow_posts(request):
+    if not request.user.is_authenticated:
+        return error('Требуется авторизация', 401)
+    authors = Follow.objects.filter(
+        user=request.user
+    ).values_list('author', flat=True)
+    return post_page(request, Post.objects.filter(author__in=list(authors)))
+
+
+def post_rows(post_id, fields):
+    queryset = Post.objects.filter(id=post_id)
+    rows, _ = cursor_page(
+        values(queryset, POST_COLUMNS, fields, 'pub_date'),
+        'pub_date',
+        limit=1,
+        merge_shards=True
+    )
+    if not rows:
+        raise Http404
+    return rows
+
+
+@require_GET
+@conditional(lambda request, post_id: [f'post:{post_id}'])
+def post_detail(request, post_id):
+    try:
+        fields = parse_fields(request.GET.get('fields'), POST_COLUMNS)
+    except ValueError as unknown:
+        return error(f'Неизвестные поля: {unknown}', 400)
+    rows = post_rows(post_id, fields)
+    return JsonResponse(serialize(rows, POST_COLUMNS, fields)[0])
+
+
+@require_GET
+@conditional(lambda request, post_id: [f'post:{post_id}'])
+def post_comments(request, post_id):
+    post_rows(post_id, ('id',))
+    return json_page(
+        request,
+        Comment.objects.filter(post_id=post_id),
+        COMMENT_COLUMNS,
+        'created',
+        descending=False
+    )
+
+
+@require_GET
+def poll(request):
+    """Сколько постов появилось в ленте feed после поста since.
+
+    С wait= запрос ждёт новых постов до POLL_MAX_WAIT секунд.
+    """
+    try:
+        since = int(request.GET.get('since', 0))
+        wait = min(float(request.GET.get('wait', 0)), settings.POLL_MAX_WAIT)
+    except ValueError:
+        return error('since и wait должны быть числами', 400)
+    feed = Feed.for_name(request.GET.get('feed', 'index'), request.user)
+    if feed is None:
+        return error('Лента не найдена', 404)
+    return JsonResponse(feed.poll(since, max(wait, 0)))
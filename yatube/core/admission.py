@@ -0,0 +1,69 @@
+"""Ограничение одновременных запросов по группам URL.
+
+Группы описаны в ADMISSION_GROUPS: имена URL, число запросов, которые
+обрабатываются одновременно, и сколько секунд запрос может ждать
+свободного места. Счётчики общие для потоков процесса.
+"""
+from collections import Counter
+from threading import BoundedSemaphore, Lock
+
+from django.conf import settings
+
+_semaphores = {}
+_counters = Counter()
+_lock = Lock()
+
+
+def group_for(view_name):
+    for name, group in settings.ADMISSION_GROUPS.items():
+        if view_name in group['views']:
+            return name
+    return None
+
+
+def get_semaphore(name):
+    with _lock:
+        if name not in _semaphores:
+            _semaphores[name] = BoundedSemaphore(
+                settings.ADMISSION_GROUPS[name]['limit']
+            )
+        return _semaphores[name]
+
+
+def acquire(name):
+    """Ждёт место в группе не дольше её queue_timeout."""
+    admitted = get_semaphore(name).acquire(
+        timeout=settings.ADMISSION_GROUPS[name]['queue_timeout']
+    )
+    with _lock:
+        _counters[name, 'admitted' if admitted else 'shed'] += 1
+        if admitted:
+            _counters[name, 'in_flight'] += 1
+    return admitted
+
+
+def release(name):
+    with _lock:
+        _counters[name, 'in_flight'] -= 1
+    get_semaphore(name).release()
+
+
+def stats():
+    with _lock:
+        return [
+            {
+                'group': name,
+                'limit': group['limit'],
+                'queue_timeout': group['queue_timeout'],
+                'in_flight': _counters[name, 'in_flight'],
+                'admitted': _counters[name, 'admitted'],
+                'shed': _counters[name, 'shed'],
+            }
+            for name, group in settings.ADMISSION_GROUPS.items()
+        ]
+
+
+def reset():
+    with _lock:
+        _semaphores.clear()
+        _counters.clear()
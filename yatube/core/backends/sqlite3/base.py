@@ -0,0 +1,12 @@
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """SQLite, который открывает транзакции через BEGIN IMMEDIATE.
+
+    Блокировка на запись берётся сразу, поэтому транзакция не падает
+    с "database is locked" при повышении блокировки и ждёт busy_timeout.
+    """
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute('BEGIN IMMEDIATE')
@@ -0,0 +1,331 @@
+"""Двухуровневый кэш: LRU в памяти процесса (L1) перед общим кэшем (L2).
+
+L2 — любой алиас из CACHES, общий для всех процессов. Любая запись
+сразу видна в своём процессе и в L2. set(), incr() и delete() ещё и
+дописывают ключ в журнал в L2: номер последней записи журнала лежит
+под JOURNAL_KEY и растёт через incr(). Раз в GENERATION_CHECK_INTERVAL
+секунд каждый процесс одним get_many() читает поколение и номер
+журнала и, если номер вырос, убирает из своего L1 только
+перечисленные в журнале ключи. Так чужая запись видна не позже чем
+через GENERATION_CHECK_INTERVAL секунд, а остальной L1 не страдает.
+
+Копия в L1 в любом случае живёт не дольше L1_TIMEOUT и не переживает
+запись в L2: рядом с каждым значением в L2 лежит момент его
+истечения. Поэтому пропавшие записи журнала (процесс давно не
+проверял журнал или писатель упал между incr() и записью ключа)
+можно пропустить, когда с их появления прошло L1_TIMEOUT секунд.
+
+clear() очищает L2 вместе с ключом поколения; каждый процесс,
+заметив новое поколение, сбрасывает весь L1.
+
+LockedFileBasedCache — файловый кэш для L2 с атомарными для всех
+процессов add(), incr() и set_max().
+"""
+import math
+import os
+import pickle
+import time
+import uuid
+import zlib
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from threading import Lock
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.files import locks
+
+GENERATION_KEY = 'two_tier:generation'
+JOURNAL_KEY = 'two_tier:journal'
+
+# Как и в LocMemCache, L1 общий для всех потоков процесса.
+_stores = {}
+_generations = {}
+_stats = {}
+_locks = {}
+
+_missing = object()
+
+
+def expires_key(key):
+    return f'{key}:expires'
+
+
+def journal_key(number):
+    return f'{JOURNAL_KEY}:{number}'
+
+
+def set_max(store, key, value, timeout=DEFAULT_TIMEOUT):
+    """Поднимает значение key до value, но не опускает его; возвращает
+    итоговое значение. Атомарно, если у store есть set_max(), иначе
+    только в пределах одного процесса."""
+    if hasattr(store, 'set_max'):
+        return store.set_max(key, value, timeout)
+    current = store.get(key)
+    if current is not None and current >= value:
+        return current
+    store.set(key, value, timeout)
+    return value
+
+
+class TwoTierCache(BaseCache):
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._shared_alias = location
+        self._l1_max_entries = int(options.get('L1_MAX_ENTRIES', 1000))
+        self._l1_timeout = float(options.get('L1_TIMEOUT', 5))
+        self._check_interval = float(
+            options.get('GENERATION_CHECK_INTERVAL', 1)
+        )
+        # Сколько записей журнала процесс дочитывает за раз; процесс,
+        # отставший сильнее, сбрасывает весь L1.
+        self._journal_max = int(options.get('JOURNAL_MAX_ENTRIES', 1000))
+        self._journal_timeout = float(options.get('JOURNAL_TIMEOUT', 60))
+        name = options.get('L1_NAME', location)
+        self._l1 = _stores.setdefault(name, OrderedDict())
+        self._generation = _generations.setdefault(name, {
+            'value': None, 'checked': 0, 'journal': 0, 'gap': None,
+            'own': set(),
+        })
+        self._stats = _stats.setdefault(name, Counter())
+        self._lock = _locks.setdefault(name, Lock())
+
+    @property
+    def shared(self):
+        return caches[self._shared_alias]
+
+    def _check_generation(self):
+        now = time.monotonic()
+        state = self._generation
+        if now - state['checked'] < self._check_interval:
+            return
+        entries = self.shared.get_many([GENERATION_KEY, JOURNAL_KEY])
+        generation = entries.get(GENERATION_KEY)
+        if generation is None:
+            self.shared.add(GENERATION_KEY, uuid.uuid4().hex, None)
+            generation = self.shared.get(GENERATION_KEY)
+        number = entries.get(JOURNAL_KEY, 0)
+        with self._lock:
+            idle = now - state['checked'] >= self._l1_timeout
+            if generation != state['value'] or idle:
+                # После простоя дольше L1_TIMEOUT в L1 нет живых копий.
+                self._l1.clear()
+                state['own'].clear()
+                state.update(value=generation, journal=number, gap=None)
+            state['checked'] = now
+            last = state['journal']
+        if number != last:
+            self._replay_journal(last, number, now)
+
+    def _replay_journal(self, last, number, now):
+        """Убирает из L1 ключи из записей журнала last+1..number."""
+        state = self._generation
+        if not last < number <= last + self._journal_max:
+            with self._lock:
+                self._l1.clear()
+                state['own'].clear()
+                state.update(journal=number, gap=None)
+            return
+        entries = self.shared.get_many(
+            [journal_key(n) for n in range(last + 1, number + 1)]
+        )
+        reached = last
+        while reached < number and journal_key(reached + 1) in entries:
+            reached += 1
+        with self._lock:
+            for n in range(last + 1, number + 1):
+                # Свои записи в L1 уже свежие.
+                if n in state['own']:
+                    state['own'].discard(n)
+                elif self._l1.pop(entries.get(journal_key(n)), None):
+                    self._stats['invalidations'] += 1
+            if reached < number:
+                # Запись журнала ещё не дописана или пропала: ждём её,
+                # пока могут жить копии, сделанные до неё.
+                gap_at, since = state['gap'] or (None, now)
+                if gap_at != reached:
+                    since = now
+                if now - since < self._l1_timeout:
+                    state.update(journal=reached, gap=(reached, since))
+                    return
+            state.update(journal=number, gap=None)
+
+    def _publish(self, l1_key):
+        """Дописывает ключ в журнал, чтобы его сбросили остальные L1."""
+        try:
+            number = self.shared.incr(JOURNAL_KEY)
+        except ValueError:
+            self.shared.add(JOURNAL_KEY, 0, None)
+            number = self.shared.incr(JOURNAL_KEY)
+        self.shared.set(journal_key(number), l1_key, self._journal_timeout)
+        with self._lock:
+            self._generation['own'].add(number)
+
+    def _resolve_timeout(self, timeout):
+        """Секунды для L2 и момент истечения по часам time.time()."""
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        if timeout is None:
+            return None, math.inf
+        return timeout, time.time() + timeout
+
+    def _l1_get(self, key):
+        with self._lock:
+            pickled, expires = self._l1.get(key, (None, 0))
+            if expires <= time.monotonic():
+                self._l1.pop(key, None)
+                return _missing
+            self._l1.move_to_end(key)
+        return pickle.loads(pickled)
+
+    def _l1_set(self, key, value, expires):
+        """Кладёт value в L1 до L1_TIMEOUT, но не дольше, чем до
+        истечения записи в L2 (expires по time.time())."""
+        l1_timeout = min(self._l1_timeout, expires - time.time())
+        if l1_timeout <= 0:
+            self._l1_delete(key)
+            return
+        pickled = pickle.dumps(value, self.pickle_protocol)
+        with self._lock:
+            self._l1[key] = (pickled, time.monotonic() + l1_timeout)
+            self._l1.move_to_end(key)
+            while len(self._l1) > self._l1_max_entries:
+                self._l1.popitem(last=False)
+
+    def _l1_delete(self, key):
+        with self._lock:
+            self._l1.pop(key, None)
+
+    def get(self, key, default=None, version=None):
+        self._check_generation()
+        l1_key = self.make_key(key, version=version)
+        value = self._l1_get(l1_key)
+        if value is not _missing:
+            self._stats['l1_hits'] += 1
+            return value
+        entries = self.shared.get_many(
+            [key, expires_key(key)], version=version
+        )
+        if key not in entries:
+            self._stats['misses'] += 1
+            return default
+        self._stats['l2_hits'] += 1
+        value = entries[key]
+        # Без известного срока в L2 значение в L1 не кладётся.
+        self._l1_set(l1_key, value, entries.get(expires_key(key), 0))
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self._check_generation()
+        timeout, expires = self._resolve_timeout(timeout)
+        self.shared.set_many(
+            {key: value, expires_key(key): expires}, timeout, version=version
+        )
+        l1_key = self.make_key(key, version=version)
+        self._l1_set(l1_key, value, expires)
+        self._publish(l1_key)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self._check_generation()
+        timeout, expires = self._resolve_timeout(timeout)
+        added = self.shared.add(key, value, timeout, version=version)
+        if added:
+            self.shared.set(expires_key(key), expires, timeout, version)
+            self._l1_set(self.make_key(key, version=version), value, expires)
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        self._l1_delete(self.make_key(key, version=version))
+        timeout, expires = self._resolve_timeout(timeout)
+        touched = self.shared.touch(key, timeout, version=version)
+        if touched:
+            self.shared.set(expires_key(key), expires, timeout, version)
+        return touched
+
+    def incr(self, key, delta=1, version=None):
+        """Атомарно, если атомарен incr общего кэша. Срок для L1 берётся
+        из последнего set()."""
+        self._check_generation()
+        l1_key = self.make_key(key, version=version)
+        self._l1_delete(l1_key)
+        value = self.shared.incr(key, delta, version=version)
+        self._publish(l1_key)
+        return value
+
+    def delete(self, key, version=None):
+        self._check_generation()
+        l1_key = self.make_key(key, version=version)
+        self._l1_delete(l1_key)
+        self.shared.delete_many([key, expires_key(key)], version=version)
+        self._publish(l1_key)
+
+    def clear(self):
+        with self._lock:
+            self._l1.clear()
+        self.shared.clear()
+
+    def stats(self):
+        """Попадания по уровням и доля попаданий для страницы staff."""
+        with self._lock:
+            stats = dict(self._stats, l1_size=len(self._l1))
+        stats.setdefault('invalidations', 0)
+        requests = sum(
+            stats.get(name, 0) for name in ('l1_hits', 'l2_hits', 'misses')
+        )
+        for name in ('l1_hits', 'l2_hits', 'misses'):
+            stats.setdefault(name, 0)
+            stats[f'{name}_rate'] = stats[name] / requests if requests else 0
+        return stats
+
+
+class LockedFileBasedCache(FileBasedCache):
+    """FileBasedCache, в котором add(), incr() и set_max() выполняются
+    под блокировкой файла-замка в каталоге кэша и не теряют чужих
+    записей.
+
+    incr() сохраняет срок жизни записи, а не продлевает его на
+    TIMEOUT, как FileBasedCache.
+    """
+
+    lock_name = 'atomic.lock'
+
+    @contextmanager
+    def _locked(self):
+        self._createdir()
+        with open(os.path.join(self._dir, self.lock_name), 'ab') as lock:
+            locks.lock(lock, locks.LOCK_EX)
+            try:
+                yield
+            finally:
+                locks.unlock(lock)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        with self._locked():
+            return super().add(key, value, timeout, version)
+
+    def incr(self, key, delta=1, version=None):
+        with self._locked():
+            try:
+                with open(self._key_to_file(key, version), 'rb') as f:
+                    expiry = pickle.load(f)
+                    value = pickle.loads(zlib.decompress(f.read()))
+            except (FileNotFoundError, EOFError):
+                expiry, value = 0, None
+            if value is None or (expiry is not None and expiry < time.time()):
+                raise ValueError(f"Key '{key}' not found")
+            value += delta
+            timeout = None if expiry is None else expiry - time.time()
+            self.set(key, value, timeout, version)
+            return value
+
+    def set_max(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        with self._locked():
+            current = self.get(key, version=version)
+            if current is not None and current >= value:
+                return current
+            self.set(key, value, timeout, version)
+            return value
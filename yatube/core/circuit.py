@@ -0,0 +1,151 @@
+"""Автомат защиты для представлений, читающих БД.
+
+После BREAKER_FAILURE_THRESHOLD ошибок БД или ответов дольше
+BREAKER_SLOW_SECONDS подряд автомат размыкается: представления не
+вызываются, а пользователь получает последнюю удачную отрисовку
+страницы с заголовком STALE_HEADER или 503. Через BREAKER_RESET_TIMEOUT
+секунд один запрос проверяет БД, и при успехе автомат замыкается.
+
+Удачная отрисовка хранится одна на адрес и только для гостей: страницы
+пользователей в общий кэш не попадают, а при ошибке им тоже отдаётся
+гостевая копия. Копия перезаписывается, только когда страница
+изменилась, а не при каждом просмотре. Старая копия уходит без
+валидаторов и с запретом кэширования, чтобы её не запомнили ни кэши
+страниц, ни клиент после восстановления БД.
+"""
+import hashlib
+import time
+from functools import wraps
+from threading import Lock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.utils.cache import add_never_cache_headers
+
+from core.views import service_unavailable
+
+STALE_HEADER = 'X-Stale-If-Error'
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+
+class CircuitBreaker:
+    def __init__(self, name):
+        self.name = name
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0
+        self._lock = Lock()
+
+    def allow_request(self):
+        """Можно ли вызвать представление; в полуоткрытом — только пробе."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and (
+                time.monotonic() - self.opened_at
+                >= settings.BREAKER_RESET_TIMEOUT
+            ):
+                self.state = HALF_OPEN
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if (
+                self.state == HALF_OPEN
+                or self.failures >= settings.BREAKER_FAILURE_THRESHOLD
+            ):
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+    def release_probe(self):
+        """Проба упала не из-за БД: следующий запрос проверит БД снова."""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self.state = OPEN
+                self.opened_at = (
+                    time.monotonic() - settings.BREAKER_RESET_TIMEOUT
+                )
+
+
+database_breaker = CircuitBreaker('database')
+
+
+def last_good_key(request):
+    digest = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'core:last_good:{digest}'
+
+
+def fingerprint(response):
+    return response.get('ETag') or hashlib.md5(response.content).hexdigest()
+
+
+def remember(request, response):
+    """Сохраняет гостевую страницу, если она изменилась с прошлой копии."""
+    if (
+        request.user.is_authenticated
+        or response.status_code != 200
+        or response.streaming
+    ):
+        return
+    key = last_good_key(request)
+    tag = fingerprint(response)
+    if cache.get(f'{key}:tag') == tag:
+        return
+    cache.set_many(
+        {key: response, f'{key}:tag': tag}, settings.BREAKER_STALE_TIMEOUT
+    )
+
+
+def serve_stale(request):
+    response = cache.get(last_good_key(request))
+    if response is None:
+        return service_unavailable(request, settings.BREAKER_RESET_TIMEOUT)
+    response[STALE_HEADER] = database_breaker.state
+    strip_validators(response)
+    add_never_cache_headers(response)
+    return response
+
+
+def strip_validators(response):
+    for header in ('ETag', 'Last-Modified'):
+        if response.has_header(header):
+            del response[header]
+
+
+def stale_if_error(view_func):
+    """Отдаёт последнюю удачную отрисовку, пока БД недоступна."""
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return view_func(request, *args, **kwargs)
+        if not database_breaker.allow_request():
+            return serve_stale(request)
+        started = time.monotonic()
+        try:
+            response = view_func(request, *args, **kwargs)
+            if hasattr(response, 'render'):
+                response.render()
+        except DatabaseError:
+            database_breaker.record_failure()
+            return serve_stale(request)
+        except Exception:
+            database_breaker.release_probe()
+            raise
+        if time.monotonic() - started > settings.BREAKER_SLOW_SECONDS:
+            database_breaker.record_failure()
+        else:
+            database_breaker.record_success()
+        remember(request, response)
+        return response
+    return wrapper
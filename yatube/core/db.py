@@ -0,0 +1,112 @@
+import random
+import sqlite3
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.db import (
+    DEFAULT_DB_ALIAS, OperationalError, connections, models, router,
+    transaction
+)
+
+LOCKED_ERRORS = (OperationalError, sqlite3.OperationalError)
+
+
+def apply_pragmas(cursor, pragmas):
+    for name, value in pragmas.items():
+        cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """Выставляет SQLITE_PRAGMAS каждому новому соединению с SQLite."""
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            apply_pragmas(cursor, settings.SQLITE_PRAGMAS)
+
+
+def is_locked_error(error):
+    message = str(error)
+    return 'locked' in message or 'busy' in message
+
+
+def retry_on_locked(func, retries=None, backoff=None, max_wait=None):
+    """Вызывает func, повторяя его с растущей паузой при блокировке БД.
+
+    Паузы в сумме не дольше max_wait секунд: повтор идёт в потоке
+    запроса, и лучше вернуть ошибку, чем держать его дольше.
+    """
+    if retries is None:
+        retries = settings.SQLITE_WRITE_RETRIES
+    if backoff is None:
+        backoff = settings.SQLITE_RETRY_BACKOFF
+    if max_wait is None:
+        max_wait = settings.SQLITE_RETRY_MAX_WAIT
+    waited = 0
+    for attempt in range(retries + 1):
+        try:
+            return func()
+        except LOCKED_ERRORS as error:
+            remaining = max_wait - waited
+            if attempt == retries or remaining <= 0 or not is_locked_error(
+                error
+            ):
+                raise
+            delay = min(
+                backoff * 2 ** attempt * random.uniform(1, 2), remaining
+            )
+            time.sleep(delay)
+            waited += delay
+
+
+def save_files(instance):
+    """Сохраняет в хранилище ещё не записанные файлы полей instance.
+
+    Вызывается до write_transaction: иначе FileField.pre_save пишет
+    файл внутри повторяемого блока, а повтор должен касаться только БД.
+    """
+    for field in instance._meta.concrete_fields:
+        if isinstance(field, models.FileField):
+            file = getattr(instance, field.attname)
+            if file and not file._committed:
+                file.save(file.name, file.file, save=False)
+
+
+def write_alias(instance):
+    """БД, в которую роутеры направят запись instance."""
+    return router.db_for_write(type(instance), instance=instance)
+
+
+def in_transaction(using):
+    return connections[using].in_atomic_block
+
+
+def write_transaction(func, using=DEFAULT_DB_ALIAS):
+    """Выполняет func в транзакции БД using и повторяет её, если БД
+    заблокирована.
+
+    Повторяется весь func, поэтому он должен только писать в БД: файлы
+    сохраняются заранее через save_files. Внутри уже открытой
+    транзакции повтор невозможен, и func просто вызывается в ней.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if in_transaction(using):
+            return func(*args, **kwargs)
+
+        def run():
+            with transaction.atomic(using=using):
+                return func(*args, **kwargs)
+
+        return retry_on_locked(run)
+    return wrapper
+
+
+def backup_sqlite(source_path, target_path):
+    """Копирует базу SQLite через online backup API."""
+    source = sqlite3.connect(source_path)
+    target = sqlite3.connect(target_path)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
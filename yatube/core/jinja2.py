@@ -0,0 +1,68 @@
+"""Окружение Jinja2 для горячих шаблонов лент и поста.
+
+Шаблоны лежат в jinja2/ под теми же именами, что и в templates/, и
+включаются настройкой JINJA2_TEMPLATES. Глобальные функции и фильтры
+повторяют теги и фильтры Django, которые используют эти шаблоны.
+"""
+import logging
+
+from django.conf import settings
+from django.template import engines
+from django.template.backends.jinja2 import Jinja2
+from django.template import defaultfilters
+from django.template.defaultfilters import truncatechars
+from django.templatetags.static import static
+from django.urls import reverse
+from django.utils.timezone import template_localtime
+from jinja2 import Environment
+from sorl.thumbnail import get_thumbnail
+
+from core.templatetags.user_filters import addclass
+
+logger = logging.getLogger(__name__)
+
+
+def url(name, *args, **kwargs):
+    return reverse(name, args=args or None, kwargs=kwargs or None)
+
+
+def date(value, arg=None):
+    """Фильтр date, который, как и в шаблонах Django, сначала переводит
+    время в текущий часовой пояс."""
+    return defaultfilters.date(template_localtime(value), arg)
+
+
+def thumbnail(file, geometry, **options):
+    """Миниатюра или None, как {% thumbnail %} без THUMBNAIL_DEBUG."""
+    if not file:
+        return None
+    try:
+        return get_thumbnail(file, geometry, **options)
+    except Exception:
+        logger.exception('Thumbnail failed for %s', file)
+        return None
+
+
+def environment(**options):
+    env = Environment(**options)
+    env.globals.update({
+        'url': url,
+        'static': static,
+        'thumbnail': thumbnail,
+    })
+    env.filters.update({
+        'addclass': addclass,
+        'date': date,
+        'truncatechars': truncatechars,
+    })
+    return env
+
+
+def get_engine():
+    """Движок по JINJA2_ENGINE, даже если он не включён в TEMPLATES."""
+    for engine in engines.all():
+        if isinstance(engine, Jinja2):
+            return engine
+    params = {**settings.JINJA2_ENGINE, 'NAME': 'jinja2'}
+    del params['BACKEND']
+    return Jinja2(params)
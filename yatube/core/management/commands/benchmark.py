@@ -0,0 +1,128 @@
+import statistics
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from core import memory
+
+User = get_user_model()
+MEMORY_SAMPLES = 5
+
+
+def percentile(timings, fraction):
+    ordered = sorted(timings)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def format_kib(size):
+    """Килобайты или прочерк, если размер неизвестен."""
+    return '—' if size is None else f'{size / 1024:.1f}'
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный прогон страниц тестовым клиентом: время ответа, '
+        'число запросов к БД и память tracemalloc.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('urls', nargs='*', default=['/'])
+        parser.add_argument('-n', '--requests', type=int, default=50)
+        parser.add_argument('-c', '--concurrency', type=int, default=1)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--user', help='username для force_login')
+        parser.add_argument(
+            '--no-cache',
+            action='store_true',
+            help='очищать кэш перед каждым запросом'
+        )
+
+    def handle(self, *args, **options):
+        user = None
+        if options['user']:
+            user = User.objects.get(username=options['user'])
+        self.options = options
+        self.user = user
+        header = (
+            f'{"url":<40} {"status":>6} {"mean":>8} {"p50":>8} '
+            f'{"p95":>8} {"p99":>8} {"queries":>8} '
+            f'{"peak KiB":>9} {"net KiB":>9}'
+        )
+        self.stdout.write(header)
+        for url in options['urls']:
+            self.stdout.write(self.format_row(url, **self.measure(url)))
+
+    def make_client(self):
+        client = Client()
+        if self.user is not None:
+            client.force_login(self.user)
+        return client
+
+    def request(self, client, url):
+        if self.options['no_cache']:
+            cache.clear()
+        started = time.perf_counter()
+        response = client.get(url)
+        return response.status_code, time.perf_counter() - started
+
+    def run_worker(self, url, count):
+        client = self.make_client()
+        return [self.request(client, url) for _ in range(count)]
+
+    def run_thread(self, url, count):
+        try:
+            return self.run_worker(url, count)
+        finally:
+            connection.close()
+
+    def measure(self, url):
+        client = self.make_client()
+        for _ in range(self.options['warmup']):
+            self.request(client, url)
+        with CaptureQueriesContext(connection) as queries:
+            status, _ = self.request(client, url)
+        query_count = len(queries)
+        was_tracing = tracemalloc.is_tracing()
+        peaks, nets = [], []
+        for _ in range(MEMORY_SAMPLES):
+            _, net, peak = memory.track(self.request, client, url)
+            nets.append(net)
+            peaks.append(peak)
+        if not was_tracing:
+            tracemalloc.stop()
+        concurrency = max(1, self.options['concurrency'])
+        per_worker = max(1, self.options['requests'] // concurrency)
+        if concurrency == 1:
+            results = self.run_worker(url, per_worker)
+        else:
+            with ThreadPoolExecutor(concurrency) as executor:
+                chunks = executor.map(
+                    self.run_thread, [url] * concurrency,
+                    [per_worker] * concurrency
+                )
+                results = [result for chunk in chunks for result in chunk]
+        timings = [timing for _, timing in results]
+        return {
+            'status': status,
+            'timings': timings,
+            'queries': query_count,
+            'peak': None if None in peaks else max(peaks),
+            'net': statistics.median(nets),
+        }
+
+    @staticmethod
+    def format_row(url, status, timings, queries, peak, net):
+        ms = [timing * 1000 for timing in timings]
+        return (
+            f'{url:<40} {status:>6} {statistics.mean(ms):>8.2f} '
+            f'{percentile(ms, 0.5):>8.2f} {percentile(ms, 0.95):>8.2f} '
+            f'{percentile(ms, 0.99):>8.2f} {queries:>8} '
+            f'{format_kib(peak):>9} {net / 1024:>9.1f}'
+        )
@@ -0,0 +1,36 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from core.db import backup_sqlite
+from core.routers import mark_replica_synced
+
+
+class Command(BaseCommand):
+    help = 'Обновляет SQLite-реплику копией основной БД.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=0,
+            help='повторять каждые N секунд'
+        )
+
+    def handle(self, *args, **options):
+        source = connections[DEFAULT_DB_ALIAS].settings_dict['NAME']
+        target = connections[settings.REPLICA_DATABASE].settings_dict['NAME']
+        while True:
+            started = time.perf_counter()
+            started_at = time.time()
+            backup_sqlite(source, target)
+            mark_replica_synced(started_at)
+            self.stdout.write(
+                f'{target} обновлена за '
+                f'{time.perf_counter() - started:.3f} с'
+            )
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,105 @@
+import re
+import time
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+from django.template import engines
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+
+from core.jinja2 import get_engine
+from posts.forms import CommentForm
+from posts.models import Post
+from posts.pagination import comments_page
+from yatube.settings import POSTS_PER_PAGE
+
+
+def first_page(queryset):
+    page_obj = Paginator(
+        queryset.select_related('author', 'group'), POSTS_PER_PAGE
+    ).get_page(1)
+    page_obj.object_list = list(page_obj.object_list)
+    return page_obj
+
+
+def make_request(path):
+    request = RequestFactory().get(path)
+    request.user = AnonymousUser()
+    request.resolver_match = resolve(path)
+    return request
+
+
+def cases():
+    """(шаблон, путь, контекст) для горячих страниц."""
+    post = Post.objects.select_related('author', 'group').filter(
+        group__isnull=False
+    ).first()
+    if post is None:
+        return []
+    return [
+        ('posts/index.html', reverse('posts:index'), {
+            'page_obj': first_page(Post.objects.all()),
+            'text': 'Последние обновления на сайте',
+        }),
+        ('posts/group_list.html', reverse(
+            'posts:group_list', args=[post.group.slug]
+        ), {
+            'group': post.group,
+            'page_obj': first_page(Post.objects.filter(group=post.group)),
+        }),
+        ('posts/profile.html', reverse(
+            'posts:profile', args=[post.author.username]
+        ), {
+            'author': post.author,
+            'page_obj': first_page(Post.objects.filter(author=post.author)),
+            'following': False,
+        }),
+        ('posts/post_detail.html', reverse(
+            'posts:post_detail', args=[post.pk]
+        ), {
+            'post': post,
+            'form': CommentForm(),
+            'comments': comments_page(post)[0],
+        }),
+    ]
+
+
+def normalize(html):
+    return re.sub(r'\s+', ' ', html).strip()
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает время рендера горячих шаблонов в DjangoTemplates '
+        'и Jinja2 на одних и тех же контекстах.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('-n', '--renders', type=int, default=200)
+
+    def handle(self, *args, **options):
+        backends = (('django', engines['django']), ('jinja2', get_engine()))
+        self.stdout.write(
+            f'{"шаблон":<26} {"django":>10} {"jinja2":>10} {"ускорение":>10}'
+        )
+        for name, path, context in cases():
+            request = make_request(path)
+            timings = {}
+            outputs = {}
+            for backend, engine in backends:
+                template = engine.get_template(name)
+                outputs[backend] = template.render(dict(context), request)
+                started = time.perf_counter()
+                for _ in range(options['renders']):
+                    template.render(dict(context), request)
+                timings[backend] = (
+                    (time.perf_counter() - started) / options['renders']
+                )
+            same = normalize(outputs['django']) == normalize(outputs['jinja2'])
+            self.stdout.write(
+                f'{name:<26} {timings["django"] * 1000:8.3f}мс '
+                f'{timings["jinja2"] * 1000:8.3f}мс '
+                f'{timings["django"] / timings["jinja2"]:9.2f}x'
+                f'{"" if same else "  вывод отличается"}'
+            )
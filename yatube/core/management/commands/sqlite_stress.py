@@ -0,0 +1,115 @@
+import os
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.db import apply_pragmas, is_locked_error, retry_on_locked
+
+SCHEMA = (
+    'CREATE TABLE follow ('
+    'id INTEGER PRIMARY KEY, user_id INTEGER, author_id INTEGER, '
+    'UNIQUE (user_id, author_id))',
+    'CREATE TABLE comment ('
+    'id INTEGER PRIMARY KEY, post_id INTEGER, author_id INTEGER, '
+    'text TEXT, created REAL)',
+)
+DEFAULT_TIMEOUT = 5.0
+
+
+class Command(BaseCommand):
+    help = (
+        'Конкурентная запись комментариев и подписок в SQLite: доля ошибок '
+        '"database is locked" с настройками по умолчанию и с SQLITE_PRAGMAS, '
+        'BEGIN IMMEDIATE и повторами.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--transactions', type=int, default=50)
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f'{"mode":<12} {"transactions":>12} {"locked":>8} '
+            f'{"rate":>8} {"elapsed":>8}'
+        )
+        for mode, tuned in (('default', False), ('production', True)):
+            total, locked, elapsed = self.run(
+                tuned, options['threads'], options['transactions']
+            )
+            self.stdout.write(
+                f'{mode:<12} {total:>12} {locked:>8} '
+                f'{locked / total:>8.2%} {elapsed:>7.2f}s'
+            )
+
+    def run(self, tuned, threads, transactions):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'stress.sqlite3')
+            connection = self.connect(path, tuned)
+            for statement in SCHEMA:
+                connection.execute(statement)
+            connection.close()
+            started = time.perf_counter()
+            with ThreadPoolExecutor(threads) as executor:
+                locked = sum(executor.map(
+                    partial(self.worker, path, tuned, transactions),
+                    range(threads)
+                ))
+            elapsed = time.perf_counter() - started
+        return threads * transactions, locked, elapsed
+
+    @staticmethod
+    def connect(path, tuned):
+        connection = sqlite3.connect(
+            path,
+            timeout=DEFAULT_TIMEOUT,
+            isolation_level=None,
+            check_same_thread=False
+        )
+        if tuned:
+            apply_pragmas(connection.cursor(), settings.SQLITE_PRAGMAS)
+        return connection
+
+    def worker(self, path, tuned, transactions, number):
+        connection = self.connect(path, tuned)
+        locked = 0
+        for step in range(transactions):
+            write = partial(self.write, connection, tuned, number, step)
+            try:
+                retry_on_locked(write) if tuned else write()
+            except sqlite3.OperationalError as error:
+                if not is_locked_error(error):
+                    raise
+                locked += 1
+        connection.close()
+        return locked
+
+    @staticmethod
+    def write(connection, tuned, number, step):
+        """Повторяет add_comment и profile_follow: чтение, затем запись."""
+        cursor = connection.cursor()
+        cursor.execute('BEGIN IMMEDIATE' if tuned else 'BEGIN')
+        try:
+            cursor.execute(
+                'SELECT id FROM follow WHERE user_id = ? AND author_id = ?',
+                (number, step)
+            )
+            if cursor.fetchone() is None:
+                cursor.execute(
+                    'INSERT INTO follow (user_id, author_id) VALUES (?, ?)',
+                    (number, step)
+                )
+            cursor.execute(
+                'INSERT INTO comment (post_id, author_id, text, created) '
+                'VALUES (?, ?, ?, ?)',
+                (step, number, 'stress', time.time())
+            )
+            cursor.execute('COMMIT')
+        except sqlite3.OperationalError:
+            if connection.in_transaction:
+                cursor.execute('ROLLBACK')
+            raise
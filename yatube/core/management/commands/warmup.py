@@ -0,0 +1,81 @@
+import os
+import subprocess
+import sys
+
+from django.core.management.base import BaseCommand
+
+from core.warmup import warmup
+
+# Дочерний процесс: время до готовности и первые запросы к путям.
+MEASURE_SCRIPT = '''
+import sys
+import time
+
+started = time.perf_counter()
+import django
+django.setup()
+from django.test import Client
+from core.warmup import warmup
+
+if sys.argv[1] == 'warm':
+    warmup()
+ready = time.perf_counter()
+client = Client()
+for path in sys.argv[2:]:
+    client.get(path)
+print(ready - started, time.perf_counter() - ready)
+'''
+
+
+class Command(BaseCommand):
+    help = (
+        'Прогревает процесс: шаблоны, резолвер URL, PIL и sorl, '
+        'gc.freeze(). С --measure сравнивает холодный старт '
+        'без прогрева и с ним.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--measure',
+            action='store_true',
+            help='замерить холодный старт в отдельных процессах'
+        )
+        parser.add_argument(
+            '--path',
+            action='append',
+            dest='paths',
+            help='страница для первого запроса, можно несколько раз'
+        )
+        parser.add_argument('-n', '--runs', type=int, default=5)
+
+    def handle(self, *args, **options):
+        if options['measure']:
+            self.measure(options['paths'] or ['/'], options['runs'])
+            return
+        for name, duration, result in warmup():
+            self.stdout.write(
+                f'{name:<10} {duration * 1000:8.2f} мс  {result}'
+            )
+
+    def run_child(self, mode, paths):
+        output = subprocess.run(
+            [sys.executable, '-c', MEASURE_SCRIPT, mode, *paths],
+            check=True,
+            stdout=subprocess.PIPE,
+            cwd=os.getcwd(),
+            env=os.environ.copy(),
+        ).stdout.split()
+        return [float(value) for value in output[-2:]]
+
+    def measure(self, paths, runs):
+        self.stdout.write(
+            f'{"режим":<6} {"старт":>10} {"запросы":>10} {"итого":>10}'
+        )
+        for mode in ('cold', 'warm'):
+            results = [self.run_child(mode, paths) for _ in range(runs)]
+            ready = min(result[0] for result in results)
+            first = min(result[1] for result in results)
+            self.stdout.write(
+                f'{mode:<6} {ready * 1000:8.1f}мс {first * 1000:8.1f}мс '
+                f'{(ready + first) * 1000:8.1f}мс'
+            )
@@ -0,0 +1,138 @@
+import os
+import re
+import threading
+import tracemalloc
+
+from django.conf import settings
+from django.utils import timezone
+
+SNAPSHOT_ID_RE = re.compile(r'^\d{8}-\d{6}-\d{6}$')
+SNAPSHOT_SUFFIX = '.snapshot'
+SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+)
+
+_lock = threading.Lock()
+_view_stats = {}
+
+
+def ensure_tracing():
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(settings.MEMORY_TRACEBACK_FRAMES)
+
+
+def can_reset_peak():
+    return hasattr(tracemalloc, 'reset_peak')
+
+
+def track(func, *args, **kwargs):
+    """Вызывает func и возвращает (результат, прирост, пик) в байтах.
+
+    Пик tracemalloc общий для процесса, поэтому при параллельных
+    запросах в потоках значения получаются приблизительными. Сбросить
+    пик можно только с Python 3.9; на старых версиях пик равен None,
+    а считается лишь прирост: clear_traces() стёр бы все выделения
+    процесса вместе со снимками и замерами соседних запросов.
+    """
+    ensure_tracing()
+    peaks = can_reset_peak()
+    if peaks:
+        tracemalloc.reset_peak()
+    before, _ = tracemalloc.get_traced_memory()
+    result = func(*args, **kwargs)
+    after, peak = tracemalloc.get_traced_memory()
+    peak = max(peak - before, 0) if peaks else None
+    return result, after - before, peak
+
+
+def record(view_name, net, peak):
+    with _lock:
+        stats = _view_stats.setdefault(view_name, {
+            'view': view_name,
+            'requests': 0,
+            'net': 0,
+            'peaks': 0,
+            'peak': 0,
+            'max_peak': None,
+        })
+        stats['requests'] += 1
+        stats['net'] += net
+        if peak is not None:
+            stats['peaks'] += 1
+            stats['peak'] += peak
+            stats['max_peak'] = max(stats['max_peak'] or 0, peak)
+
+
+def view_stats():
+    with _lock:
+        rows = [
+            dict(
+                stats,
+                avg_net=stats['net'] // stats['requests'],
+                avg_peak=(
+                    stats['peak'] // stats['peaks'] if stats['peaks'] else None
+                ),
+            )
+            for stats in _view_stats.values()
+        ]
+    return sorted(
+        rows, key=lambda row: (row['max_peak'] or 0, row['avg_net']),
+        reverse=True
+    )
+
+
+def reset_view_stats():
+    with _lock:
+        _view_stats.clear()
+
+
+def snapshot_path(snapshot_id):
+    return os.path.join(
+        settings.MEMORY_SNAPSHOT_ROOT, snapshot_id + SNAPSHOT_SUFFIX
+    )
+
+
+def take_snapshot():
+    """Сохраняет снимок tracemalloc на диск и возвращает его id."""
+    ensure_tracing()
+    os.makedirs(settings.MEMORY_SNAPSHOT_ROOT, exist_ok=True)
+    snapshot_id = timezone.now().strftime('%Y%m%d-%H%M%S-%f')
+    snapshot = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+    snapshot.dump(snapshot_path(snapshot_id))
+    return snapshot_id
+
+
+def list_snapshots():
+    if not os.path.isdir(settings.MEMORY_SNAPSHOT_ROOT):
+        return []
+    snapshots = [
+        snapshot_id
+        for snapshot_id, suffix in map(
+            os.path.splitext, os.listdir(settings.MEMORY_SNAPSHOT_ROOT)
+        )
+        if suffix == SNAPSHOT_SUFFIX and SNAPSHOT_ID_RE.match(snapshot_id)
+    ]
+    return sorted(snapshots, reverse=True)
+
+
+def compare_snapshots(first_id, second_id, limit):
+    """Разница между снимками по месту выделения памяти.
+
+    Возвращает None, если какого-то из снимков нет.
+    """
+    if first_id not in list_snapshots() or second_id not in list_snapshots():
+        return None
+    first = tracemalloc.Snapshot.load(snapshot_path(first_id))
+    second = tracemalloc.Snapshot.load(snapshot_path(second_id))
+    return [
+        {
+            'site': str(stat.traceback),
+            'size_diff': stat.size_diff,
+            'count_diff': stat.count_diff,
+            'size': stat.size,
+            'count': stat.count,
+        }
+        for stat in second.compare_to(first, 'lineno')[:limit]
+    ]
@@ -0,0 +1,33 @@
+from django.conf import settings
+
+from core import admission
+from core.views import service_unavailable
+
+
+class AdmissionControlMiddleware:
+    """Отвечает 503 с Retry-After, когда группа URL перегружена.
+
+    Дорогие страницы не занимают все потоки сервера, и дешёвые
+    продолжают отвечать во время пиков.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        group = getattr(request, '_admission_group', None)
+        if group is not None:
+            admission.release(group)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        group = admission.group_for(request.resolver_match.view_name)
+        if group is None:
+            return None
+        if not admission.acquire(group):
+            return service_unavailable(
+                request, settings.ADMISSION_RETRY_AFTER
+            )
+        request._admission_group = group
+        return None
@@ -0,0 +1,21 @@
+from django.conf import settings
+
+from core import memory
+
+
+class MemoryTrackingMiddleware:
+    """Собирает пик и прирост памяти tracemalloc по каждому view.
+
+    Включается настройкой MEMORY_TRACKING.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.MEMORY_TRACKING:
+            return self.get_response(request)
+        response, net, peak = memory.track(self.get_response, request)
+        if request.resolver_match is not None:
+            memory.record(request.resolver_match.view_name, net, peak)
+        return response
@@ -0,0 +1,31 @@
+import cProfile
+import time
+
+from django.conf import settings
+
+from core import profiling
+
+
+class ProfilingMiddleware:
+    """Выполняет запрос под cProfile, если staff добавил флаг в адрес."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not self.should_profile(request):
+            return self.get_response(request)
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        response = profiler.runcall(self.get_response, request)
+        duration = time.perf_counter() - started
+        report_id = profiling.save_report(profiler, request, duration)
+        response['X-Profile-Report'] = report_id
+        return response
+
+    @staticmethod
+    def should_profile(request):
+        return (
+            settings.PROFILING_QUERY_PARAM in request.GET
+            and request.user.is_staff
+        )
@@ -0,0 +1,41 @@
+import time
+
+from django.conf import settings
+
+from core import routers
+
+
+class ReplicaStickinessMiddleware:
+    """Закрепляет чтения за основной БД на время после записи.
+
+    Пока реплика не догнала основную БД, пользователь, который только что
+    что-то записал, читает из default и видит свои изменения.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        routers.start_request(pinned=self.is_pinned(request))
+        try:
+            response = self.get_response(request)
+            if routers.has_written():
+                seconds = settings.REPLICA_STICKY_SECONDS
+                response.set_cookie(
+                    settings.REPLICA_STICKY_COOKIE,
+                    str(time.time() + seconds),
+                    max_age=seconds,
+                    httponly=True,
+                    samesite='Lax'
+                )
+        finally:
+            routers.end_request()
+        return response
+
+    @staticmethod
+    def is_pinned(request):
+        try:
+            until = float(request.COOKIES[settings.REPLICA_STICKY_COOKIE])
+        except (KeyError, ValueError):
+            return False
+        return until > time.time()
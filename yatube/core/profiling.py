@@ -0,0 +1,86 @@
+import json
+import os
+import pstats
+import re
+
+from django.conf import settings
+from django.utils import timezone
+
+REPORT_ID_RE = re.compile(r'^\d{8}-\d{6}-\d{6}$')
+STATS_SUFFIX = '.prof'
+META_SUFFIX = '.json'
+
+
+def report_path(report_id, suffix=STATS_SUFFIX):
+    return os.path.join(settings.PROFILING_ROOT, report_id + suffix)
+
+
+def save_report(profiler, request, duration):
+    """Сохраняет pstats запроса и его описание, возвращает id отчёта."""
+    os.makedirs(settings.PROFILING_ROOT, exist_ok=True)
+    created = timezone.now()
+    report_id = created.strftime('%Y%m%d-%H%M%S-%f')
+    profiler.dump_stats(report_path(report_id))
+    meta = {
+        'id': report_id,
+        'url': request.get_full_path(),
+        'method': request.method,
+        'user': request.user.get_username(),
+        'created': created.isoformat(),
+        'duration': duration,
+    }
+    with open(report_path(report_id, META_SUFFIX), 'w') as meta_file:
+        json.dump(meta, meta_file)
+    prune_reports()
+    return report_id
+
+
+def list_reports():
+    if not os.path.isdir(settings.PROFILING_ROOT):
+        return []
+    reports = []
+    for name in os.listdir(settings.PROFILING_ROOT):
+        report_id, suffix = os.path.splitext(name)
+        if suffix == META_SUFFIX:
+            report = get_report(report_id)
+            if report is not None:
+                reports.append(report)
+    return sorted(reports, key=lambda report: report['id'], reverse=True)
+
+
+def get_report(report_id):
+    if not REPORT_ID_RE.match(report_id):
+        return None
+    try:
+        with open(report_path(report_id, META_SUFFIX)) as meta_file:
+            return json.load(meta_file)
+    except (OSError, ValueError):
+        return None
+
+
+def prune_reports():
+    """Удаляет самые старые отчёты сверх PROFILING_MAX_REPORTS."""
+    for report in list_reports()[settings.PROFILING_MAX_REPORTS:]:
+        for suffix in (STATS_SUFFIX, META_SUFFIX):
+            try:
+                os.remove(report_path(report['id'], suffix))
+            except FileNotFoundError:
+                pass
+
+
+def top_functions(report_id, limit):
+    """Возвращает limit функций с наибольшим cumulative time."""
+    stats = pstats.Stats(report_path(report_id))
+    rows = [
+        {
+            'function': pstats.func_std_string(func),
+            'primitive_calls': primitive_calls,
+            'calls': calls,
+            'tottime': tottime,
+            'cumtime': cumtime,
+        }
+        for func, (primitive_calls, calls, tottime, cumtime, _)
+        in stats.stats.items()
+    ]
+    rows.sort(key=lambda row: row['cumtime'], reverse=True)
+    return stats.total_tt, rows[:limit]
@@ -0,0 +1,68 @@
+"""Ограничение частоты запросов скользящим окном в общем кэше.
+
+Для каждой области из RATELIMITS заданы число запросов и окно в
+секундах. Запросы считаются атомарными add() и incr() в кэше
+RATELIMIT_CACHE, общем для всех процессов, мимо L1 TwoTierCache; к
+счётчику текущего окна добавляется доля предыдущего, ещё не вышедшая
+из скользящего окна. Счётчик свой у каждого пользователя, а у
+гостей — у каждого IP. RATELIMIT_ENABLED выключает ограничение.
+"""
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+
+from core.views import too_many_requests
+
+
+def client_ident(request):
+    if request.user.is_authenticated:
+        return f'user:{request.user.pk}'
+    return f'ip:{request.META.get("REMOTE_ADDR")}'
+
+
+def window_key(scope, ident, window):
+    return f'core:ratelimit:{scope}:{ident}:{window}'
+
+
+def take_token(scope, ident):
+    """Засчитывает запрос; возвращает 0 или секунды до следующего
+    разрешённого. Отклонённый запрос не засчитывается."""
+    capacity, period = settings.RATELIMITS[scope]
+    store = caches[settings.RATELIMIT_CACHE]
+    window, elapsed = divmod(time.time(), period)
+    window = int(window)
+    key = window_key(scope, ident, window)
+    store.add(key, 0, period * 2)
+    try:
+        count = store.incr(key)
+    except ValueError:
+        # Счётчик вытеснили между add() и incr().
+        store.add(key, 1, period * 2)
+        count = 1
+    previous = store.get(window_key(scope, ident, window - 1), 0)
+    if count + previous * (1 - elapsed / period) <= capacity:
+        return 0
+    store.decr(key)
+    if count > capacity or not previous:
+        return period - elapsed
+    # Когда доля предыдущего окна уменьшится настолько, что запрос
+    # поместится.
+    return (1 - (capacity - count) / previous) * period - elapsed
+
+
+def ratelimit(scope, methods=None):
+    """Отвечает 429, когда клиент исчерпал корзину области scope."""
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if settings.RATELIMIT_ENABLED and (
+                methods is None or request.method in methods
+            ):
+                wait = take_token(scope, client_ident(request))
+                if wait:
+                    return too_many_requests(request, int(wait) + 1)
+            return view_func(request, *args, **kwargs)
+        return wrapper
+    return decorator
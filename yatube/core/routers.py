@@ -0,0 +1,90 @@
+import os
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Момент, с которого refresh_replica начал последнюю копию основной БД.
+REPLICA_SYNCED_KEY = 'replica:synced_at'
+
+_state = threading.local()
+
+
+def start_request(pinned):
+    _state.pinned = pinned
+    _state.written = False
+
+
+def end_request():
+    start_request(pinned=False)
+
+
+def is_pinned():
+    return getattr(_state, 'pinned', False)
+
+
+def has_written():
+    return getattr(_state, 'written', False)
+
+
+def mark_replica_synced(started_at):
+    cache.set(REPLICA_SYNCED_KEY, started_at, None)
+
+
+def pin_if_replica_behind(changed_at):
+    """Закрепляет чтения запроса за основной БД, если изменение в момент
+    changed_at (time.time()) могло ещё не попасть в реплику.
+
+    Страницы с версиями кэшируются под новой версией сразу после
+    записи; прочитай они реплику до refresh_replica, старое содержимое
+    осталось бы в кэше и за ETag новой версии.
+    """
+    if not replica_available():
+        return
+    synced_at = cache.get(REPLICA_SYNCED_KEY, 0)
+    if changed_at > synced_at - settings.REPLICA_LAG_MARGIN:
+        _state.pinned = True
+
+
+def replica_available():
+    """Реплика настроена, не совпадает с основной БД и уже создана.
+
+    В тестах реплика — зеркало основной БД, и чтения идут в default.
+    """
+    alias = settings.REPLICA_DATABASE
+    if alias not in connections.databases:
+        return False
+    name = connections[alias].settings_dict['NAME']
+    return (
+        name != connections[DEFAULT_DB_ALIAS].settings_dict['NAME']
+        and os.path.exists(name)
+    )
+
+
+class PrimaryReplicaRouter:
+    """Чтения моделей из REPLICA_APPS уходят в реплику, записи — в default.
+
+    После записи чтения закрепляются за default, пока это разрешает
+    ReplicaStickinessMiddleware.
+    """
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label not in settings.REPLICA_APPS:
+            return None
+        if is_pinned() or not replica_available():
+            return DEFAULT_DB_ALIAS
+        return settings.REPLICA_DATABASE
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label in settings.REPLICA_APPS:
+            _state.written = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == settings.REPLICA_DATABASE:
+            return False
+        return None
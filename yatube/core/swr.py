@@ -0,0 +1,260 @@
+"""Кэш с мягким и жёстким сроком жизни (stale-while-revalidate).
+
+Запись хранится timeout + stale_timeout секунд, но свежей считается только
+первые timeout. Устаревшую запись пересчитывает один запрос, взявший
+замок в кэше, остальные в это время получают старую копию. При полном
+промахе запросы без замка ждут результат до SWR_LOCK_WAIT секунд.
+
+Страницу в фоновом потоке рисует отдельный анонимный запрос: исходный
+в это время ещё дорабатывает в своём потоке, а его пользователь и
+сессия не должны попасть в общую запись кэша.
+"""
+import threading
+import time
+from functools import partial, wraps
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import connections
+from django.http import HttpRequest, QueryDict
+from django.urls import resolve
+from django.utils.cache import (
+    get_cache_key, get_conditional_response, has_vary_header,
+    learn_cache_key, patch_response_headers
+)
+from django.utils.http import parse_http_date_safe
+
+from core.circuit import STALE_HEADER
+
+POLL_INTERVAL = 0.05
+# Заголовки, от которых зависят адреса и ключ кэша страницы.
+ANONYMOUS_META = (
+    'SCRIPT_NAME', 'SERVER_NAME', 'SERVER_PORT', 'HTTP_HOST',
+    'HTTP_X_FORWARDED_HOST', 'HTTP_X_FORWARDED_PROTO', 'wsgi.url_scheme',
+)
+
+_missing = object()
+
+
+def lock_key(key):
+    return f'{key}:lock'
+
+
+def acquire(key):
+    return cache.add(lock_key(key), True, settings.SWR_LOCK_TIMEOUT)
+
+
+def release(key):
+    cache.delete(lock_key(key))
+
+
+def store(key, value, timeout, stale_timeout):
+    cache.set(key, (time.time() + timeout, value), timeout + stale_timeout)
+
+
+def refresh(key, compute, timeout, stale_timeout, should_cache):
+    try:
+        value = compute()
+        if should_cache(value):
+            store(key, value, timeout, stale_timeout)
+        return value
+    finally:
+        release(key)
+
+
+def refresh_in_background(*args):
+    def run():
+        try:
+            refresh(*args)
+        finally:
+            connections.close_all()
+
+    threading.Thread(target=run, daemon=True).start()
+
+
+def wait_for(key):
+    deadline = time.monotonic() + settings.SWR_LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry[1]
+    return _missing
+
+
+def is_not_none(value):
+    return value is not None
+
+
+def resolve_timeouts(timeout, stale_timeout):
+    if timeout is None:
+        timeout = settings.CACHE_DURATION
+    if stale_timeout is None:
+        stale_timeout = settings.CACHE_STALE_DURATION
+    return timeout, stale_timeout
+
+
+def compute_on_miss(key, compute, timeout, stale_timeout, should_cache):
+    if acquire(key):
+        return refresh(key, compute, timeout, stale_timeout, should_cache)
+    value = wait_for(key)
+    if value is not _missing:
+        return value
+    value = compute()
+    if should_cache(value):
+        store(key, value, timeout, stale_timeout)
+    return value
+
+
+def get_or_refresh(key, compute, timeout=None, stale_timeout=None,
+                   should_cache=is_not_none, background=None,
+                   background_compute=None):
+    """Значение key из кэша; compute() вызывается одним запросом за раз.
+
+    Подходит и для страниц, и для фрагментов: compute возвращает любое
+    значение, которое можно положить в кэш. background_compute, если
+    задан, заменяет compute в фоновом потоке и возвращает None вместо
+    значения, которое кэшировать нельзя.
+    """
+    timeout, stale_timeout = resolve_timeouts(timeout, stale_timeout)
+    if background is None:
+        background = settings.SWR_BACKGROUND_REFRESH
+    args = (key, compute, timeout, stale_timeout, should_cache)
+    entry = cache.get(key)
+    if entry is None:
+        return compute_on_miss(*args)
+    fresh_until, value = entry
+    if fresh_until > time.time() or not acquire(key):
+        return value
+    if background:
+        if background_compute is not None:
+            args = (
+                key, background_compute, timeout, stale_timeout, is_not_none
+            )
+        refresh_in_background(*args)
+        return value
+    return refresh(*args)
+
+
+def is_cacheable(request, response):
+    """Те же условия, что у UpdateCacheMiddleware; старую копию страницы
+    на время сбоя БД не кэшируем."""
+    if response.streaming or response.status_code != 200:
+        return False
+    if STALE_HEADER in response:
+        return False
+    if (
+        not request.COOKIES
+        and response.cookies
+        and has_vary_header(response, 'Cookie')
+    ):
+        return False
+    return 'private' not in response.get('Cache-Control', ())
+
+
+def render_page(view_func, request, args, kwargs, key_prefix, timeouts):
+    response = view_func(request, *args, **kwargs)
+    if hasattr(response, 'render'):
+        response.render()
+    if is_cacheable(request, response):
+        patch_response_headers(response, timeouts[0])
+        learn_cache_key(
+            request, response, sum(timeouts), key_prefix, cache=cache
+        )
+    return response
+
+
+def anonymous_request(path, path_info, query_string, meta):
+    """Новый GET-запрос гостя к тому же адресу, без cookies и сессии."""
+    request = HttpRequest()
+    request.method = 'GET'
+    request.path = path
+    request.path_info = path_info
+    request.META = dict(meta, REQUEST_METHOD='GET', QUERY_STRING=query_string)
+    request.GET = QueryDict(query_string)
+    request.user = AnonymousUser()
+    request.resolver_match = resolve(path_info)
+    return request
+
+
+def render_anonymous(view_func, snapshot, args, kwargs, key_prefix,
+                     timeouts):
+    """Рисует страницу для гостя; None, если её нельзя кэшировать."""
+    request = anonymous_request(*snapshot)
+    response = render_page(
+        view_func, request, args, kwargs, key_prefix, timeouts
+    )
+    return response if is_cacheable(request, response) else None
+
+
+def request_snapshot(request):
+    """Неизменяемые данные запроса, из которых фоновый поток соберёт
+    свой запрос."""
+    return (
+        request.path,
+        request.path_info,
+        request.META.get('QUERY_STRING', ''),
+        {
+            name: request.META[name]
+            for name in ANONYMOUS_META if name in request.META
+        },
+    )
+
+
+def conditional_response(request, response):
+    """304 для закэшированной страницы, как в ConditionalGetMiddleware."""
+    etag = response.get('ETag')
+    last_modified = response.get('Last-Modified')
+    last_modified = last_modified and parse_http_date_safe(last_modified)
+    if not etag and not last_modified:
+        return response
+    return get_conditional_response(
+        request, etag=etag, last_modified=last_modified, response=response
+    )
+
+
+def background_options(request, view_func, args, kwargs, key_prefix,
+                       timeouts):
+    """Фоновый пересчёт только для записей гостей без cookies: страница
+    гостя лежит под тем же ключом, запись пользователя пересчитывается
+    в потоке его запроса."""
+    if request.COOKIES:
+        return {'background': False}
+    return {'background_compute': partial(
+        render_anonymous,
+        view_func, request_snapshot(request), args, kwargs, key_prefix,
+        timeouts
+    )}
+
+
+def cache_page_swr(timeout=None, stale_timeout=None, key_prefix=''):
+    """cache_page с устареванием: просроченную страницу отдают, пока
+    один запрос рисует новую."""
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view_func(request, *args, **kwargs)
+            timeouts = resolve_timeouts(timeout, stale_timeout)
+            compute = partial(
+                render_page,
+                view_func, request, args, kwargs, key_prefix, timeouts
+            )
+            should_cache = partial(is_cacheable, request)
+            key = get_cache_key(request, key_prefix, 'GET', cache=cache)
+            if key is not None:
+                return conditional_response(request, get_or_refresh(
+                    key, compute, *timeouts,
+                    should_cache=should_cache,
+                    **background_options(
+                        request, view_func, args, kwargs, key_prefix, timeouts
+                    )
+                ))
+            response = compute()
+            key = get_cache_key(request, key_prefix, 'GET', cache=cache)
+            if key is not None and should_cache(response):
+                store(key, response, *timeouts)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,46 @@
+"""Окружение, в котором идут тесты: manage.py test и pytest."""
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+def test_environment():
+    """Настройки на время всех тестов.
+
+    Файловый кэш разделялся бы с запущенным сервером и хранил бы
+    корзины лимитов и готовые страницы между запусками, поэтому общий
+    уровень кэша живёт в памяти процесса. Прогрев после записи рендерит
+    страницы в фоновых потоках, которые гонялись бы с тестом за одну
+    тестовую БД; тесты прогрева включают его сами. По той же причине
+    просмотры считаются, но в БД их пишет сам тест через flush_pending().
+    """
+    return override_settings(
+        CACHES={
+            **settings.CACHES,
+            'shared': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            },
+        },
+        WARMING_ON_WRITE=False,
+        VIEW_FLUSH_IN_BACKGROUND=False,
+    )
+
+
+class TestRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.environment = test_environment()
+        self.environment.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.environment.disable()
+        super().teardown_test_environment(**kwargs)
+
+
+def run_on_commit(using=DEFAULT_DB_ALIAS):
+    """Выполняет колбэки on_commit: TestCase не фиксирует транзакцию."""
+    connection = connections[using]
+    callbacks, connection.run_on_commit = connection.run_on_commit, []
+    for _, callback in callbacks:
+        callback()
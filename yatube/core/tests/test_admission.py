@@ -0,0 +1,57 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core import admission
+
+User = get_user_model()
+
+
+@override_settings(ADMISSION_GROUPS={
+    'pages': {
+        'views': ('posts:profile',),
+        'limit': 1,
+        'queue_timeout': 0,
+    },
+})
+class AdmissionControlTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.staff = User.objects.create_user(
+            username='TestStaff', is_staff=True
+        )
+
+    def setUp(self):
+        cache.clear()
+        admission.reset()
+        self.addCleanup(admission.reset)
+        self.url = reverse('posts:profile', kwargs={'username': self.staff})
+
+    def test_requests_within_limit_are_admitted(self):
+        """Запросы в пределах лимита обрабатываются и освобождают место."""
+        for _ in range(2):
+            self.assertEqual(Client().get(self.url).status_code, 200)
+        self.assertEqual(admission.stats()[0]['in_flight'], 0)
+
+    def test_overloaded_group_is_shed(self):
+        """Сверх лимита группа отвечает 503 с Retry-After."""
+        admission.acquire('pages')
+        response = Client().get(self.url)
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('Retry-After', response)
+        self.assertEqual(Client().get(reverse('about:tech')).status_code, 200)
+        client = Client()
+        client.force_login(self.staff)
+        response = client.get(reverse('core:admission_stats'))
+        self.assertEqual(response.context['groups'][0]['shed'], 1)
+
+    def test_cached_pages_skip_admission(self):
+        """Страница из кэша гостей отдаётся и при заполненной группе."""
+        self.assertEqual(Client().get(self.url).status_code, 200)
+        admission.acquire('pages')
+        response = Client().get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Page-Cache'], 'hit')
+        self.assertEqual(admission.stats()[0]['shed'], 0)
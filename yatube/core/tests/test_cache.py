@@ -0,0 +1,170 @@
+import random
+import shutil
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from core.cache import LockedFileBasedCache, TwoTierCache
+
+User = get_user_model()
+TEST_CACHES = {
+    'default': {
+        'BACKEND': 'core.cache.TwoTierCache',
+        'LOCATION': 'test_shared',
+        'OPTIONS': {'GENERATION_CHECK_INTERVAL': 0},
+    },
+    'test_shared': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'test_shared',
+    },
+}
+
+
+def make_process_cache(name, **options):
+    """Кэш с отдельным L1, как в другом процессе."""
+    options.setdefault('GENERATION_CHECK_INTERVAL', 0)
+    return TwoTierCache('test_shared', {
+        'OPTIONS': dict(options, L1_NAME=f'{name}-{uuid.uuid4()}'),
+    })
+
+
+@override_settings(CACHES=TEST_CACHES)
+class TwoTierCacheTests(TestCase):
+    def setUp(self):
+        caches['test_shared'].clear()
+        self.first = make_process_cache('first')
+        self.second = make_process_cache('second')
+        self.first.clear()
+        self.second.clear()
+
+    def test_values_are_served_from_both_tiers(self):
+        """Свой set() читается из L1, чужой — из L2."""
+        self.first.set('key', 'value')
+        self.assertEqual(self.first.get('key'), 'value')
+        self.assertEqual(self.second.get('key'), 'value')
+        self.assertEqual(self.second.get('key'), 'value')
+        self.assertEqual(self.second.get('missing'), None)
+        stats = self.second.stats()
+        self.assertEqual(stats['l1_hits'], 1)
+        self.assertEqual(stats['l2_hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+
+    def test_writes_invalidate_other_processes_per_key(self):
+        """Чужие set(), incr() и delete() сбрасывают в L1 только свои
+        ключи при следующей проверке журнала."""
+        for key in ('key', 'counter', 'other', 'untouched'):
+            self.first.set(key, 1)
+            self.assertEqual(self.second.get(key), 1)
+        self.first.set('key', 2)
+        self.first.incr('counter')
+        self.first.delete('other')
+        self.assertEqual(self.second.get('key'), 2)
+        self.assertEqual(self.second.get('counter'), 2)
+        self.assertIsNone(self.second.get('other'))
+        hits = self.second.stats()['l1_hits']
+        self.assertEqual(self.second.get('untouched'), 1)
+        stats = self.second.stats()
+        self.assertEqual(stats['l1_hits'], hits + 1)
+        self.assertEqual(stats['invalidations'], 3)
+
+    def test_invalidation_waits_for_check_interval(self):
+        """Между проверками журнала чужая запись ещё не видна."""
+        second = make_process_cache(
+            'second', GENERATION_CHECK_INTERVAL=0.05
+        )
+        self.first.set('key', 'value')
+        self.assertEqual(second.get('key'), 'value')
+        self.first.set('key', 'changed')
+        self.assertEqual(second.get('key'), 'value')
+        time.sleep(0.06)
+        self.assertEqual(second.get('key'), 'changed')
+
+    def test_own_writes_stay_in_l1(self):
+        """Свои записи не сбрасываются из L1 по своему же журналу."""
+        self.first.set('key', 'value')
+        self.assertEqual(self.first.get('key'), 'value')
+        self.assertEqual(self.first.stats()['l1_hits'], 1)
+
+    def test_lagging_process_drops_l1(self):
+        """Отставший больше чем на JOURNAL_MAX_ENTRIES процесс сбрасывает
+        весь L1."""
+        second = make_process_cache('second', JOURNAL_MAX_ENTRIES=2)
+        second.set('other', 'value')
+        for number in range(3):
+            self.first.set(f'key{number}', number)
+        self.assertEqual(second.get('other'), 'value')
+        self.assertEqual(second.stats()['l1_hits'], 0)
+
+    def test_l1_does_not_outlive_shared_entry(self):
+        """Копия из L2 живёт в L1 не дольше записи в L2."""
+        self.first.set('key', 'value', timeout=0.05)
+        self.assertEqual(self.second.get('key'), 'value')
+        time.sleep(0.06)
+        self.assertIsNone(self.second.get('key'))
+        self.assertEqual(self.second.stats()['l1_hits'], 0)
+
+    def test_clear_flushes_other_processes(self):
+        """clear() меняет поколение, и остальные процессы сбрасывают L1."""
+        self.first.set('key', 'value')
+        self.assertEqual(self.second.get('key'), 'value')
+        self.first.clear()
+        self.assertIsNone(self.second.get('key'))
+
+    def test_l1_is_bounded(self):
+        """L1 вытесняет самые старые записи сверх L1_MAX_ENTRIES."""
+        cache = make_process_cache('bounded', L1_MAX_ENTRIES=2)
+        for key in ('first', 'second', 'third'):
+            cache.set(key, key)
+        self.assertEqual(cache.stats()['l1_size'], 2)
+        self.assertEqual(cache.get('first'), 'first')
+        self.assertEqual(cache.stats()['l2_hits'], 1)
+
+    def test_stats_page_for_staff(self):
+        """Staff видит долю попаданий по уровням."""
+        staff = User.objects.create_user(username='TestStaff', is_staff=True)
+        client = Client()
+        client.force_login(staff)
+        response = client.get(reverse('core:cache_stats'))
+        self.assertEqual(response.context['backends'][0]['alias'], 'default')
+
+
+class LockedFileBasedCacheTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        self.cache = LockedFileBasedCache(directory, {})
+
+    def test_concurrent_increments_are_not_lost(self):
+        """incr() из нескольких потоков не теряет приращений."""
+        self.cache.add('counter', 0, 60)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(
+                lambda _: self.cache.incr('counter'), range(50)
+            ))
+        self.assertEqual(self.cache.get('counter'), 50)
+
+    def test_set_max_never_lowers(self):
+        """set_max() из нескольких потоков оставляет наибольшее значение."""
+        values = list(range(100))
+        random.shuffle(values)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(
+                lambda value: self.cache.set_max('mark', value), values
+            ))
+        self.assertEqual(self.cache.get('mark'), 99)
+        self.assertEqual(self.cache.set_max('mark', 10), 99)
+
+    def test_incr_keeps_expiry(self):
+        """incr() не продлевает срок записи."""
+        self.cache.set('counter', 1, 0.2)
+        self.assertEqual(self.cache.incr('counter'), 2)
+        time.sleep(0.25)
+        self.assertIsNone(self.cache.get('counter'))
+        with self.assertRaises(ValueError):
+            self.cache.incr('counter')
@@ -0,0 +1,123 @@
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import OperationalError
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from core import circuit
+from posts.models import Group
+from posts.versions import bump
+
+
+@override_settings(BREAKER_FAILURE_THRESHOLD=2, BREAKER_RESET_TIMEOUT=0)
+class StaleIfErrorTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        circuit.database_breaker.record_success()
+        self.addCleanup(circuit.database_breaker.record_success)
+        self.request = RequestFactory().get('/')
+        self.request.user = AnonymousUser()
+        self.view = mock.Mock(return_value=HttpResponse('good'))
+        self.wrapped = circuit.stale_if_error(self.view)
+
+    def test_last_good_render_is_served_on_error(self):
+        """При ошибке БД отдаётся последняя удачная страница с заголовком."""
+        self.wrapped(self.request)
+        self.view.side_effect = OperationalError('database is locked')
+        response = self.wrapped(self.request)
+        self.assertEqual(response.content, b'good')
+        self.assertIn(circuit.STALE_HEADER, response)
+
+    def test_unchanged_page_is_stored_once(self):
+        """Копия перезаписывается, только когда страница изменилась."""
+        with mock.patch.object(
+            circuit.cache, 'set_many', wraps=circuit.cache.set_many
+        ) as set_many:
+            self.wrapped(self.request)
+            self.wrapped(self.request)
+            self.assertEqual(set_many.call_count, 1)
+            self.view.return_value = HttpResponse('changed')
+            self.wrapped(self.request)
+            self.assertEqual(set_many.call_count, 2)
+
+    def test_user_pages_are_not_stored(self):
+        """Страница пользователя не сохраняется, при ошибке ему отдаётся
+        гостевая копия."""
+        request = RequestFactory().get('/')
+        request.user = SimpleNamespace(pk=1, is_authenticated=True)
+        self.view.return_value = HttpResponse('private')
+        self.wrapped(request)
+        self.view.side_effect = OperationalError('database is locked')
+        self.assertEqual(self.wrapped(request).status_code, 503)
+        self.view.side_effect = None
+        self.view.return_value = HttpResponse('public')
+        self.wrapped(self.request)
+        self.view.side_effect = OperationalError('database is locked')
+        self.assertEqual(self.wrapped(request).content, b'public')
+
+    def test_without_stale_copy_returns_503(self):
+        """Без сохранённой копии отдаётся 503 с Retry-After."""
+        self.view.side_effect = OperationalError('database is locked')
+        response = self.wrapped(self.request)
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('Retry-After', response)
+
+    @override_settings(BREAKER_RESET_TIMEOUT=60)
+    def test_open_breaker_fails_fast(self):
+        """Разомкнутый автомат не вызывает представление."""
+        self.view.side_effect = OperationalError('database is locked')
+        self.wrapped(self.request)
+        self.wrapped(self.request)
+        self.assertEqual(circuit.database_breaker.state, circuit.OPEN)
+        self.view.reset_mock()
+        self.wrapped(self.request)
+        self.view.assert_not_called()
+
+    def test_successful_probe_closes_breaker(self):
+        """Удачная проба после паузы замыкает автомат."""
+        self.view.side_effect = OperationalError('database is locked')
+        self.wrapped(self.request)
+        self.wrapped(self.request)
+        self.view.side_effect = None
+        self.assertEqual(self.wrapped(self.request).content, b'good')
+        self.assertEqual(circuit.database_breaker.state, circuit.CLOSED)
+
+
+@override_settings(BREAKER_FAILURE_THRESHOLD=1, BREAKER_RESET_TIMEOUT=0)
+class StaleCopyCachingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.group = Group.objects.create(
+            title='TestGroup', slug='test_slug', description='Description'
+        )
+
+    def setUp(self):
+        cache.clear()
+        circuit.database_breaker.record_success()
+        self.addCleanup(circuit.database_breaker.record_success)
+        self.url = reverse('posts:group_list', args=[self.group.slug])
+
+    def test_stale_copy_is_not_cached_after_recovery(self):
+        """Старая копия уходит без ETag и не остаётся в кэше страниц
+        после восстановления БД."""
+        Client().get(self.url)
+        bump(f'group:{self.group.slug}')
+        with mock.patch(
+            'posts.views.get_object_or_404',
+            side_effect=OperationalError('database is locked')
+        ):
+            stale = Client().get(self.url)
+        self.assertIn(circuit.STALE_HEADER, stale)
+        self.assertNotIn('ETag', stale)
+        self.assertNotIn('Last-Modified', stale)
+        self.assertIn('no-store', stale['Cache-Control'])
+        response = Client().get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(circuit.STALE_HEADER, response)
+        self.assertNotIn('X-Page-Cache', response)
+        self.assertIn('ETag', response)
@@ -0,0 +1,70 @@
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.test import SimpleTestCase, TestCase
+
+from core.db import retry_on_locked, write_transaction
+
+
+class SQLitePragmasTests(TestCase):
+    def test_pragmas_are_applied_to_new_connections(self):
+        """Соединение с SQLite получает настройки из SQLITE_PRAGMAS."""
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            busy_timeout = cursor.fetchone()[0]
+            cursor.execute('PRAGMA cache_size')
+            cache_size = cursor.fetchone()[0]
+        self.assertEqual(
+            busy_timeout, settings.SQLITE_PRAGMAS['busy_timeout']
+        )
+        self.assertEqual(cache_size, settings.SQLITE_PRAGMAS['cache_size'])
+
+
+class RetryOnLockedTests(SimpleTestCase):
+    def test_locked_writes_are_retried(self):
+        """Запись повторяется, пока БД заблокирована."""
+        func = mock.Mock(side_effect=[
+            OperationalError('database is locked'),
+            OperationalError('database is locked'),
+            'saved',
+        ])
+        self.assertEqual(retry_on_locked(func, backoff=0), 'saved')
+        self.assertEqual(func.call_count, 3)
+
+    def test_other_errors_are_not_retried(self):
+        """Ошибки, не связанные с блокировкой, пробрасываются сразу."""
+        func = mock.Mock(side_effect=OperationalError('no such table'))
+        with self.assertRaises(OperationalError):
+            retry_on_locked(func, backoff=0)
+        self.assertEqual(func.call_count, 1)
+
+    def test_total_wait_is_capped(self):
+        """Паузы между повторами в сумме не дольше max_wait."""
+        func = mock.Mock(side_effect=OperationalError('database is locked'))
+        with mock.patch('core.db.time.sleep') as sleep:
+            with self.assertRaises(OperationalError):
+                retry_on_locked(func, retries=10, backoff=0.1, max_wait=0.5)
+        waited = sum(args[0] for args, _ in sleep.call_args_list)
+        self.assertAlmostEqual(waited, 0.5)
+        self.assertLess(func.call_count, 11)
+
+    def test_transaction_uses_target_alias(self):
+        """Транзакция открывается в БД, куда идёт запись."""
+        func = mock.Mock(return_value='saved')
+        with mock.patch('core.db.transaction.atomic') as atomic, \
+                mock.patch('core.db.in_transaction', return_value=False):
+            result = write_transaction(func, using='replica')('post')
+        atomic.assert_called_once_with(using='replica')
+        func.assert_called_once_with('post')
+        self.assertEqual(result, 'saved')
+
+    def test_stress_command_reports_both_modes(self):
+        """sqlite_stress печатает долю блокировок до и после настройки."""
+        out = StringIO()
+        call_command('sqlite_stress', threads=2, transactions=5, stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[2].startswith('production'))
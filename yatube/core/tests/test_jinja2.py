@@ -0,0 +1,80 @@
+from datetime import datetime, timezone
+from unittest import skipIf
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template import engines
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Group, Post, User
+
+try:
+    import jinja2
+except ImportError:
+    jinja2 = None
+
+if jinja2 is not None:
+    from core.jinja2 import get_engine
+    from core.management.commands.render_benchmark import (
+        cases, make_request, normalize
+    )
+
+
+@skipIf(jinja2 is None, 'Jinja2 не установлен')
+class Jinja2TemplatesTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='TestUserAuthor')
+        cls.group = Group.objects.create(
+            title='TestGroup',
+            slug='test_slug',
+            description='TestDescription'
+        )
+        cls.post = Post.objects.create(
+            author=cls.author, text='TestText', group=cls.group
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_same_output(self):
+        """Шаблоны Jinja2 рисуют то же, что и шаблоны Django."""
+        for name, path, context in cases():
+            with self.subTest(name=name):
+                request = make_request(path)
+                self.assertEqual(
+                    normalize(get_engine().get_template(name).render(
+                        dict(context), request
+                    )),
+                    normalize(engines['django'].get_template(name).render(
+                        dict(context), request
+                    ))
+                )
+
+    @override_settings(TIME_ZONE='Europe/Moscow')
+    def test_date_in_current_timezone(self):
+        """Фильтр date показывает время в текущем часовом поясе."""
+        value = datetime(2021, 1, 1, 12, 0, tzinfo=timezone.utc)
+        rendered = get_engine().from_string(
+            "{{ value|date('H:i') }}"
+        ).render({'value': value})
+        self.assertEqual(rendered, '15:00')
+        self.assertEqual(
+            rendered,
+            engines['django'].from_string(
+                '{{ value|date:"H:i" }}'
+            ).render({'value': value})
+        )
+
+    def test_fallback_to_django(self):
+        """С Jinja2 ленты рисует он, остальные страницы — Django."""
+        with override_settings(
+            TEMPLATES=[settings.JINJA2_ENGINE, *settings.TEMPLATES]
+        ):
+            client = Client()
+            response = client.get(reverse('posts:index'))
+            self.assertContains(response, self.post.text)
+            response = client.get(reverse('about:author'))
+            self.assertEqual(response.status_code, 200)
@@ -0,0 +1,93 @@
+import shutil
+import tempfile
+import tracemalloc
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core import memory
+
+User = get_user_model()
+TEMP_SNAPSHOT_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(
+    MEMORY_TRACKING=True,
+    MEMORY_SNAPSHOT_ROOT=TEMP_SNAPSHOT_ROOT
+)
+class MemoryTrackingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.staff = User.objects.create_user(
+            username='TestStaff',
+            is_staff=True
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_SNAPSHOT_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.staff_client = Client()
+        self.staff_client.force_login(self.staff)
+        memory.reset_view_stats()
+
+    def tearDown(self):
+        tracemalloc.stop()
+
+    def test_view_allocations_are_recorded(self):
+        """Пик и прирост памяти записываются по имени view."""
+        self.staff_client.get('/about/author/')
+        response = self.staff_client.get(reverse('core:memory_stats'))
+        views = {row['view']: row for row in response.context['views']}
+        self.assertEqual(views['about:author']['requests'], 1)
+        self.assertGreater(views['about:author']['max_peak'], 0)
+
+    def test_track_without_reset_peak(self):
+        """Без tracemalloc.reset_peak (Python < 3.9) считается только
+        прирост, а выделения процесса не стираются."""
+        with mock.patch.object(memory, 'tracemalloc') as patched:
+            patched.get_traced_memory.side_effect = [(100, 400), (250, 400)]
+            del patched.reset_peak
+            result, net, peak = memory.track(lambda: 'done')
+        patched.clear_traces.assert_not_called()
+        self.assertEqual((result, net, peak), ('done', 150, None))
+        memory.record('about:author', net, peak)
+        response = self.staff_client.get(reverse('core:memory_stats'))
+        views = {row['view']: row for row in response.context['views']}
+        self.assertEqual(views['about:author']['avg_net'], 150)
+        self.assertIsNone(views['about:author']['max_peak'])
+        self.assertContains(response, '<td>—</td>')
+
+    def test_snapshots_can_be_compared(self):
+        """Два снимка сравниваются по месту выделения памяти."""
+        for _ in range(2):
+            self.staff_client.post(reverse('core:memory_snapshot'))
+        second, first = memory.list_snapshots()
+        response = self.staff_client.get(
+            reverse('core:memory_diff'),
+            {'first': first, 'second': second}
+        )
+        self.assertEqual(response.status_code, 200)
+        response = self.staff_client.get(
+            reverse('core:memory_diff'),
+            {'first': first, 'second': 'missing'}
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_benchmark_reports_memory(self):
+        """Вывод benchmark содержит время, запросы к БД и память."""
+        out = StringIO()
+        call_command(
+            'benchmark', '/about/author/', requests=2, warmup=0, stdout=out
+        )
+        header, row = out.getvalue().splitlines()
+        self.assertIn('peak KiB', header)
+        self.assertTrue(row.startswith('/about/author/'))
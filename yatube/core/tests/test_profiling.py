@@ -0,0 +1,84 @@
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core import profiling
+
+User = get_user_model()
+TEMP_PROFILING_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(PROFILING_ROOT=TEMP_PROFILING_ROOT)
+class ProfilingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.staff = User.objects.create_user(
+            username='TestStaff',
+            is_staff=True
+        )
+        cls.user = User.objects.create_user(username='TestUser')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_PROFILING_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.staff_client = Client()
+        self.staff_client.force_login(self.staff)
+        self.user_client = Client()
+        self.user_client.force_login(self.user)
+
+    def profile_page(self, client):
+        return client.get(
+            '/about/author/', {settings.PROFILING_QUERY_PARAM: 1}
+        )
+
+    def test_staff_request_is_profiled(self):
+        """Запрос staff с флагом сохраняет отчёт, доступный в списке."""
+        response = self.profile_page(self.staff_client)
+        report_id = response['X-Profile-Report']
+        detail_url = reverse('core:profile_detail', args=(report_id,))
+        response = self.staff_client.get(reverse('core:profile_list'))
+        self.assertContains(response, detail_url)
+        response = self.staff_client.get(detail_url)
+        self.assertEqual(response.context['report']['url'], (
+            f'/about/author/?{settings.PROFILING_QUERY_PARAM}=1'
+        ))
+        self.assertTrue(response.context['functions'])
+        response = self.staff_client.get(
+            reverse('core:profile_download', args=(report_id,))
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_non_staff_request_is_not_profiled(self):
+        """Флаг профилирования игнорируется для обычных пользователей."""
+        response = self.profile_page(self.user_client)
+        self.assertFalse(response.has_header('X-Profile-Report'))
+        response = self.user_client.get(reverse('core:profile_list'))
+        self.assertEqual(response.status_code, 302)
+
+    def test_unknown_report_returns_404(self):
+        """Несуществующий отчёт возвращает 404."""
+        response = self.staff_client.get(
+            reverse('core:profile_detail', args=('20200101-000000-000000',))
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_removed_report_file_returns_404(self):
+        """Отчёт из индекса без файла статистики отдаёт 404, а не 500."""
+        response = self.profile_page(self.staff_client)
+        report_id = response['X-Profile-Report']
+        os.remove(profiling.report_path(report_id))
+        for name in ('core:profile_detail', 'core:profile_download'):
+            with self.subTest(name=name):
+                response = self.staff_client.get(
+                    reverse(name, args=(report_id,))
+                )
+                self.assertEqual(response.status_code, 404)
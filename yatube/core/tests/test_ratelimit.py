@@ -0,0 +1,59 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core import ratelimit
+from posts.models import Comment, Post, User
+
+
+@override_settings(RATELIMIT_ENABLED=True, RATELIMITS={'comment': (2, 60)})
+class RateLimitTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='TestUserAuthor')
+        cls.post = Post.objects.create(author=cls.author, text='TestText')
+
+    def setUp(self):
+        cache.clear()
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+        self.url = reverse(
+            'posts:add_comment', kwargs={'post_id': self.post.id}
+        )
+
+    def test_comments_over_limit_get_429(self):
+        """Сверх ёмкости корзины запись отклоняется с 429."""
+        for _ in range(2):
+            self.author_client.post(self.url, data={'text': 'TestComment'})
+        response = self.author_client.post(
+            self.url, data={'text': 'TestComment'}
+        )
+        self.assertEqual(response.status_code, 429)
+        self.assertTemplateUsed(response, 'core/429.html')
+        self.assertIn('Retry-After', response)
+        self.assertEqual(Comment.objects.count(), 2)
+
+    def test_window_slides_over_time(self):
+        """Предыдущее окно учитывается долей, ещё не вышедшей из
+        скользящего окна."""
+        with mock.patch.object(ratelimit.time, 'time', return_value=0):
+            for _ in range(2):
+                self.assertEqual(ratelimit.take_token('comment', 'ip:1'), 0)
+            self.assertEqual(ratelimit.take_token('comment', 'ip:1'), 60)
+        with mock.patch.object(ratelimit.time, 'time', return_value=60):
+            self.assertEqual(ratelimit.take_token('comment', 'ip:1'), 30)
+        with mock.patch.object(ratelimit.time, 'time', return_value=90):
+            self.assertEqual(ratelimit.take_token('comment', 'ip:1'), 0)
+            self.assertEqual(ratelimit.take_token('comment', 'ip:1'), 30)
+
+    def test_concurrent_requests_share_the_limit(self):
+        """Одновременные запросы не проходят сверх лимита."""
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            waits = list(executor.map(
+                lambda _: ratelimit.take_token('comment', 'ip:2'), range(16)
+            ))
+        self.assertEqual(waits.count(0), 2)
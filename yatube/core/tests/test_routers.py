@@ -0,0 +1,102 @@
+import os
+import sqlite3
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.test import Client, SimpleTestCase, TestCase
+from django.urls import reverse
+
+from core import routers
+from core.db import backup_sqlite
+from posts.models import Post
+
+User = get_user_model()
+
+
+class PrimaryReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = routers.PrimaryReplicaRouter()
+        patcher = mock.patch.object(
+            routers, 'replica_available', return_value=True
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(routers.end_request)
+
+    def test_reads_go_to_replica_and_writes_to_primary(self):
+        """Чтения постов идут в реплику, записи и чтения auth — в default."""
+        routers.start_request(pinned=False)
+        self.assertEqual(
+            self.router.db_for_read(Post), settings.REPLICA_DATABASE
+        )
+        self.assertIsNone(self.router.db_for_read(User))
+        self.assertEqual(self.router.db_for_write(Post), DEFAULT_DB_ALIAS)
+        self.assertTrue(routers.has_written())
+
+    def test_pinned_request_reads_from_primary(self):
+        """После записи чтения закреплены за основной БД."""
+        routers.start_request(pinned=True)
+        self.assertEqual(self.router.db_for_read(Post), DEFAULT_DB_ALIAS)
+
+    def test_changes_after_refresh_read_primary(self):
+        """Изменение после последней копии реплики читается из default."""
+        with mock.patch.object(routers, 'cache') as patched:
+            patched.get.return_value = 100.0
+            routers.start_request(pinned=False)
+            routers.pin_if_replica_behind(50.0)
+            self.assertEqual(
+                self.router.db_for_read(Post), settings.REPLICA_DATABASE
+            )
+            routers.pin_if_replica_behind(100.5)
+            self.assertEqual(self.router.db_for_read(Post), DEFAULT_DB_ALIAS)
+        self.assertFalse(routers.has_written())
+
+    def test_replica_is_not_migrated(self):
+        """Миграции не применяются к реплике."""
+        self.assertFalse(
+            self.router.allow_migrate(settings.REPLICA_DATABASE, 'posts')
+        )
+
+    def test_backup_copies_primary(self):
+        """Реплика обновляется копией основной БД."""
+        with tempfile.TemporaryDirectory() as directory:
+            source = os.path.join(directory, 'primary.sqlite3')
+            target = os.path.join(directory, 'replica.sqlite3')
+            with sqlite3.connect(source) as connection:
+                connection.execute('CREATE TABLE post (text TEXT)')
+                connection.execute("INSERT INTO post VALUES ('text')")
+            connection.close()
+            backup_sqlite(source, target)
+            connection = sqlite3.connect(target)
+            self.assertEqual(
+                connection.execute('SELECT text FROM post').fetchall(),
+                [('text',)]
+            )
+            connection.close()
+
+
+class ReplicaStickinessTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='TestUserAuthor')
+        cls.post = Post.objects.create(author=cls.author, text='TestText')
+
+    def setUp(self):
+        cache.clear()
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+
+    def test_write_sets_sticky_cookie(self):
+        """После комментария выставляется кука закрепления за default."""
+        response = self.author_client.post(
+            reverse('posts:add_comment', kwargs={'post_id': self.post.id}),
+            data={'text': 'TestComment'}
+        )
+        self.assertIn(settings.REPLICA_STICKY_COOKIE, response.cookies)
+        response = self.author_client.get(reverse('posts:index'))
+        self.assertNotIn(settings.REPLICA_STICKY_COOKIE, response.cookies)
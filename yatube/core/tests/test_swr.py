@@ -0,0 +1,128 @@
+import time
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.utils.cache import get_cache_key
+
+from core import swr
+
+
+@override_settings(
+    CACHES={
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'test_swr',
+        },
+    },
+    SWR_BACKGROUND_REFRESH=False,
+    SWR_LOCK_WAIT=0.1
+)
+class StaleWhileRevalidateTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.compute = mock.Mock(side_effect=['first', 'second', 'third'])
+
+    def test_fresh_value_is_computed_once(self):
+        """Свежее значение считается один раз."""
+        for _ in range(3):
+            self.assertEqual(
+                swr.get_or_refresh('key', self.compute, 10, 10), 'first'
+            )
+        self.assertEqual(self.compute.call_count, 1)
+
+    def test_stale_value_is_served_while_locked(self):
+        """Пока один запрос пересчитывает запись, остальным отдаётся старая."""
+        swr.store('key', 'stale', 10, 10)
+        cache.set('key', (time.time() - 1, 'stale'))
+        self.assertTrue(swr.acquire('key'))
+        self.assertEqual(
+            swr.get_or_refresh('key', self.compute, 10, 10), 'stale'
+        )
+        self.compute.assert_not_called()
+        swr.release('key')
+        self.assertEqual(
+            swr.get_or_refresh('key', self.compute, 10, 10), 'first'
+        )
+        self.assertEqual(
+            swr.get_or_refresh('key', self.compute, 10, 10), 'first'
+        )
+
+    def test_miss_waits_for_lock_holder(self):
+        """При промахе без замка запрос ждёт чужой результат."""
+        self.assertTrue(swr.acquire('key'))
+        with mock.patch.object(
+            swr.time, 'sleep', side_effect=lambda _: swr.store(
+                'key', 'computed', 10, 10
+            )
+        ):
+            self.assertEqual(
+                swr.get_or_refresh('key', self.compute, 10, 10), 'computed'
+            )
+        self.compute.assert_not_called()
+
+
+def run_inline(target, daemon):
+    return SimpleNamespace(start=target)
+
+
+@override_settings(
+    CACHES={
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'test_swr_pages',
+        },
+    },
+    SWR_BACKGROUND_REFRESH=True
+)
+class BackgroundRefreshTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.requests = []
+        self.view = swr.cache_page_swr(10, 10, key_prefix='test')(
+            self.render
+        )
+        patcher = mock.patch.object(
+            swr.threading, 'Thread', side_effect=run_inline
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def render(self, request):
+        self.requests.append(request)
+        return HttpResponse(f'page {request.GET.get("page")}')
+
+    def make_request(self, **cookies):
+        request = RequestFactory().get('/', {'page': 2})
+        request.user = SimpleNamespace(is_authenticated=True)
+        request.COOKIES.update(cookies)
+        return request
+
+    def expire(self, request):
+        key = get_cache_key(request, 'test', 'GET', cache=cache)
+        fresh_until, response = cache.get(key)
+        cache.set(key, (time.time() - 1, response))
+
+    def test_background_refresh_uses_new_anonymous_request(self):
+        """Фоновый поток рисует страницу своим анонимным запросом."""
+        request = self.make_request()
+        self.view(request)
+        self.expire(request)
+        response = self.view(request)
+        self.assertEqual(len(self.requests), 2)
+        fresh = self.requests[1]
+        self.assertIsNot(fresh, request)
+        self.assertIsInstance(fresh.user, AnonymousUser)
+        self.assertEqual(fresh.get_full_path(), '/?page=2')
+        self.assertEqual(response.content, b'page 2')
+
+    def test_requests_with_cookies_refresh_in_place(self):
+        """Запись посетителя с cookies пересчитывается в его запросе."""
+        request = self.make_request(sessionid='session')
+        self.view(request)
+        self.expire(request)
+        self.view(request)
+        self.assertEqual(self.requests, [request, request])
@@ -0,0 +1,71 @@
+import gc
+import importlib
+import sys
+from unittest import mock
+
+from django.template import engines
+from django.test import SimpleTestCase
+
+from core.warmup import template_names, warmup
+
+
+class WarmupTests(SimpleTestCase):
+    def tearDown(self):
+        gc.unfreeze()
+
+    def test_warmup_steps(self):
+        """Прогрев компилирует все шаблоны и замораживает сборщик."""
+        report = {name: result for name, _, result in warmup()}
+        self.assertEqual(
+            list(report), ['templates', 'urls', 'images', 'gc']
+        )
+        names = [
+            set(template_names(engine.dirs)) for engine in engines.all()
+        ]
+        self.assertIn('posts/index.html', names[-1])
+        self.assertEqual(
+            report['templates'], f'{sum(map(len, names))} шаблонов'
+        )
+        self.assertGreater(gc.get_freeze_count(), 0)
+
+
+PRODUCTION_ENVIRON = {
+    'DJANGO_SECRET_KEY': 'production-secret',
+    'DJANGO_ALLOWED_HOSTS': 'yatube.example,www.yatube.example',
+}
+
+
+def import_production(environ):
+    sys.modules.pop('yatube.settings_production', None)
+    with mock.patch.dict('os.environ', environ):
+        return importlib.import_module('yatube.settings_production')
+
+
+class ProductionSettingsTests(SimpleTestCase):
+    def test_production_settings(self):
+        """Боевые настройки без DEBUG и с кэширующим загрузчиком."""
+        production = import_production(PRODUCTION_ENVIRON)
+        self.assertEqual(production.SECRET_KEY, 'production-secret')
+        self.assertEqual(
+            production.ALLOWED_HOSTS, ['yatube.example', 'www.yatube.example']
+        )
+        self.assertFalse(production.DEBUG)
+        self.assertTrue(production.WARMUP_ON_START)
+        options = production.TEMPLATES[0]['OPTIONS']
+        self.assertEqual(
+            options['loaders'][0][0], 'django.template.loaders.cached.Loader'
+        )
+        self.assertNotIn(
+            'django.template.context_processors.debug',
+            options['context_processors']
+        )
+
+    def test_secrets_are_required(self):
+        """Без ключа или хостов в окружении боевые настройки не грузятся."""
+        for name in PRODUCTION_ENVIRON:
+            environ = dict(PRODUCTION_ENVIRON)
+            del environ[name]
+            with self.subTest(name=name), \
+                    mock.patch.dict('os.environ', clear=True):
+                with self.assertRaises(KeyError):
+                    import_production(environ)
@@ -0,0 +1,24 @@
+from django.urls import path
+
+from core import views
+
+app_name = 'core'
+
+urlpatterns = [
+    path('profiles/', views.profile_list, name='profile_list'),
+    path(
+        'profiles/<str:report_id>/',
+        views.profile_detail,
+        name='profile_detail'
+    ),
+    path(
+        'profiles/<str:report_id>/download/',
+        views.profile_download,
+        name='profile_download'
+    ),
+    path('memory/', views.memory_stats, name='memory_stats'),
+    path('memory/snapshot/', views.memory_snapshot, name='memory_snapshot'),
+    path('memory/diff/', views.memory_diff, name='memory_diff'),
+    path('cache/', views.cache_stats, name='cache_stats'),
+    path('admission/', views.admission_stats, name='admission_stats'),
+]
@@ -1,4 +1,11 @@
-from django.shortcuts import render
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.cache import caches
+from django.http import FileResponse, Http404
+from django.shortcuts import redirect, render
+from django.views.decorators.http import require_POST
+
+from core import admission, memory, profiling
 
 
 def page_not_found(request, exception):
@@ -9,9 +16,126 @@ def server_error(request):
     return render(request, 'core/500.html', status=500)
 
 
+def service_unavailable(request, retry_after):
+    response = render(
+        request, 'core/503.html', {'retry_after': retry_after}, status=503
+    )
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+def too_many_requests(request, retry_after):
+    response = render(
+        request, 'core/429.html', {'retry_after': retry_after}, status=429
+    )
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
 def permission_denied(request, exception):
     return render(request, 'core/403.html', status=403)
 
 
 def csrf_failure(request, reason=''):
     return render(request, 'core/403csrf.html')
+
+
+@staff_member_required
+def profile_list(request):
+    template = 'core/profile_list.html'
+    context = {
+        'reports': profiling.list_reports(),
+        'query_param': settings.PROFILING_QUERY_PARAM,
+    }
+    return render(request, template, context)
+
+
+@staff_member_required
+def profile_detail(request, report_id):
+    template = 'core/profile_detail.html'
+    report = profiling.get_report(report_id)
+    if report is None:
+        raise Http404
+    limit = request.GET.get('limit', '')
+    if not limit.isdigit():
+        limit = settings.PROFILING_TOP_FUNCTIONS
+    try:
+        total_time, functions = profiling.top_functions(
+            report_id, int(limit)
+        )
+    except FileNotFoundError:
+        raise Http404
+    context = {
+        'report': report,
+        'total_time': total_time,
+        'functions': functions,
+    }
+    return render(request, template, context)
+
+
+@staff_member_required
+def profile_download(request, report_id):
+    if profiling.get_report(report_id) is None:
+        raise Http404
+    try:
+        stats = open(profiling.report_path(report_id), 'rb')
+    except FileNotFoundError:
+        raise Http404
+    return FileResponse(
+        stats,
+        as_attachment=True,
+        filename=f'{report_id}{profiling.STATS_SUFFIX}'
+    )
+
+
+@staff_member_required
+def memory_stats(request):
+    template = 'core/memory_stats.html'
+    context = {
+        'tracking': settings.MEMORY_TRACKING,
+        'views': memory.view_stats(),
+        'snapshots': memory.list_snapshots(),
+    }
+    return render(request, template, context)
+
+
+@staff_member_required
+@require_POST
+def memory_snapshot(request):
+    memory.take_snapshot()
+    return redirect('core:memory_stats')
+
+
+@staff_member_required
+def memory_diff(request):
+    template = 'core/memory_diff.html'
+    first = request.GET.get('first', '')
+    second = request.GET.get('second', '')
+    sites = memory.compare_snapshots(
+        first, second, settings.MEMORY_TOP_SITES
+    )
+    if sites is None:
+        raise Http404
+    context = {
+        'first': first,
+        'second': second,
+        'sites': sites,
+    }
+    return render(request, template, context)
+
+
+@staff_member_required
+def cache_stats(request):
+    template = 'core/cache_stats.html'
+    backends = [
+        dict(caches[alias].stats(), alias=alias)
+        for alias in settings.CACHES
+        if hasattr(caches[alias], 'stats')
+    ]
+    return render(request, template, {'backends': backends})
+
+
+@staff_member_required
+def admission_stats(request):
+    template = 'core/admission_stats.html'
+    return render(request, template, {'groups': admission.stats()})
@@ -0,0 +1,88 @@
+"""Прогрев процесса до первого запроса.
+
+Компилирует шаблоны из DIRS каждого движка (с кэширующим загрузчиком
+и в Jinja2 они остаются в памяти), заполняет резолвер URL, загружает
+PIL и sorl-thumbnail и замораживает сборщик мусора. Если вызвать
+warmup() в мастер-процессе до fork (gunicorn --preload), прогретые
+объекты достаются воркерам через copy-on-write, а gc.freeze() не даёт
+сборщику трогать их заголовки и копировать страницы.
+"""
+import gc
+import os
+import time
+
+from django.template import engines
+from django.urls import get_resolver
+
+TEMPLATE_EXTENSIONS = ('.html', '.txt')
+
+
+def template_names(directories):
+    for directory in directories:
+        for root, _, files in os.walk(directory):
+            for name in files:
+                if name.endswith(TEMPLATE_EXTENSIONS):
+                    path = os.path.join(root, name)
+                    yield os.path.relpath(path, directory).replace(
+                        os.sep, '/'
+                    )
+
+
+def compile_templates():
+    """Компилирует шаблоны из DIRS каждого движка его же загрузчиком."""
+    count = 0
+    for engine in engines.all():
+        names = sorted(set(template_names(engine.dirs)))
+        for name in names:
+            engine.get_template(name)
+        count += len(names)
+    return f'{count} шаблонов'
+
+
+def populate_resolver(resolver):
+    """Заполняет резолвер и вложенные пространства имён."""
+    count = len(resolver.reverse_dict)
+    for _, namespace in resolver.namespace_dict.values():
+        count += populate_resolver(namespace)
+    return count
+
+
+def populate_urls():
+    return f'{populate_resolver(get_resolver())} записей резолвера'
+
+
+def load_image_libraries():
+    from PIL import Image
+    from sorl.thumbnail import default
+
+    Image.init()
+    # Обращение к атрибуту ленивого объекта sorl создаёт его.
+    backends = [
+        getattr(default, name).__class__.__name__
+        for name in ('engine', 'kvstore', 'storage')
+    ]
+    return ', '.join(backends)
+
+
+def freeze_gc():
+    gc.collect()
+    gc.freeze()
+    return f'{gc.get_freeze_count()} объектов'
+
+
+STEPS = (
+    ('templates', compile_templates),
+    ('urls', populate_urls),
+    ('images', load_image_libraries),
+    ('gc', freeze_gc),
+)
+
+
+def warmup():
+    """Выполняет шаги прогрева; возвращает [(шаг, секунды, итог)]."""
+    report = []
+    for name, step in STEPS:
+        started = time.perf_counter()
+        result = step()
+        report.append((name, time.perf_counter() - started, result))
+    return report
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from posts.models import Post, Group, Follow, Comment
+from posts.models import Post, Group, Follow, Comment, AuthorShard
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -32,7 +32,15 @@ class CommentAdmin(admin.ModelAdmin):
     empty_value_display = '-пусто-'
 
 
+class AuthorShardAdmin(admin.ModelAdmin):
+    list_display = ('author', 'shard')
+    search_fields = ('author__username',)
+    list_filter = ('shard',)
+    empty_value_display = '-пусто-'
+
+
 admin.site.register(Post, PostAdmin)
 admin.site.register(Group, GroupAdmin),
 admin.site.register(Follow, FollowAdmin)
 admin.site.register(Comment, CommentAdmin)
+admin.site.register(AuthorShard, AuthorShardAdmin)
@@ -1,5 +1,34 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_save
 
 
 class PostsConfig(AppConfig):
     name = 'posts'
+
+    def ready(self):
+        from posts import (
+            archive, group_stats, polling, sharding, versions, warming
+        )
+        from posts.models import Comment, Follow, Group, Post
+
+        for model in sharding.SHARDED_MODELS:
+            pre_save.connect(sharding.assign_global_id, sender=model)
+        connection_created.connect(sharding.disable_foreign_keys)
+
+        pre_save.connect(versions.remember_group, sender=Post)
+        for model, receiver in (
+            (Post, versions.post_changed),
+            (Comment, versions.comment_changed),
+            (Follow, versions.follow_changed),
+            (Group, versions.group_changed),
+        ):
+            post_save.connect(receiver, sender=model)
+            post_delete.connect(receiver, sender=model)
+        for model in sharding.SHARDED_MODELS:
+            post_save.connect(warming.post_written, sender=model)
+        post_save.connect(polling.post_created, sender=Post)
+        post_save.connect(group_stats.post_changed, sender=Post)
+        post_delete.connect(group_stats.post_deleted, sender=Post)
+        post_save.connect(archive.post_changed, sender=Post)
+        post_delete.connect(archive.post_deleted, sender=Post)
@@ -0,0 +1,132 @@
+"""Архивы постов по годам, месяцам и дням.
+
+Посты периода выбираются диапазоном pub_date, а не __year/__month:
+так запрос идёт по составным индексам (pub_date, id),
+(group, pub_date) и (author, pub_date). Гистограмма числа постов по
+месяцам для навигации хранится в кэше: список месяцев области и
+отдельный счётчик на каждый месяц. Новый пост увеличивает счётчик
+через incr, удалённый уменьшает; пост в месяце, которого нет в
+списке, сбрасывает гистограмму, и она пересчитывается при чтении.
+"""
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import Http404
+from django.utils import timezone
+
+from posts.sharding import shard_querysets
+
+MONTH_FORMAT = '%Y-%m'
+
+
+def period_bounds(year, month=None, day=None):
+    """Начало и конец периода в текущем часовом поясе."""
+    try:
+        start = datetime(year, month or 1, day or 1)
+        if day is not None:
+            end = start + timedelta(days=1)
+        elif month is not None:
+            end = (start + timedelta(days=31)).replace(day=1)
+        else:
+            end = start.replace(year=year + 1)
+    except (OverflowError, ValueError):
+        raise Http404
+    return timezone.make_aware(start), timezone.make_aware(end)
+
+
+def in_period(queryset, year, month=None, day=None):
+    start, end = period_bounds(year, month, day)
+    return queryset.filter(pub_date__gte=start, pub_date__lt=end)
+
+
+def month_of(moment):
+    return timezone.localtime(moment).strftime(MONTH_FORMAT)
+
+
+def months_key(scope):
+    return f'posts:archive:{scope}:months'
+
+
+def count_key(scope, month):
+    return f'posts:archive:{scope}:{month}'
+
+
+def post_scopes(post, group_id=None):
+    scopes = ['feed', f'author:{post.author_id}']
+    if group_id:
+        scopes.append(f'group:{group_id}')
+    return scopes
+
+
+def build_histogram(scope, queryset):
+    counts = {}
+    for part in shard_querysets(queryset):
+        for moment in part.values_list('pub_date', flat=True).iterator():
+            month = month_of(moment)
+            counts[month] = counts.get(month, 0) + 1
+    timeout = settings.ARCHIVE_HISTOGRAM_TIMEOUT
+    cache.set_many(
+        {count_key(scope, month): count for month, count in counts.items()},
+        timeout
+    )
+    cache.set(months_key(scope), sorted(counts), timeout)
+    return counts
+
+
+def histogram(scope, queryset):
+    """{'ГГГГ-ММ': число постов} области scope, queryset — её посты."""
+    months = cache.get(months_key(scope))
+    if months is None:
+        return build_histogram(scope, queryset)
+    keys = {count_key(scope, month): month for month in months}
+    counts = cache.get_many(keys)
+    if len(counts) < len(keys):
+        return build_histogram(scope, queryset)
+    return {keys[key]: count for key, count in counts.items() if count}
+
+
+def histogram_years(counts):
+    """[(год, [(месяц, число), ...]), ...] от новых к старым."""
+    years = {}
+    for month, count in sorted(counts.items(), reverse=True):
+        year, number = map(int, month.split('-'))
+        years.setdefault(year, []).append((number, count))
+    return list(years.items())
+
+
+def adjust(scope, month, delta):
+    months = cache.get(months_key(scope))
+    if months is None:
+        return
+    if month not in months:
+        # Без замка новый месяц в список не добавить, проще пересчитать;
+        # это бывает раз в месяц на область.
+        cache.delete(months_key(scope))
+        return
+    try:
+        cache.incr(count_key(scope, month), delta)
+    except ValueError:
+        cache.delete(months_key(scope))
+
+
+def post_changed(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    month = month_of(instance.pub_date)
+    if created:
+        for scope in post_scopes(instance, instance.group_id):
+            adjust(scope, month, 1)
+        return
+    previous = getattr(instance, '_previous_group_id', None)
+    if previous != instance.group_id:
+        if previous:
+            adjust(f'group:{previous}', month, -1)
+        if instance.group_id:
+            adjust(f'group:{instance.group_id}', month, 1)
+
+
+def post_deleted(sender, instance, **kwargs):
+    month = month_of(instance.pub_date)
+    for scope in post_scopes(instance, instance.group_id):
+        adjust(scope, month, -1)
@@ -0,0 +1,158 @@
+"""Счётчики просмотров постов с отложенной записью.
+
+Просмотры копятся в памяти процесса и сбрасываются в БД одной
+транзакцией из фонового потока: раз в VIEW_FLUSH_INTERVAL секунд или
+раньше, когда набралось VIEW_FLUSH_MAX_PENDING просмотров. Запрос только
+дописывает в буфер, поэтому занятая БД не задерживает страницу, а
+UPDATE не делает запрос пишущим для роутера реплик. Запись — UPDATE с
+F(), поэтому процессы не мешают друг другу, а постам с одинаковым
+приростом хватает одного запроса. При падении процесса или ошибке
+записи теряется не больше одной пачки; при обычном выходе буфер
+сбрасывается через atexit.
+
+Записанные приросты дописываются в журнал в VIEW_LOG_CACHE: по нему
+rebuild_trending узнаёт, какие посты просматривали с прошлого
+пересчёта, не читая счётчики всех постов.
+"""
+import atexit
+import logging
+import threading
+from collections import Counter, defaultdict
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DatabaseError, connections, transaction
+from django.db.models import F
+
+from core.db import retry_on_locked
+from posts.models import Post
+from posts.sharding import shard_querysets
+
+# В SQLite не больше 999 параметров в запросе.
+CHUNK_SIZE = 500
+VIEW_LOG_KEY = 'posts:views:log'
+
+logger = logging.getLogger(__name__)
+
+_pending = Counter()
+_pending_total = [0]
+_pending_lock = threading.Lock()
+_wake = threading.Event()
+_flusher = []
+
+
+def take_pending():
+    pending = _pending.copy()
+    _pending.clear()
+    _pending_total[0] = 0
+    return pending
+
+
+def record_view(post_id):
+    if not settings.VIEW_COUNTING:
+        return
+    with _pending_lock:
+        _pending[post_id] += 1
+        _pending_total[0] += 1
+        full = _pending_total[0] >= settings.VIEW_FLUSH_MAX_PENDING
+    wake_flusher(full)
+
+
+def wake_flusher(full):
+    """Запускает поток сброса при первом просмотре и будит его, когда
+    буфер заполнен. Без VIEW_FLUSH_IN_BACKGROUND буфер сбрасывает только
+    flush_pending()."""
+    if not settings.VIEW_FLUSH_IN_BACKGROUND:
+        return
+    with _pending_lock:
+        if not _flusher:
+            thread = threading.Thread(target=run_flusher, daemon=True)
+            _flusher.append(thread)
+            thread.start()
+    if full:
+        _wake.set()
+
+
+def run_flusher():
+    while True:
+        _wake.wait(settings.VIEW_FLUSH_INTERVAL)
+        _wake.clear()
+        try:
+            flush_pending()
+        except DatabaseError:
+            logger.exception('View counters flush failed')
+        finally:
+            connections.close_all()
+
+
+def write_increments(queryset, increments):
+    """Один UPDATE на каждый прирост и пачку id."""
+    posts_by_increment = defaultdict(list)
+    for post_id, increment in increments.items():
+        posts_by_increment[increment].append(post_id)
+    with transaction.atomic(using=queryset.db):
+        for increment, post_ids in posts_by_increment.items():
+            for start in range(0, len(post_ids), CHUNK_SIZE):
+                queryset.filter(
+                    pk__in=post_ids[start:start + CHUNK_SIZE]
+                ).update(views=F('views') + increment)
+
+
+def flush(pending):
+    # Пост лежит в одном шарде, в остальных UPDATE не найдёт строк.
+    for queryset in shard_querysets(Post.objects.all()):
+        retry_on_locked(partial(write_increments, queryset, pending))
+    log_increments(pending)
+
+
+def view_log_key(number):
+    return f'{VIEW_LOG_KEY}:{number}'
+
+
+def get_log_store():
+    return caches[settings.VIEW_LOG_CACHE]
+
+
+def log_increments(increments):
+    """Дописывает записанные приросты в журнал; записи живут
+    TRENDING_WINDOW секунд."""
+    store = get_log_store()
+    try:
+        number = store.incr(VIEW_LOG_KEY)
+    except ValueError:
+        store.add(VIEW_LOG_KEY, 0, None)
+        number = store.incr(VIEW_LOG_KEY)
+    store.set(
+        view_log_key(number), dict(increments), settings.TRENDING_WINDOW
+    )
+
+
+def read_log(after):
+    """Сумма приростов из записей журнала после номера after и номер
+    последней записи. Запись, которую писатель ещё не дописал, не
+    учитывается."""
+    store = get_log_store()
+    last = store.get(VIEW_LOG_KEY, 0)
+    if last < after:
+        # Журнал начат заново (кэш очищен).
+        after = 0
+    increments = Counter()
+    for start in range(after + 1, last + 1, CHUNK_SIZE):
+        entries = store.get_many([
+            view_log_key(number)
+            for number in range(start, min(start + CHUNK_SIZE, last + 1))
+        ])
+        for entry in entries.values():
+            increments.update(entry)
+    return increments, last
+
+
+def flush_pending():
+    with _pending_lock:
+        pending = take_pending()
+    if pending:
+        flush(pending)
+
+
+atexit.register(flush_pending)
@@ -0,0 +1,128 @@
+"""Материализованная статистика групп для каталога /groups/.
+
+Новый пост в группе увеличивает счётчик одним UPDATE, остальные
+изменения (правка с переносом в другую группу, удаление) пересчитывают
+затронутые группы целиком. Сигналы пишут в default отдельно от шарда
+поста, поэтому расхождения возможны; их исправляет
+reconcile_group_stats. Пересчёт читает основную БД: реплика может
+отставать от только что записанного поста.
+"""
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Count, F, Max
+
+from posts.models import Group, GroupStats, Post
+from posts.sharding import shard_querysets
+
+TEXT_LENGTH = GroupStats._meta.get_field('latest_post_text').max_length
+
+
+def primary_querysets(queryset):
+    if settings.POST_SHARDS:
+        return shard_querysets(queryset)
+    return [queryset.using(DEFAULT_DB_ALIAS)]
+
+
+def group_exists(group_id):
+    return Group.objects.using(DEFAULT_DB_ALIAS).filter(pk=group_id).exists()
+
+
+def latest_fields(post):
+    if post is None:
+        return {
+            'last_post_at': None,
+            'latest_post_id': None,
+            'latest_post_text': '',
+        }
+    return {
+        'last_post_at': post.pub_date,
+        'latest_post_id': post.pk,
+        'latest_post_text': post.text[:TEXT_LENGTH],
+    }
+
+
+def refresh_group(group_id):
+    """Пересчитывает статистику группы по всем шардам."""
+    count = 0
+    latest = None
+    for queryset in primary_querysets(
+        Post.objects.filter(group_id=group_id)
+    ):
+        count += queryset.count()
+        post = queryset.order_by('-pub_date', '-id').only(
+            'id', 'pub_date', 'text'
+        ).first()
+        if post is not None and (
+            latest is None
+            or (post.pub_date, post.pk) > (latest.pub_date, latest.pk)
+        ):
+            latest = post
+    GroupStats.objects.update_or_create(
+        group_id=group_id,
+        defaults={'post_count': count, **latest_fields(latest)}
+    )
+
+
+def post_changed(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    if created and instance.group_id:
+        updated = GroupStats.objects.filter(
+            group_id=instance.group_id
+        ).update(post_count=F('post_count') + 1, **latest_fields(instance))
+        if updated:
+            return
+    groups = {instance.group_id, getattr(instance, '_previous_group_id', None)}
+    groups.discard(None)
+    for group_id in groups:
+        if group_exists(group_id):
+            refresh_group(group_id)
+
+
+def post_deleted(sender, instance, **kwargs):
+    if instance.group_id and group_exists(instance.group_id):
+        refresh_group(instance.group_id)
+
+
+def current_stats():
+    """{group_id: (число постов, время последнего)} по всем шардам."""
+    stats = {}
+    for queryset in primary_querysets(
+        Post.objects.filter(group__isnull=False)
+    ):
+        rows = queryset.order_by().values('group_id').annotate(
+            count=Count('id'), last=Max('pub_date')
+        )
+        for row in rows:
+            count, last = stats.get(row['group_id'], (0, None))
+            if last is None or row['last'] > last:
+                last = row['last']
+            stats[row['group_id']] = (count + row['count'], last)
+    return stats
+
+
+def reconcile():
+    """Пересчитывает группы, чья статистика разошлась с постами."""
+    expected = current_stats()
+    stored = {
+        group_id: (count, last)
+        for group_id, count, last in GroupStats.objects.using(
+            DEFAULT_DB_ALIAS
+        ).values_list(
+            'group_id', 'post_count', 'last_post_at'
+        )
+    }
+    fixed = 0
+    groups = Group.objects.using(DEFAULT_DB_ALIAS).values_list(
+        'id', flat=True
+    )
+    for group_id in groups:
+        if stored.get(group_id) != expected.get(group_id, (0, None)):
+            refresh_group(group_id)
+            fixed += 1
+    return fixed
+
+
+def directory():
+    """Группы со статистикой одним запросом."""
+    return Group.objects.select_related('stats').order_by('title')
@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from posts.models import User
+from posts.sharding import move_author, shard_for_author
+
+
+class Command(BaseCommand):
+    help = 'Переносит посты автора и комментарии к ним в другой шард.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('shard', help='алиас из POST_SHARDS')
+        parser.add_argument(
+            '--source',
+            help='откуда переносить, по умолчанию текущий шард автора; '
+                 'default — для постов, созданных до шардирования'
+        )
+
+    def handle(self, *args, **options):
+        if options['shard'] not in settings.POST_SHARDS:
+            raise CommandError(f'{options["shard"]} нет в POST_SHARDS')
+        try:
+            author = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f'Автор {options["username"]} не найден')
+        source = options['source'] or shard_for_author(author.id)
+        if source not in {DEFAULT_DB_ALIAS, *settings.POST_SHARDS}:
+            raise CommandError(f'{source} нет в POST_SHARDS')
+        moved = move_author(author, options['shard'], source)
+        self.stdout.write(
+            f'{author}: {source} -> {options["shard"]}, постов: {moved}'
+        )
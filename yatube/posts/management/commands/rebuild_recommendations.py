@@ -0,0 +1,57 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.recommendations import (
+    FollowGraph, active_user_ids, build_csr, precompute
+)
+
+
+def csr_bytes(matrix):
+    return sum(part.itemsize * len(part) for part in matrix)
+
+
+class Command(BaseCommand):
+    help = (
+        'Перестраивает снимок графа подписок и кладёт в кэш рекомендации '
+        '«на кого подписаться» для активных пользователей.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--synthetic',
+            type=int,
+            metavar='EDGES',
+            help='только замерить построение CSR на EDGES случайных рёбрах'
+        )
+
+    def handle(self, *args, **options):
+        if options['synthetic']:
+            self.measure_synthetic(options['synthetic'])
+            return
+        started = time.perf_counter()
+        graph = FollowGraph.build()
+        built = time.perf_counter()
+        users = precompute(graph, active_user_ids())
+        self.stdout.write(
+            f'снимок: {len(graph.following[1])} подписок, '
+            f'{csr_bytes(graph.following) + csr_bytes(graph.followers)} '
+            f'байт, {built - started:.2f} с; '
+            f'рекомендации: {users} пользователей, '
+            f'{time.perf_counter() - built:.2f} с'
+        )
+
+    def measure_synthetic(self, count):
+        nodes = max(count // 20, 1)
+        edges = sorted(
+            (random.randrange(nodes), random.randrange(nodes))
+            for _ in range(count)
+        )
+        started = time.perf_counter()
+        matrix = build_csr(iter(edges), nodes)
+        self.stdout.write(
+            f'{count} рёбер, {nodes} вершин: '
+            f'{time.perf_counter() - started:.2f} с, '
+            f'{csr_bytes(matrix)} байт'
+        )
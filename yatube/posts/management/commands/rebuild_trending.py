@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.trending import rebuild
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает рейтинги популярных постов и групп '
+        'по скользящему окну TRENDING_WINDOW.'
+    )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        posts, groups = rebuild()
+        self.stdout.write(
+            f'постов: {posts}, групп: {groups}, '
+            f'{time.perf_counter() - started:.2f} с'
+        )
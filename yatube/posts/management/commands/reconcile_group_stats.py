@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from posts.group_stats import reconcile
+
+
+class Command(BaseCommand):
+    help = (
+        'Сверяет статистику групп с постами во всех шардах '
+        'и пересчитывает разошедшиеся группы.'
+    )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'исправлено групп: {reconcile()}')
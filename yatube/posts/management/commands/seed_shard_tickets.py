@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from posts.sharding import seed_tickets
+
+
+class Command(BaseCommand):
+    help = (
+        'Поднимает последовательность id шардов выше существующих '
+        'постов и комментариев.'
+    )
+
+    def handle(self, *args, **options):
+        top = seed_tickets()
+        self.stdout.write(f'Следующий id больше {top}')
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from posts.warming import hot_paths, warm
+
+
+class Command(BaseCommand):
+    help = (
+        'Рисует в кэш первые страницы главной, активные группы '
+        'и профили активных авторов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='только показать страницы для прогрева'
+        )
+
+    def handle(self, *args, **options):
+        paths = hot_paths()
+        if options['dry_run']:
+            self.stdout.write('\n'.join(paths))
+            return
+        for path, status, duration in warm(paths):
+            self.stdout.write(f'{path:<50} {status:>4} {duration * 1000:8.2f}')
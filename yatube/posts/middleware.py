@@ -0,0 +1,99 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core.circuit import STALE_HEADER
+from core.swr import conditional_response
+from posts.counters import record_view
+from posts.versions import get_versions
+from posts.warming import is_warming, record_access
+
+MESSAGES_COOKIE = 'messages'
+
+
+class AnonymousPageCacheMiddleware:
+    """Кэширует страницы ANONYMOUS_PAGE_CACHE_VIEWS для гостей.
+
+    Ключ включает путь, строку запроса и версии областей страницы,
+    поэтому после изменения данных старые записи просто перестают
+    читаться. Попадание не обращается к БД: гостя узнаём по отсутствию
+    куки сессии, версии берутся из кэша. Стоит до
+    AdmissionControlMiddleware, поэтому попадание не ждёт места в группе.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        key = getattr(request, '_anonymous_page_key', None)
+        if key is not None and self.is_cacheable(request, response):
+            cache.set(key, response, settings.ANONYMOUS_PAGE_CACHE_TIMEOUT)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        scopes = getattr(view_func, 'version_scopes', None)
+        if scopes is None or not self.is_anonymous_read(request):
+            return None
+        if request.resolver_match.view_name not in (
+            settings.ANONYMOUS_PAGE_CACHE_VIEWS
+        ):
+            return None
+        key = self.make_key(
+            request, scopes(request, *view_args, **view_kwargs)
+        )
+        response = cache.get(key)
+        if response is None:
+            request._anonymous_page_key = key
+            return None
+        response['X-Page-Cache'] = 'hit'
+        return conditional_response(request, response)
+
+    @staticmethod
+    def is_anonymous_read(request):
+        return (
+            request.method in ('GET', 'HEAD')
+            and settings.SESSION_COOKIE_NAME not in request.COOKIES
+            and MESSAGES_COOKIE not in request.COOKIES
+        )
+
+    @staticmethod
+    def make_key(request, scopes):
+        versions = ':'.join(map(repr, get_versions(scopes)))
+        digest = hashlib.md5(
+            f'{request.get_full_path()}:{versions}'.encode()
+        ).hexdigest()
+        return f'posts:anonymous_page:{digest}'
+
+    @staticmethod
+    def is_cacheable(request, response):
+        return (
+            response.status_code == 200
+            and not response.streaming
+            and not response.cookies
+            and not request.META.get('CSRF_COOKIE_USED')
+            and STALE_HEADER not in response
+        )
+
+
+class PageAccessMiddleware:
+    """Считает обращения к страницам для прогрева кэша и просмотры постов.
+
+    Стоит до AnonymousPageCacheMiddleware, чтобы учитывать и страницы,
+    отданные из кэша. Запросы прогрева не считаются.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method != 'GET' or is_warming(request):
+            return
+        if hasattr(view_func, 'version_scopes'):
+            record_access(request)
+        if request.resolver_match.view_name == 'posts:post_detail':
+            record_view(view_kwargs['post_id'])
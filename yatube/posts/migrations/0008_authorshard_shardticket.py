@@ -0,0 +1,54 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:52
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def seed_tickets(apps, schema_editor):
+    """Поднимает последовательность ShardTicket выше уже выданных id
+    постов и комментариев: в SQLite AUTOINCREMENT её не опускает."""
+    alias = schema_editor.connection.alias
+    top = max(
+        apps.get_model('posts', name).objects.using(alias).aggregate(
+            top=models.Max('id')
+        )['top'] or 0
+        for name in ('Post', 'Comment')
+    )
+    if top:
+        tickets = apps.get_model('posts', 'ShardTicket').objects.using(alias)
+        tickets.create(id=top)
+        tickets.filter(id=top).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0011_update_proxy_permissions'),
+        ('posts', '0007_auto_20220712_0957'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorShard',
+            fields=[
+                ('author', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='shard', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+                ('shard', models.CharField(help_text='Алиас БД из POST_SHARDS', max_length=100, verbose_name='Шард')),
+            ],
+            options={
+                'verbose_name': 'Шард автора',
+                'verbose_name_plural': 'Шарды авторов',
+            },
+        ),
+        migrations.CreateModel(
+            name='ShardTicket',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+            ],
+            options={
+                'verbose_name': 'Билет id',
+                'verbose_name_plural': 'Билеты id',
+            },
+        ),
+        migrations.RunPython(seed_tickets, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 2.2.16 on 2026-10-19 10:28
+
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+BATCH_SIZE = 500
+# Копия posts.models на момент миграции: модель может измениться позже.
+EXCERPT_LENGTH = 300
+EXCERPT_ELLIPSIS = '…'
+
+
+def make_excerpt(text):
+    return Truncator(' '.join(text.split())).chars(
+        EXCERPT_LENGTH, truncate=EXCERPT_ELLIPSIS
+    )
+
+
+def fill_excerpts(apps, schema_editor):
+    """Заполняет выдержки пачками по id, не держа открытым курсор по
+    таблице, в которую пишет."""
+    Post = apps.get_model('posts', 'Post')
+    posts = Post.objects.using(schema_editor.connection.alias)
+    last_id = 0
+    while True:
+        batch = list(
+            posts.filter(id__gt=last_id).order_by('id').only('text')[
+                :BATCH_SIZE
+            ]
+        )
+        if not batch:
+            break
+        for post in batch:
+            post.excerpt = make_excerpt(post.text)
+        posts.bulk_update(batch, ['excerpt'])
+        last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0012_post_date_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, help_text='Начало текста для лент, обновляется при сохранении', max_length=300, verbose_name='Выдержка'),
+        ),
+        migrations.RunPython(fill_excerpts, migrations.RunPython.noop),
+    ]
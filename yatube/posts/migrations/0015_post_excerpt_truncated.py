@@ -0,0 +1,44 @@
+# Generated by Django 2.2.16 on 2026-10-19 10:54
+
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+
+
+def fill_excerpt_truncated(apps, schema_editor):
+    """Отмечает посты, у которых выдержка короче текста в одну строку."""
+    Post = apps.get_model('posts', 'Post')
+    posts = Post.objects.using(schema_editor.connection.alias)
+    last_id = 0
+    while True:
+        batch = list(
+            posts.filter(id__gt=last_id).order_by('id').only(
+                'text', 'excerpt'
+            )[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        for post in batch:
+            post.excerpt_truncated = (
+                post.excerpt != ' '.join(post.text.split())
+            )
+        posts.bulk_update(batch, ['excerpt_truncated'])
+        last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0014_model_options'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt_truncated',
+            field=models.BooleanField(default=False, editable=False, help_text='Текст длиннее выдержки, обновляется при сохранении', verbose_name='Выдержка обрезана'),
+        ),
+        migrations.RunPython(
+            fill_excerpt_truncated, migrations.RunPython.noop
+        ),
+    ]
@@ -1,8 +1,33 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils.text import Truncator
 
 User = get_user_model()
 
+EXCERPT_LENGTH = 300
+EXCERPT_ELLIPSIS = '…'
+
+
+def one_line(text):
+    return ' '.join(text.split())
+
+
+def make_excerpt(text):
+    """Начало текста в одну строку не длиннее EXCERPT_LENGTH символов."""
+    return Truncator(one_line(text)).chars(
+        EXCERPT_LENGTH, truncate=EXCERPT_ELLIPSIS
+    )
+
+
+class ShardedQuerySet(models.QuerySet):
+    def create(self, **kwargs):
+        """Без явного using() шард выбирает роутер по самому объекту."""
+        if self._db is not None:
+            return super().create(**kwargs)
+        obj = self.model(**kwargs)
+        obj.save(force_insert=True)
+        return obj
+
 
 class Group(models.Model):
     title = models.CharField(
@@ -59,15 +84,85 @@ class Post(models.Model):
         upload_to='posts/',
         blank=True
     )
+    excerpt = models.CharField(
+        max_length=EXCERPT_LENGTH,
+        blank=True,
+        editable=False,
+        verbose_name='Выдержка',
+        help_text='Начало текста для лент, обновляется при сохранении'
+    )
+    excerpt_truncated = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name='Выдержка обрезана',
+        help_text='Текст длиннее выдержки, обновляется при сохранении'
+    )
+    views = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Просмотры',
+        help_text='Обновляется пачками из posts.counters'
+    )
+
+    objects = ShardedQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
         ordering = ('-pub_date',)
+        # Ленты и архивы выбирают посты диапазоном pub_date.
+        indexes = (
+            models.Index(
+                fields=('pub_date', 'id'), name='post_pub_date_idx'
+            ),
+            models.Index(
+                fields=('group', 'pub_date'), name='post_group_pub_date_idx'
+            ),
+            models.Index(
+                fields=('author', 'pub_date'),
+                name='post_author_pub_date_idx'
+            ),
+        )
 
     def __str__(self) -> str:
         return self.text[:15]
 
+    @property
+    def has_more(self):
+        """Выдержка короче текста: в ленте нужна ссылка на пост."""
+        return self.excerpt_truncated
+
+    def stored_fields(self):
+        """Поля для UPDATE: без просмотров, которые пишет posts.counters,
+        и без неподгруженных полей."""
+        deferred = self.get_deferred_fields()
+        return [
+            field.name for field in self._meta.concrete_fields
+            if not field.primary_key
+            and field.name != 'views'
+            and field.attname not in deferred
+        ]
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if 'text' not in self.get_deferred_fields() and (
+            update_fields is None or 'text' in update_fields
+        ):
+            self.excerpt = make_excerpt(self.text)
+            self.excerpt_truncated = self.excerpt != one_line(self.text)
+            if update_fields is not None:
+                kwargs['update_fields'] = {
+                    *update_fields, 'excerpt', 'excerpt_truncated'
+                }
+        if (
+            not self._state.adding
+            and not args
+            and not kwargs.get('force_insert')
+            and update_fields is None
+        ):
+            kwargs['update_fields'] = self.stored_fields()
+        super().save(*args, **kwargs)
+
 
 class Comment(models.Model):
     post = models.ForeignKey(
@@ -96,6 +191,8 @@ class Comment(models.Model):
         help_text='Автоматическое добавление времени публикации комментария'
     )
 
+    objects = ShardedQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
@@ -136,3 +233,122 @@ class Follow(models.Model):
 
     def __str__(self):
         return f'{self.user} подписан на {self.author}.'
+
+
+class GroupStats(models.Model):
+    """Число постов и последний пост группы для каталога групп.
+
+    Поддерживается сигналами Post и командой reconcile_group_stats.
+    """
+    group = models.OneToOneField(
+        Group,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Группа'
+    )
+    post_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Число постов'
+    )
+    last_post_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Последняя активность'
+    )
+    latest_post_id = models.IntegerField(
+        null=True,
+        blank=True,
+        verbose_name='id последнего поста'
+    )
+    latest_post_text = models.CharField(
+        max_length=200,
+        blank=True,
+        verbose_name='Начало последнего поста'
+    )
+
+    class Meta:
+        verbose_name = 'Статистика группы'
+        verbose_name_plural = 'Статистика групп'
+
+    def __str__(self):
+        return f'{self.group}: {self.post_count}'
+
+
+class TrendingPost(models.Model):
+    """Место поста в рейтинге популярных, пересчитывается rebuild_trending.
+
+    Посты могут лежать в шардах, поэтому здесь только их id.
+    """
+    post_id = models.IntegerField(
+        unique=True,
+        verbose_name='id поста'
+    )
+    score = models.FloatField(
+        db_index=True,
+        verbose_name='Рейтинг'
+    )
+
+    class Meta:
+        verbose_name = 'Популярный пост'
+        verbose_name_plural = 'Популярные посты'
+        ordering = ('-score',)
+
+    def __str__(self):
+        return f'Пост {self.post_id}: {self.score:.2f}'
+
+
+class TrendingGroup(models.Model):
+    group = models.OneToOneField(
+        Group,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='trending',
+        verbose_name='Группа'
+    )
+    score = models.FloatField(
+        db_index=True,
+        verbose_name='Рейтинг'
+    )
+    recent_posts = models.PositiveIntegerField(
+        verbose_name='Постов за окно',
+        help_text='Число постов за TRENDING_WINDOW'
+    )
+
+    class Meta:
+        verbose_name = 'Популярная группа'
+        verbose_name_plural = 'Популярные группы'
+        ordering = ('-score',)
+
+    def __str__(self):
+        return f'{self.group}: {self.score:.2f}'
+
+
+class AuthorShard(models.Model):
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='shard',
+        verbose_name='Автор'
+    )
+    shard = models.CharField(
+        max_length=100,
+        verbose_name='Шард',
+        help_text='Алиас БД из POST_SHARDS'
+    )
+
+    class Meta:
+        verbose_name = 'Шард автора'
+        verbose_name_plural = 'Шарды авторов'
+
+    def __str__(self):
+        return f'{self.author} хранится в {self.shard}.'
+
+
+class ShardTicket(models.Model):
+    """Глобальная последовательность id постов и комментариев в шардах."""
+
+    class Meta:
+        verbose_name = 'Билет id'
+        verbose_name_plural = 'Билеты id'
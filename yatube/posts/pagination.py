@@ -0,0 +1,98 @@
+"""Курсорная пагинация по паре (дата, id).
+
+Курсор указывает на последнюю показанную запись, поэтому следующая
+страница берётся по индексу без OFFSET и не сдвигается, когда
+появляются новые записи. Комментарии идут по (created, id) от старых
+к новым, посты — по (pub_date, id) от новых к старым.
+"""
+import base64
+import binascii
+import heapq
+from datetime import datetime
+from itertools import islice
+
+from django.conf import settings
+from django.db.models import Q
+
+
+def encode_cursor(moment, object_id):
+    raw = f'{moment.isoformat()}|{object_id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """(дата, id) из курсора или None, если курсор испорчен."""
+    try:
+        moment, object_id = base64.urlsafe_b64decode(
+            cursor.encode()
+        ).decode().split('|')
+        return datetime.fromisoformat(moment), int(object_id)
+    except (binascii.Error, UnicodeError, ValueError):
+        return None
+
+
+def field_value(row, field):
+    if isinstance(row, dict):
+        return row[field]
+    return getattr(row, field)
+
+
+def after_cursor(queryset, field, after, descending=False):
+    moment, object_id = after
+    lookup = 'lt' if descending else 'gt'
+    return queryset.filter(
+        Q(**{f'{field}__{lookup}': moment})
+        | Q(**{field: moment, f'id__{lookup}': object_id})
+    )
+
+
+def cursor_page(queryset, field, after=None, limit=None, descending=False,
+                merge_shards=False):
+    """Страница записей queryset после курсора after и курсор следующей.
+
+    queryset может быть и моделями, и .values() с полями field и id.
+    С merge_shards при шардировании запрос выполняется в каждом шарде,
+    и результаты сливаются, как в sharding.feed().
+    """
+    if limit is None:
+        limit = settings.POSTS_PER_PAGE
+    ordering = (f'-{field}', '-id') if descending else (field, 'id')
+    queryset = queryset.order_by(*ordering)
+    if after is not None:
+        queryset = after_cursor(queryset, field, after, descending)
+    if merge_shards and settings.POST_SHARDS:
+        rows = islice(heapq.merge(
+            *[
+                list(queryset.using(alias)[:limit + 1])
+                for alias in settings.POST_SHARDS
+            ],
+            key=lambda row: (field_value(row, field), field_value(row, 'id')),
+            reverse=descending
+        ), limit + 1)
+        rows = list(rows)
+    else:
+        rows = list(queryset[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(
+            field_value(last, field), field_value(last, 'id')
+        )
+    return rows, next_cursor
+
+
+def with_related(queryset, *fields):
+    if settings.POST_SHARDS:
+        # Пользователи и группы лежат в default, JOIN с ними в шарде
+        # невозможен.
+        return queryset.prefetch_related(*fields)
+    return queryset.select_related(*fields)
+
+
+def comments_page(post, after=None, limit=None):
+    """Комментарии поста после after с авторами и курсор следующих."""
+    if limit is None:
+        limit = settings.COMMENTS_PER_PAGE
+    comments = with_related(post.comments.all(), 'author')
+    return cursor_page(comments, 'created', after, limit)
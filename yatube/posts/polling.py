@@ -0,0 +1,126 @@
+"""Отметки новых постов для лент: главной, групп и подписок.
+
+Для каждой области ('feed', 'group:<slug>', 'author:<id>') в кэше
+хранится id последнего поста. Глобальные id постов растут и при
+шардировании, поэтому клиент присылает последний виденный id, и
+пока отметка не больше него, таблица постов не читается.
+
+Отметка поднимается только после фиксации транзакции с новым постом и
+только вверх: откаченный пост её не двигает, а запись меньшего id от
+параллельного запроса не опускает. Отметки лежат в POLL_CACHE, общем
+для процессов, мимо L1 TwoTierCache, и поднимаются атомарным set_max().
+"""
+import time
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Max
+
+from core.cache import set_max
+from posts.models import Follow, Group, Post
+from posts.sharding import shard_querysets
+
+
+def mark_key(scope):
+    return f'posts:high_water:{scope}'
+
+
+def post_scopes(post):
+    scopes = ['feed', f'author:{post.author_id}']
+    if post.group_id:
+        scopes.append(f'group:{post.group.slug}')
+    return scopes
+
+
+def get_store():
+    return caches[settings.POLL_CACHE]
+
+
+def raise_marks(scopes, post_id):
+    """Поднимает отметки областей до post_id; большие не трогает."""
+    store = get_store()
+    for scope in scopes:
+        set_max(store, mark_key(scope), post_id, None)
+
+
+def post_created(sender, instance, created=False, raw=False, **kwargs):
+    if not created or raw:
+        return
+    transaction.on_commit(
+        partial(raise_marks, post_scopes(instance), instance.pk),
+        using=kwargs.get('using')
+    )
+
+
+class Feed:
+    """Лента для опроса: области отметок и queryset её постов."""
+
+    def __init__(self, scopes, queryset):
+        self.scopes = scopes
+        self.queryset = queryset
+
+    @classmethod
+    def for_name(cls, name, user):
+        """Лента по имени: 'index', 'follow' или 'group:<slug>'.
+
+        Для неизвестной ленты возвращает None.
+        """
+        if name == 'index':
+            return cls(['feed'], Post.objects.all())
+        if name == 'follow' and user.is_authenticated:
+            authors = list(Follow.objects.filter(
+                user=user
+            ).values_list('author', flat=True))
+            return cls(
+                [f'author:{author}' for author in authors],
+                Post.objects.filter(author__in=authors)
+            )
+        if name.startswith('group:'):
+            group = Group.objects.filter(slug=name[6:]).first()
+            if group is not None:
+                return cls([name], Post.objects.filter(group=group))
+        return None
+
+    def high_water_mark(self):
+        store = get_store()
+        marks = store.get_many([mark_key(scope) for scope in self.scopes])
+        missing = [
+            scope for scope in self.scopes if mark_key(scope) not in marks
+        ]
+        if missing:
+            # Отметок ещё нет (кэш очищен): один раз считаем по БД.
+            mark = max(
+                queryset.aggregate(Max('id'))['id__max'] or 0
+                for queryset in shard_querysets(self.queryset)
+            )
+            marks.update({
+                mark_key(scope): set_max(store, mark_key(scope), mark, None)
+                for scope in missing
+            })
+        return max(marks.values(), default=0)
+
+    def new_post_ids(self, since, limit):
+        ids = []
+        for queryset in shard_querysets(self.queryset):
+            ids += queryset.filter(id__gt=since).order_by(
+                '-id'
+            ).values_list('id', flat=True)[:limit]
+        return sorted(ids, reverse=True)[:limit]
+
+    def poll(self, since, wait=0):
+        """Новые посты после since; ждёт их до wait секунд."""
+        deadline = time.monotonic() + wait
+        mark = self.high_water_mark()
+        while mark <= since and time.monotonic() < deadline:
+            time.sleep(settings.POLL_INTERVAL)
+            mark = self.high_water_mark()
+        if mark <= since:
+            return {'count': 0, 'ids': [], 'latest': mark}
+        count = sum(
+            queryset.filter(id__gt=since).count()
+            for queryset in shard_querysets(self.queryset)
+        )
+        ids = self.new_post_ids(since, settings.POLL_MAX_IDS)
+        return {'count': count, 'ids': ids, 'latest': mark}
@@ -0,0 +1,146 @@
+"""Рекомендации «на кого подписаться» по снимку графа подписок.
+
+Снимок — две CSR-матрицы смежности в массивах array: подписки
+пользователя (user -> authors) и подписчики автора (author -> users).
+Номер вершины — id пользователя, поэтому индекс не нужен. Снимок
+строится командой rebuild_recommendations, она же считает рекомендации
+для активных пользователей и кладёт их в кэш; страницы только читают
+кэш.
+"""
+from array import array
+from collections import Counter
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max
+from django.utils import timezone
+
+from posts.models import Follow, User
+from posts.versions import bump
+
+CHUNK_SIZE = 10000
+# Пачка пользователей: в SQLite не больше 999 параметров в запросе.
+BATCH_SIZE = 100
+
+
+def suggestions_key(user_id):
+    return f'posts:who_to_follow:{user_id}'
+
+
+def build_csr(edges, size):
+    """CSR из рёбер (source, target), отсортированных по source."""
+    indptr = array('q', [0])
+    indices = array('l')
+    for source, target in edges:
+        while len(indptr) <= source:
+            indptr.append(len(indices))
+        indices.append(target)
+    while len(indptr) <= size:
+        indptr.append(len(indices))
+    return indptr, indices
+
+
+class FollowGraph:
+    def __init__(self, following, followers):
+        self.following = following
+        self.followers = followers
+
+    @classmethod
+    def build(cls):
+        size = (User.objects.aggregate(Max('id'))['id__max'] or 0) + 1
+        edges = Follow.objects.values_list('user_id', 'author_id')
+        return cls(
+            build_csr(
+                edges.order_by('user_id').iterator(chunk_size=CHUNK_SIZE),
+                size
+            ),
+            build_csr(
+                (
+                    (author, user) for user, author in edges.order_by(
+                        'author_id'
+                    ).iterator(chunk_size=CHUNK_SIZE)
+                ),
+                size
+            ),
+        )
+
+    @staticmethod
+    def neighbours(matrix, node):
+        indptr, indices = matrix
+        if node + 1 >= len(indptr):
+            return indices[0:0]
+        return indices[indptr[node]:indptr[node + 1]]
+
+    def suggest(self, user_id, limit, fanout):
+        """Авторы, на которых подписаны авторы пользователя (друзья
+        друзей), и авторы, которых читают вместе с его авторами."""
+        followed = self.neighbours(self.following, user_id)
+        scores = Counter()
+        for author in followed:
+            scores.update(self.neighbours(self.following, author)[:fanout])
+            for reader in self.neighbours(self.followers, author)[:fanout]:
+                scores.update(
+                    self.neighbours(self.following, reader)[:fanout]
+                )
+        for excluded in (user_id, *followed):
+            scores.pop(excluded, None)
+        return [author for author, _ in scores.most_common(limit)]
+
+
+def active_user_ids():
+    since = timezone.now() - timedelta(
+        days=settings.RECOMMENDATIONS_ACTIVE_DAYS
+    )
+    return User.objects.filter(
+        last_login__gte=since
+    ).values_list('id', flat=True).iterator(chunk_size=CHUNK_SIZE)
+
+
+def precompute_batch(graph, user_ids):
+    suggestions = {
+        user_id: graph.suggest(
+            user_id,
+            settings.RECOMMENDATIONS_LIMIT,
+            settings.RECOMMENDATIONS_FANOUT
+        )
+        for user_id in user_ids
+    }
+    author_ids = {
+        author for authors in suggestions.values() for author in authors
+    }
+    usernames = dict(
+        User.objects.filter(id__in=author_ids).values_list('id', 'username')
+    )
+    cache.set_many(
+        {
+            suggestions_key(user_id): [
+                usernames[author] for author in authors
+                if author in usernames
+            ]
+            for user_id, authors in suggestions.items()
+        },
+        settings.RECOMMENDATIONS_TIMEOUT
+    )
+
+
+def precompute(graph, user_ids):
+    """Кладёт в кэш рекомендации user_ids; возвращает их число."""
+    user_ids = iter(user_ids)
+    total = 0
+    while True:
+        batch = list(islice(user_ids, BATCH_SIZE))
+        if not batch:
+            break
+        precompute_batch(graph, batch)
+        total += len(batch)
+    bump('who_to_follow')
+    return total
+
+
+def who_to_follow(user):
+    """username рекомендованных авторов из кэша; гостям — ничего."""
+    if not user.is_authenticated:
+        return []
+    return cache.get(suggestions_key(user.pk), [])
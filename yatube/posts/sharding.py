@@ -0,0 +1,252 @@
+"""Шардирование постов и комментариев по автору.
+
+Посты автора и комментарии к ним лежат в одном из алиасов POST_SHARDS,
+пользователи, группы и подписки — в default. Пустой
+POST_SHARDS выключает шардирование, и все функции модуля ведут себя
+как обычные запросы к default.
+
+Перед включением шардирования команда seed_shard_tickets поднимает
+последовательность id выше уже существующих постов и комментариев.
+"""
+import heapq
+import time
+from itertools import islice
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Max
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+
+from posts.models import AuthorShard, Comment, Post, ShardTicket, User
+
+SHARDED_MODELS = (Post, Comment)
+MOVE_POLL_INTERVAL = 0.5
+
+
+def shard_key(author_id):
+    return f'posts:shard:author:{author_id}'
+
+
+def shard_for_author(author_id):
+    """Алиас шарда автора: запись AuthorShard или хеш от author_id.
+
+    Без шардирования возвращает None, и БД выбирают остальные роутеры.
+    """
+    shards = settings.POST_SHARDS
+    if not shards:
+        return None
+    alias = cache.get(shard_key(author_id))
+    if alias is None:
+        alias = AuthorShard.objects.using(DEFAULT_DB_ALIAS).filter(
+            author_id=author_id
+        ).values_list('shard', flat=True).first()
+        if alias is None:
+            alias = shards[author_id % len(shards)]
+        cache.set(shard_key(author_id), alias, None)
+    return alias
+
+
+def next_id():
+    """Берёт id из глобальной последовательности ShardTicket."""
+    ticket = ShardTicket.objects.using(DEFAULT_DB_ALIAS).create()
+    ticket_id = ticket.id
+    ticket.delete()
+    return ticket_id
+
+
+def seed_tickets():
+    """Поднимает последовательность ShardTicket выше id постов и
+    комментариев во всех БД; возвращает наибольший из них.
+
+    В SQLite последовательность AUTOINCREMENT не опускается, поэтому
+    вставка билета с этим id сдвигает её, только если она ниже.
+    """
+    aliases = {DEFAULT_DB_ALIAS, *settings.POST_SHARDS}
+    top = max(
+        model.objects.using(alias).aggregate(top=Max('id'))['top'] or 0
+        for model in SHARDED_MODELS
+        for alias in aliases
+    )
+    if top:
+        tickets = ShardTicket.objects.using(DEFAULT_DB_ALIAS)
+        with transaction.atomic(using=DEFAULT_DB_ALIAS):
+            tickets.create(id=top)
+            tickets.filter(id=top).delete()
+    return top
+
+
+def assign_global_id(sender, instance, **kwargs):
+    if settings.POST_SHARDS and instance.pk is None:
+        instance.pk = next_id()
+
+
+def disable_foreign_keys(sender, connection, **kwargs):
+    """Пользователи и группы лежат в другой БД, ключи на них не проверить."""
+    if (
+        connection.alias in settings.POST_SHARDS
+        and connection.alias != DEFAULT_DB_ALIAS
+    ):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA foreign_keys = OFF')
+
+
+class MergedFeed:
+    """Посты из нескольких шардов, слитые по убыванию pub_date.
+
+    Поддерживает count() и срезы, поэтому подходит для Paginator.
+    """
+
+    ordered = True
+
+    def __init__(self, querysets):
+        self.querysets = querysets
+
+    def count(self):
+        return sum(queryset.count() for queryset in self.querysets)
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start = index.start or 0
+        parts = [queryset[:index.stop] for queryset in self.querysets]
+        merged = heapq.merge(
+            *parts,
+            key=lambda post: (post.pub_date, post.pk),
+            reverse=True
+        )
+        return list(islice(merged, start, index.stop))
+
+
+def feed(queryset):
+    """Выполняет queryset постов на всех шардах и сливает результаты."""
+    if not settings.POST_SHARDS:
+        return queryset
+    return MergedFeed([
+        queryset.using(alias) for alias in settings.POST_SHARDS
+    ])
+
+
+def shard_querysets(queryset):
+    """queryset в каждом шарде или он сам без шардирования."""
+    if not settings.POST_SHARDS:
+        return [queryset]
+    return [queryset.using(alias) for alias in settings.POST_SHARDS]
+
+
+def get_post_or_404(post_id):
+    if not settings.POST_SHARDS:
+        return get_object_or_404(Post, id=post_id)
+    for alias in settings.POST_SHARDS:
+        try:
+            return Post.objects.using(alias).get(id=post_id)
+        except Post.DoesNotExist:
+            continue
+    raise Http404
+
+
+def copy_pass(author, source, target, post_ids):
+    """Один проход переноса: копирует в target оставшиеся в source посты
+    автора и комментарии к ним и удаляет из source ровно то, что
+    скопировано. post_ids накапливает id перенесённых постов: к ним же
+    относятся комментарии, написанные, пока пост ещё был в source.
+
+    Возвращает (постов, комментариев), найденных в source.
+    """
+    posts = list(Post.objects.using(source).filter(author=author))
+    post_ids.update(post.id for post in posts)
+    comments = list(
+        Comment.objects.using(source).filter(post_id__in=post_ids)
+    )
+    if not posts and not comments:
+        return 0, 0
+    with transaction.atomic(using=target):
+        # Без force_insert: строка, скопированная до сбоя, обновится.
+        for obj in posts + comments:
+            obj.save_base(raw=True, using=target)
+    with transaction.atomic(using=source):
+        Comment.objects.using(source).filter(
+            id__in=[comment.id for comment in comments]
+        ).delete()
+        # Удаление поста каскадом удалило бы комментарий, появившийся
+        # после копирования: тогда посты удалит следующий проход.
+        if not Comment.objects.using(source).filter(
+            post_id__in=post_ids
+        ).exists():
+            Post.objects.using(source).filter(
+                id__in=[post.id for post in posts]
+            ).delete()
+    return len(posts), len(comments)
+
+
+def move_author(author, target, source=None, settle=None):
+    """Переносит посты автора и комментарии к ним в шард target.
+
+    source по умолчанию — текущий шард автора; явный source нужен,
+    например, чтобы разнести посты, созданные в default до включения
+    шардирования. Сначала справочник начинает указывать на target, затем
+    строки копируются проходами, пока source не опустеет. Процессы со
+    старой копией справочника пишут в source ещё до settle секунд
+    (SHARD_MOVE_SETTLE), поэтому проходы повторяются всё это время.
+    Строки копируются как в loaddata (raw), чтобы сохранить id и даты.
+    """
+    if source is None:
+        source = shard_for_author(author.id)
+    if settle is None:
+        settle = settings.SHARD_MOVE_SETTLE
+    if source == target:
+        return 0
+    AuthorShard.objects.using(DEFAULT_DB_ALIAS).update_or_create(
+        author=author,
+        defaults={'shard': target}
+    )
+    cache.delete(shard_key(author.id))
+    deadline = time.monotonic() + settle
+    post_ids = set()
+    while True:
+        if any(copy_pass(author, source, target, post_ids)):
+            continue
+        if time.monotonic() >= deadline:
+            return len(post_ids)
+        time.sleep(min(MOVE_POLL_INTERVAL, deadline - time.monotonic()))
+
+
+class ShardRouter:
+    """Направляет Post и Comment в шард автора поста.
+
+    Запросы без экземпляра в подсказках роутер не шардирует: для них
+    есть feed() и get_post_or_404().
+    """
+
+    def db_for_read(self, model, **hints):
+        if not settings.POST_SHARDS:
+            return None
+        instance = hints.get('instance')
+        if model in SHARDED_MODELS:
+            if isinstance(instance, SHARDED_MODELS):
+                return instance._state.db
+            if model is Post and isinstance(instance, User):
+                return shard_for_author(instance.pk)
+            return None
+        if isinstance(instance, SHARDED_MODELS):
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        if not settings.POST_SHARDS:
+            return None
+        instance = hints.get('instance')
+        if isinstance(instance, Post):
+            return shard_for_author(instance.author_id)
+        if isinstance(instance, Comment):
+            return instance.post._state.db
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if settings.POST_SHARDS:
+            return True
+        return None
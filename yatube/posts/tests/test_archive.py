@@ -0,0 +1,93 @@
+from datetime import datetime
+
+from django.core.cache import cache
+from django.db import connection
+from django.http import Http404
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.archive import histogram, month_of, period_bounds
+from posts.models import Group, Post, User
+
+
+class PeriodBoundsTests(TestCase):
+    def test_bounds(self):
+        """Границы года, месяца и дня, в том числе на стыке лет."""
+        self.assertEqual(
+            period_bounds(2021, 12),
+            (
+                timezone.make_aware(datetime(2021, 12, 1)),
+                timezone.make_aware(datetime(2022, 1, 1)),
+            )
+        )
+        start, end = period_bounds(2021)
+        self.assertEqual((start.year, end.year), (2021, 2022))
+        start, end = period_bounds(2021, 2, 28)
+        self.assertEqual((end.month, end.day), (3, 1))
+        with self.assertRaises(Http404):
+            period_bounds(2021, 2, 30)
+
+
+class ArchiveTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='TestUserAuthor')
+        cls.group = Group.objects.create(
+            title='TestGroup',
+            slug='test_slug',
+            description='TestDescription'
+        )
+        cls.post = Post.objects.create(
+            author=cls.author, text='TestCurrent', group=cls.group
+        )
+        cls.old_post = Post.objects.create(
+            author=cls.author, text='TestOld', group=cls.group
+        )
+        Post.objects.filter(pk=cls.old_post.pk).update(
+            pub_date=timezone.make_aware(datetime(2020, 3, 15))
+        )
+        cls.now = timezone.localtime(cls.post.pub_date)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_month_archive_uses_range(self):
+        """Архив месяца выбирает посты диапазоном дат, без извлечения
+        года и месяца."""
+        url = reverse(
+            'posts:group_archive',
+            args=[self.group.slug, self.now.year, self.now.month]
+        )
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(list(response.context['page_obj']), [self.post])
+        for query in queries:
+            self.assertNotIn('django_datetime_extract', query['sql'])
+        years = [year for _, year, _ in response.context['years']]
+        self.assertEqual(years, [self.now.year, 2020])
+
+    def test_year_archive(self):
+        """Архив года автора содержит только посты этого года."""
+        response = self.client.get(
+            reverse('posts:profile_archive', args=[self.author.username, 2020])
+        )
+        self.assertEqual(list(response.context['page_obj']), [self.old_post])
+        response = self.client.get(
+            reverse('posts:archive', args=[2020, 2, 30])
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_histogram_updated_incrementally(self):
+        """Новый и удалённый посты меняют закэшированную гистограмму."""
+        self.client.get(reverse('posts:archive', args=[self.now.year]))
+        month = month_of(self.post.pub_date)
+        post = Post.objects.create(author=self.author, text='TestNew')
+        counts = histogram('feed', Post.objects.none())
+        self.assertEqual(counts, {month: 2, '2020-03': 1})
+        post.delete()
+        counts = histogram('feed', Post.objects.none())
+        self.assertEqual(counts[month], 1)
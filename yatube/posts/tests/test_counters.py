@@ -0,0 +1,82 @@
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts import counters
+from posts.models import Post, User
+from posts.warming import WARMING_HEADER
+
+
+@override_settings(
+    VIEW_COUNTING=True, VIEW_FLUSH_MAX_PENDING=3, VIEW_FLUSH_INTERVAL=3600
+)
+class ViewCounterTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='TestUserAuthor')
+        cls.post = Post.objects.create(author=cls.author, text='TestText')
+
+    def setUp(self):
+        cache.clear()
+        counters.take_pending()
+        counters._wake.clear()
+        self.client = Client()
+
+    @override_settings(VIEW_FLUSH_IN_BACKGROUND=True)
+    @mock.patch.object(counters, '_flusher', [mock.Mock()])
+    def test_views_flushed_in_batches(self):
+        """Просмотры копятся в буфере, полный буфер будит поток сброса."""
+        url = reverse('posts:post_detail', args=[self.post.pk])
+        self.client.get(url)
+        self.client.get(url)
+        self.assertFalse(counters._wake.is_set())
+        response = self.client.get(url)
+        self.assertTrue(counters._wake.is_set())
+        self.assertNotIn(settings.REPLICA_STICKY_COOKIE, response.cookies)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views, 0)
+        counters.flush_pending()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views, 3)
+
+    def test_warming_requests_not_counted(self):
+        """Запросы прогрева не считаются просмотрами."""
+        url = reverse('posts:post_detail', args=[self.post.pk])
+        self.client.get(url, **{WARMING_HEADER: '1'})
+        self.assertEqual(counters.take_pending(), {})
+
+    @override_settings(VIEW_FLUSH_IN_BACKGROUND=True)
+    def test_flusher_thread_started_once(self):
+        """Поток сброса запускается при первом просмотре и один раз."""
+        with mock.patch.object(counters, '_flusher', []), \
+                mock.patch('posts.counters.threading.Thread') as thread:
+            counters.record_view(self.post.pk)
+            counters.record_view(self.post.pk)
+        thread.assert_called_once_with(
+            target=counters.run_flusher, daemon=True
+        )
+        thread.return_value.start.assert_called_once_with()
+
+    def test_cached_page_views_counted(self):
+        """Просмотр страницы из кэша тоже учитывается."""
+        url = reverse('posts:post_detail', args=[self.post.pk])
+        self.client.get(url)
+        response = self.client.get(url)
+        self.assertEqual(response['X-Page-Cache'], 'hit')
+        counters.flush_pending()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views, 2)
+
+    def test_save_keeps_views(self):
+        """Сохранение поста не затирает записанные после чтения просмотры."""
+        post = Post.objects.get(pk=self.post.pk)
+        Post.objects.filter(pk=post.pk).update(views=F('views') + 5)
+        post.text = 'TestEdited'
+        post.save()
+        post.refresh_from_db()
+        self.assertEqual((post.text, post.views), ('TestEdited', 5))
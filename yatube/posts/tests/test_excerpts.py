@@ -0,0 +1,89 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import EXCERPT_LENGTH, Group, Post, User, make_excerpt
+
+
+class ExcerptTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='TestUserAuthor')
+        cls.group = Group.objects.create(
+            title='TestGroup',
+            slug='test_slug',
+            description='TestDescription'
+        )
+        cls.long_post = Post.objects.create(
+            author=cls.author,
+            text='Начало\n\nдлинного поста ' + 'слово ' * 100 + 'ХвостПоста',
+            group=cls.group
+        )
+        cls.short_post = Post.objects.create(
+            author=cls.author, text='Короткий пост', group=cls.group
+        )
+        cls.ellipsis_post = Post.objects.create(
+            author=cls.author, text='Пост с многоточием…', group=cls.group
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_make_excerpt(self):
+        """Выдержка в одну строку и не длиннее EXCERPT_LENGTH."""
+        self.assertEqual(make_excerpt('  один\n\nдва  '), 'один два')
+        excerpt = make_excerpt('слово ' * 100)
+        self.assertEqual(len(excerpt), EXCERPT_LENGTH)
+        self.assertTrue(excerpt.endswith('…'))
+
+    def test_excerpt_follows_text(self):
+        """Выдержка пересчитывается при сохранении текста."""
+        self.assertTrue(self.long_post.excerpt.startswith('Начало длинного'))
+        self.assertTrue(self.long_post.has_more)
+        self.assertFalse(self.short_post.has_more)
+        self.assertFalse(self.ellipsis_post.has_more)
+        post = Post.objects.get(pk=self.short_post.pk)
+        post.text = 'Новый текст'
+        post.save(update_fields=['text'])
+        post.refresh_from_db()
+        self.assertEqual(post.excerpt, 'Новый текст')
+        post.text = 'слово ' * 100
+        post.save(update_fields=['text'])
+        post.refresh_from_db()
+        self.assertTrue(post.has_more)
+
+    def test_feed_skips_text(self):
+        """Ленты не выбирают полный текст постов."""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=[self.group.slug]),
+            reverse('posts:profile', args=[self.author.username]),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                with CaptureQueriesContext(connection) as queries:
+                    self.client.get(url)
+                selects = [
+                    query['sql'] for query in queries
+                    if 'FROM "posts_post"' in query['sql']
+                ]
+                self.assertTrue(selects)
+                for sql in selects:
+                    self.assertNotIn('"posts_post"."text"', sql)
+
+    def test_card_shows_excerpt(self):
+        """Карточка показывает выдержку и ссылку на полный пост."""
+        response = self.client.get(reverse('posts:index'))
+        content = response.content.decode()
+        self.assertNotIn('ХвостПоста', content)
+        self.assertIn('Короткий пост', content)
+        self.assertIn('Пост с многоточием…', content)
+        self.assertEqual(content.count('Читать далее'), 1)
+        detail = self.client.get(
+            reverse('posts:post_detail', args=[self.long_post.pk])
+        )
+        self.assertContains(detail, 'ХвостПоста')
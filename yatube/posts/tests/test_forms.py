@@ -1,11 +1,14 @@
+import os
 import tempfile
 import shutil
+from unittest import mock
 
 from django.test import TestCase, Client, override_settings
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.conf import settings
+from django.db import OperationalError
 
 from posts.models import Post, Group, Comment
 
@@ -33,6 +36,7 @@ class PostFormTest(TestCase):
             b'\x02\x00\x01\x00\x00\x02\x02\x0C'
             b'\x0A\x00\x3B'
         )
+        cls.small_gif = small_gif
         cls.uploaded = SimpleUploadedFile(
             name='small.gif',
             content=small_gif,
@@ -75,6 +79,41 @@ class PostFormTest(TestCase):
         self.assertEqual(Post.objects.count(), posts_count + 1)
         self.check_post(post, form_data)
 
+    def test_locked_write_saves_image_once(self):
+        """Картинка сохраняется один раз до транзакции, которая
+        повторяется после блокировки БД."""
+        save = Post.save
+        calls = []
+
+        def locked_once(post, *args, **kwargs):
+            calls.append(post.image._committed)
+            if len(calls) == 1:
+                raise OperationalError('database is locked')
+            return save(post, *args, **kwargs)
+
+        uploaded = SimpleUploadedFile(
+            name='locked.gif',
+            content=self.small_gif,
+            content_type='image/gif'
+        )
+        # TestCase держит транзакцию открытой, а в ней повтор отключён.
+        with mock.patch.object(Post, 'save', locked_once), mock.patch(
+            'core.db.in_transaction', return_value=False
+        ):
+            self.author_client.post(
+                reverse('posts:post_create'),
+                data={'text': 'TestLocked', 'image': uploaded}
+            )
+        self.assertEqual(calls, [True, True])
+        saved = [
+            name for name in os.listdir(os.path.join(TEMP_MEDIA_ROOT, 'posts'))
+            if name.startswith('locked')
+        ]
+        self.assertEqual(len(saved), 1)
+        self.assertEqual(
+            Post.objects.get(text='TestLocked').image.name, 'posts/' + saved[0]
+        )
+
     def test_edit_post_form(self):
         """Валидная форма редактирует запись в модели Post."""
         self.post = Post.objects.create(
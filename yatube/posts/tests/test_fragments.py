@@ -0,0 +1,51 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post, User
+from yatube.settings import POSTS_PER_PAGE
+
+POSTS_ON_SECOND_PAGE = 2
+
+
+class PostFragmentTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='TestUserAuthor')
+        cls.group = Group.objects.create(
+            title='TestGroup',
+            slug='test_slug',
+            description='TestDescription'
+        )
+        cls.posts = [
+            Post.objects.create(
+                author=cls.author, text=f'TestText{number}', group=cls.group
+            )
+            for number in range(POSTS_PER_PAGE + POSTS_ON_SECOND_PAGE)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_fragment_continues_page(self):
+        """Фрагмент продолжает ленту группы после первой страницы."""
+        response = self.client.get(
+            reverse('posts:group_list', kwargs={'slug': self.group.slug})
+        )
+        first_page = list(response.context['page_obj'])
+        response = self.client.get(response.context['next_url'])
+        self.assertTemplateNotUsed(response, 'base.html')
+        posts = response.context['posts']
+        self.assertEqual(len(posts), POSTS_ON_SECOND_PAGE)
+        self.assertFalse(set(posts) & set(first_page))
+        self.assertIsNone(response.context['next_url'])
+
+    def test_last_page_has_no_next_url(self):
+        """У последней страницы нет ссылки на фрагмент."""
+        response = self.client.get(
+            reverse('posts:profile', kwargs={'username': self.author}),
+            {'page': 2}
+        )
+        self.assertIsNone(response.context['next_url'])
@@ -0,0 +1,78 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.group_stats import reconcile
+from posts.models import Group, GroupStats, Post, User
+
+
+class GroupStatsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='TestUserAuthor')
+        cls.group = Group.objects.create(
+            title='TestGroup',
+            slug='test_slug',
+            description='TestDescription'
+        )
+        cls.other_group = Group.objects.create(
+            title='TestOtherGroup',
+            slug='test_other_slug',
+            description='TestDescription'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_signals_keep_stats(self):
+        """Создание, перенос и удаление поста обновляют статистику."""
+        first = Post.objects.create(
+            author=self.author, text='TestFirst', group=self.group
+        )
+        second = Post.objects.create(
+            author=self.author, text='TestSecond', group=self.group
+        )
+        stats = GroupStats.objects.get(group=self.group)
+        self.assertEqual(stats.post_count, 2)
+        self.assertEqual(stats.latest_post_id, second.pk)
+        second.group = self.other_group
+        second.save()
+        stats.refresh_from_db()
+        self.assertEqual(
+            (stats.post_count, stats.latest_post_id), (1, first.pk)
+        )
+        self.assertEqual(
+            GroupStats.objects.get(group=self.other_group).post_count, 1
+        )
+        first.delete()
+        stats.refresh_from_db()
+        self.assertEqual(
+            (stats.post_count, stats.latest_post_id), (0, None)
+        )
+
+    def test_reconcile_fixes_drift(self):
+        """Сверка исправляет только разошедшиеся группы."""
+        post = Post.objects.create(
+            author=self.author, text='TestText', group=self.group
+        )
+        GroupStats.objects.filter(group=self.group).update(post_count=5)
+        self.assertEqual(reconcile(), 2)
+        self.assertEqual(reconcile(), 0)
+        stats = GroupStats.objects.get(group=self.group)
+        self.assertEqual(
+            (stats.post_count, stats.latest_post_id), (1, post.pk)
+        )
+
+    def test_directory_single_query(self):
+        """Каталог групп строится одним запросом."""
+        Post.objects.create(
+            author=self.author, text='TestText', group=self.group
+        )
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('posts:group_directory'))
+        self.assertContains(response, 'Постов: 1')
+        self.assertContains(
+            response, reverse('posts:group_list', args=[self.group.slug])
+        )
@@ -0,0 +1,55 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post, User
+
+
+class AnonymousPageCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='TestUserAuthor')
+        cls.group = Group.objects.create(
+            title='TestGroup',
+            slug='test_slug',
+            description='TestDescription'
+        )
+        cls.post = Post.objects.create(
+            author=cls.author,
+            text='TestText',
+            group=cls.group
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.url = reverse(
+            'posts:group_list', kwargs={'slug': self.group.slug}
+        )
+
+    def test_guest_hit_does_not_touch_database(self):
+        """Повторная страница гостю отдаётся из кэша без запросов к БД."""
+        self.guest_client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.guest_client.get(self.url)
+        self.assertEqual(response['X-Page-Cache'], 'hit')
+        self.assertContains(response, self.post.text)
+
+    def test_new_post_changes_cache_key(self):
+        """Новый пост в группе сразу виден гостю."""
+        self.guest_client.get(self.url)
+        Post.objects.create(
+            author=self.author, text='TestNewText', group=self.group
+        )
+        response = self.guest_client.get(self.url)
+        self.assertNotIn('X-Page-Cache', response)
+        self.assertContains(response, 'TestNewText')
+
+    def test_authorized_user_bypasses_cache(self):
+        """Авторизованный пользователь кэш не использует."""
+        self.guest_client.get(self.url)
+        author_client = Client()
+        author_client.force_login(self.author)
+        response = author_client.get(self.url)
+        self.assertNotIn('X-Page-Cache', response)
@@ -0,0 +1,46 @@
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Comment, Post, User
+
+
+@override_settings(COMMENTS_PER_PAGE=2)
+class CommentCursorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='TestUserAuthor')
+        cls.post = Post.objects.create(author=cls.author, text='TestText')
+        cls.comments = [
+            Comment.objects.create(
+                post=cls.post, author=cls.author, text=f'TestComment{number}'
+            )
+            for number in range(3)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_first_page_and_fragment(self):
+        """Первые комментарии на post_detail, остальные — по курсору."""
+        response = self.client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.id})
+        )
+        self.assertEqual(response.context['comments'], self.comments[:2])
+        cursor = response.context['next_cursor']
+        response = self.client.get(
+            reverse('posts:post_comments', kwargs={'post_id': self.post.id}),
+            {'cursor': cursor}
+        )
+        self.assertEqual(response.context['comments'], self.comments[2:])
+        self.assertIsNone(response.context['next_cursor'])
+
+    def test_broken_cursor_is_rejected(self):
+        """Испорченный курсор — 400."""
+        response = self.client.get(
+            reverse('posts:post_comments', kwargs={'post_id': self.post.id}),
+            {'cursor': 'broken'}
+        )
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,53 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Follow, User
+from posts.recommendations import FollowGraph, build_csr, precompute
+
+
+class FollowGraphTests(TestCase):
+    def test_build_csr(self):
+        """CSR хранит соседей каждой вершины подряд."""
+        indptr, indices = build_csr(iter([(0, 2), (0, 3), (2, 1)]), 4)
+        self.assertEqual(list(indptr), [0, 2, 2, 3, 3])
+        self.assertEqual(list(indices), [2, 3, 1])
+
+    def test_suggest(self):
+        """Рекомендуются друзья друзей и соавторы подписок без уже
+        прочитанных."""
+        following = build_csr(iter([(1, 2), (2, 3), (4, 2), (4, 5)]), 6)
+        followers = build_csr(iter([(2, 1), (2, 4), (3, 2), (5, 4)]), 6)
+        graph = FollowGraph(following, followers)
+        self.assertEqual(graph.suggest(1, 5, 100), [3, 5])
+        self.assertEqual(graph.suggest(1, 1, 100), [3])
+        self.assertEqual(graph.suggest(3, 5, 100), [])
+
+
+class WhoToFollowTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='TestUser')
+        cls.friend = User.objects.create_user(username='TestUserFriend')
+        cls.author = User.objects.create_user(username='TestUserAuthor')
+        Follow.objects.create(user=cls.user, author=cls.friend)
+        Follow.objects.create(user=cls.friend, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_follow_index_shows_suggestions(self):
+        """Лента подписок показывает посчитанные рекомендации."""
+        response = self.client.get(reverse('posts:follow_index'))
+        self.assertEqual(response.context['who_to_follow'], [])
+        self.assertEqual(precompute(FollowGraph.build(), [self.user.pk]), 1)
+        response = self.client.get(reverse('posts:follow_index'))
+        self.assertEqual(
+            response.context['who_to_follow'], [self.author.username]
+        )
+        self.assertContains(
+            response, reverse('posts:profile', args=[self.author.username])
+        )
@@ -0,0 +1,111 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from posts.models import AuthorShard, Comment, Post, User
+from posts.sharding import (
+    MergedFeed, ShardRouter, move_author, seed_tickets, shard_for_author
+)
+
+
+class FakeShard(list):
+    def count(self):
+        return len(self)
+
+
+class MergedFeedTests(SimpleTestCase):
+    def test_pages_are_merged_by_pub_date(self):
+        """Посты из шардов сливаются по убыванию даты для Paginator."""
+        start = datetime(2022, 1, 1)
+        posts = [
+            SimpleNamespace(pk=number, pub_date=start + timedelta(number))
+            for number in range(7)
+        ]
+        feed = MergedFeed([
+            FakeShard(sorted(posts[::2], key=lambda post: -post.pk)),
+            FakeShard(sorted(posts[1::2], key=lambda post: -post.pk)),
+        ])
+        paginator = Paginator(feed, 3)
+        self.assertEqual(paginator.count, 7)
+        self.assertEqual(
+            [post.pk for post in paginator.page(2)], [3, 2, 1]
+        )
+
+
+@override_settings(POST_SHARDS=('default', 'replica'))
+class ShardRouterTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='TestUserAuthor')
+
+    def setUp(self):
+        cache.clear()
+        self.router = ShardRouter()
+
+    def test_author_shard_comes_from_directory(self):
+        """Шард автора берётся из AuthorShard, иначе по хешу id."""
+        hashed = ('default', 'replica')[self.author.id % 2]
+        self.assertEqual(shard_for_author(self.author.id), hashed)
+        AuthorShard.objects.create(author=self.author, shard='replica')
+        cache.clear()
+        self.assertEqual(shard_for_author(self.author.id), 'replica')
+
+    def test_posts_and_comments_follow_author_shard(self):
+        """Пост пишется в шард автора, комментарий — в шард поста."""
+        AuthorShard.objects.create(author=self.author, shard='replica')
+        post = Post(author=self.author, text='TestText')
+        self.assertEqual(
+            self.router.db_for_write(Post, instance=post), 'replica'
+        )
+        post._state.db = 'replica'
+        comment = Comment(post=post, author=self.author, text='TestComment')
+        self.assertEqual(
+            self.router.db_for_write(Comment, instance=comment), 'replica'
+        )
+        self.assertEqual(
+            self.router.db_for_read(Post, instance=self.author), 'replica'
+        )
+        self.assertEqual(
+            self.router.db_for_read(User, instance=post), 'default'
+        )
+
+    @override_settings(POST_SHARDS=('default',))
+    def test_sharded_posts_get_global_ids(self):
+        """Посты в шардах получают id из общей последовательности."""
+        first = Post.objects.create(author=self.author, text='First')
+        second = Post.objects.create(author=self.author, text='Second')
+        self.assertGreater(second.id, first.id)
+        self.assertEqual(Post.objects.get(id=second.id), second)
+
+    def test_tickets_start_above_existing_ids(self):
+        """После seed_tickets id из последовательности больше id постов,
+        созданных без шардирования."""
+        with self.settings(POST_SHARDS=()):
+            existing = Post.objects.create(author=self.author, text='Old')
+        with self.settings(POST_SHARDS=('default',)):
+            self.assertEqual(seed_tickets(), existing.id)
+            post = Post.objects.create(author=self.author, text='New')
+        self.assertGreater(post.id, existing.id)
+
+    def test_move_repeats_until_source_is_empty(self):
+        """Перенос сначала меняет справочник, затем копирует проходами,
+        пока в source остаются строки, записанные по старому шарду."""
+        passes = []
+
+        def copy_pass(author, source, target, post_ids):
+            passes.append((source, shard_for_author(author.id)))
+            found = ({1, 2}, {3}, set())[len(passes) - 1]
+            post_ids.update(found)
+            return len(found), 0
+
+        with mock.patch('posts.sharding.copy_pass', side_effect=copy_pass):
+            moved = move_author(
+                self.author, 'replica', source='default', settle=0
+            )
+        self.assertEqual(moved, 3)
+        self.assertEqual(passes, [('default', 'replica')] * 3)
@@ -0,0 +1,88 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts import counters
+from posts.models import Comment, Group, Post, TrendingPost, User
+from posts.trending import VIEWS_KEY, rebuild
+
+
+class TrendingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='TestUserAuthor')
+        cls.group = Group.objects.create(
+            title='TestGroup',
+            slug='test_slug',
+            description='TestDescription'
+        )
+        cls.quiet = Post.objects.create(author=cls.author, text='TestQuiet')
+        cls.popular = Post.objects.create(
+            author=cls.author, text='TestPopular', group=cls.group
+        )
+        cls.old = Post.objects.create(author=cls.author, text='TestOld')
+        for _ in range(3):
+            Comment.objects.create(
+                post=cls.popular, author=cls.author, text='TestComment'
+            )
+        Comment.objects.create(
+            post=cls.quiet, author=cls.author, text='TestComment'
+        )
+        for _ in range(5):
+            Comment.objects.create(
+                post=cls.old, author=cls.author, text='TestComment'
+            )
+        Comment.objects.filter(post=cls.old).update(
+            created=timezone.now() - timedelta(days=30)
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_rebuild_ranks_recent_comments(self):
+        """Рейтинг учитывает только комментарии из окна по убыванию веса."""
+        self.assertEqual(rebuild(), (2, 1))
+        self.assertEqual(
+            list(TrendingPost.objects.values_list('post_id', flat=True)),
+            [self.popular.pk, self.quiet.pk]
+        )
+
+    def test_views_raise_score(self):
+        """Прирост просмотров поднимает пост в рейтинге."""
+        counters.flush(Counter({self.quiet.pk: 100}))
+        rebuild()
+        self.assertEqual(
+            TrendingPost.objects.values_list('post_id', flat=True)[0],
+            self.quiet.pk
+        )
+
+    def test_only_flushed_views_are_read(self):
+        """Пересчёт берёт приросты из журнала сброса, а не счётчики всех
+        постов, и не хранит угасшие веса."""
+        Post.objects.filter(pk=self.old.pk).update(views=1000)
+        counters.flush(Counter({self.quiet.pk: 1}))
+        now = timezone.now()
+        rebuild(now)
+        self.assertEqual(
+            set(cache.get(VIEWS_KEY)['scores']), {self.quiet.pk}
+        )
+        rebuild(now + timedelta(days=10))
+        self.assertEqual(cache.get(VIEWS_KEY)['scores'], {})
+
+    def test_trending_page(self):
+        """Страница популярного показывает посты и группы из рейтинга."""
+        rebuild()
+        response = self.client.get(reverse('posts:trending'))
+        self.assertEqual(
+            response.context['posts'], [self.popular, self.quiet]
+        )
+        self.assertEqual(
+            response.context['groups'][0].group, self.group
+        )
+        self.assertEqual(response.context['groups'][0].recent_posts, 1)
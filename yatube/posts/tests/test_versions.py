@@ -0,0 +1,80 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Group, Post, User
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='TestUserAuthor')
+        cls.group = Group.objects.create(
+            title='TestGroup',
+            slug='test_slug',
+            description='TestDescription'
+        )
+        cls.post = Post.objects.create(
+            author=cls.author,
+            text='TestText',
+            group=cls.group
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+
+    def test_unchanged_pages_return_not_modified(self):
+        """Повторный запрос с ETag без изменений получает 304."""
+        for url in (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.author}),
+            reverse('posts:post_detail', kwargs={'post_id': self.post.id}),
+        ):
+            with self.subTest(url=url):
+                etag = self.guest_client.get(url)['ETag']
+                response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+
+    def test_comment_changes_post_etag(self):
+        """Новый комментарий меняет ETag страницы поста."""
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.id})
+        etag = self.guest_client.get(url)['ETag']
+        Comment.objects.create(
+            post=self.post, author=self.author, text='TestComment'
+        )
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_group_change_moves_post_between_feeds(self):
+        """Смена группы поста меняет ETag прежней группы."""
+        url = reverse('posts:group_list', kwargs={'slug': self.group.slug})
+        etag = self.guest_client.get(url)['ETag']
+        self.post.group = None
+        self.post.save()
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_last_modified_only_for_anonymous(self):
+        """Last-Modified отдаётся только анонимам, ETag — всем."""
+        url = reverse('posts:profile', kwargs={'username': self.author})
+        self.assertIn('Last-Modified', self.guest_client.get(url))
+        response = self.author_client.get(url)
+        self.assertNotIn('Last-Modified', response)
+        self.assertNotEqual(
+            response['ETag'], self.guest_client.get(url)['ETag']
+        )
+
+    def test_new_session_changes_etag(self):
+        """После выхода и нового входа старый ETag не даёт 304."""
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.id})
+        self.author_client.get(url)
+        etag = self.author_client.get(url)['ETag']
+        self.author_client.logout()
+        self.author_client.force_login(self.author)
+        response = self.author_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,75 @@
+from django.core.cache import cache
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils.cache import get_cache_key
+
+from posts import warming
+from posts.models import Group, Post, User
+
+
+@override_settings(WARMING_INDEX_PAGES=2, WARMING_GROUPS=1)
+class CacheWarmingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='TestUserAuthor')
+        cls.groups = [
+            Group.objects.create(title=slug, slug=slug, description=slug)
+            for slug in ('first', 'second')
+        ]
+        for group in cls.groups:
+            Post.objects.create(author=cls.author, text='Text', group=group)
+
+    def setUp(self):
+        cache.clear()
+
+    @override_settings(WARMING_FLUSH_INTERVAL=0)
+    def test_hot_paths_follow_access_stats(self):
+        """Из активных групп прогревается самая посещаемая."""
+        second = reverse('posts:group_list', args=['second'])
+        warming.record_access(RequestFactory().get(second))
+        self.assertEqual(warming.hot_paths(), [
+            reverse('posts:index'),
+            f'{reverse("posts:index")}?page=2',
+            second,
+            reverse('posts:profile', args=[self.author.username]),
+        ])
+
+    def test_post_write_warms_index_pages(self):
+        """После записи поста прогреваются и первые страницы главной."""
+        post = Post.objects.filter(group=self.groups[0]).first()
+        index = reverse('posts:index')
+        self.assertEqual(warming.post_paths(post), [
+            index,
+            f'{index}?page=2',
+            reverse('posts:profile', args=[self.author.username]),
+            reverse('posts:post_detail', args=[post.pk]),
+            reverse('posts:group_list', args=['first']),
+        ])
+
+    def test_warmed_page_is_served_from_cache(self):
+        """Прогретая страница гостю отдаётся из кэша."""
+        url = reverse('posts:group_list', args=['first'])
+        self.assertEqual(warming.warm_page(url)[1], 200)
+        response = Client().get(url)
+        self.assertEqual(response['X-Page-Cache'], 'hit')
+
+    @override_settings(WARMING_FLUSH_INTERVAL=0)
+    def test_warm_requests_are_not_counted(self):
+        """Запросы прогрева не попадают в статистику обращений."""
+        url = reverse('posts:group_list', args=['first'])
+        warming.warm_page(url)
+        warming.record_access(RequestFactory().get(url))
+        self.assertEqual(warming.access_counts(), {url: 1})
+
+    @override_settings(WARMING_FLUSH_INTERVAL=0)
+    def test_pages_are_warmed_for_real_host(self):
+        """Главная прогревается под ключом с Host настоящих запросов."""
+        factory = RequestFactory(HTTP_HOST='localhost:8000')
+        warming.record_access(factory.get(reverse('posts:group_directory')))
+        self.assertEqual(warming.warming_origin(), ('http', 'localhost:8000'))
+        index = reverse('posts:index')
+        self.assertEqual(warming.warm_page(index)[1], 200)
+        key = get_cache_key(factory.get(index), 'index_page', cache=cache)
+        self.assertIsNotNone(key)
+        self.assertIsNotNone(cache.get(key))
@@ -0,0 +1,140 @@
+"""Рейтинг популярных постов и групп.
+
+Рейтинг считает команда rebuild_trending по скользящему окну
+TRENDING_WINDOW: каждый комментарий добавляет посту вес, который
+вдвое убывает за TRENDING_HALF_LIFE, каждый пост так же добавляет вес
+своей группе. Просмотры не датированы, поэтому их прирост с прошлого
+пересчёта из журнала posts.counters добавляется к весу просмотров
+поста, убывающему с той же скоростью; веса и номер прочитанной записи
+журнала хранятся в кэше. Результат —
+первые TRENDING_POSTS постов и TRENDING_GROUPS групп в таблицах
+TrendingPost и TrendingGroup, страница популярного читает их по индексу
+на score без агрегатов.
+"""
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils import timezone
+
+from posts.counters import read_log
+from posts.models import Comment, Post, TrendingGroup, TrendingPost
+from posts.pagination import with_related
+from posts.sharding import shard_querysets
+from posts.versions import bump
+
+
+def decay(moment, now):
+    age = (now - moment).total_seconds()
+    return 0.5 ** (age / settings.TRENDING_HALF_LIFE)
+
+
+def window_start(now):
+    return now - timedelta(seconds=settings.TRENDING_WINDOW)
+
+
+def decayed_counts(queryset, key, moment, now):
+    """Сумма убывающих весов строк queryset по значению поля key."""
+    scores = Counter()
+    for part in shard_querysets(
+        queryset.filter(**{f'{moment}__gte': window_start(now)})
+    ):
+        for value, created in part.values_list(key, moment).iterator():
+            scores[value] += decay(created, now)
+    return scores
+
+
+VIEWS_KEY = 'posts:trending:views'
+# Меньшие веса просмотров не хранятся, чтобы снимок не рос.
+MIN_VIEW_SCORE = 0.01
+
+
+def view_scores(now):
+    """Веса просмотров: прошлые, убывшие с прошлого пересчёта, плюс
+    приросты из журнала. Читаются только просмотренные посты."""
+    previous = cache.get(VIEWS_KEY) or {'at': now, 'log': 0, 'scores': {}}
+    increments, last = read_log(previous.get('log', 0))
+    factor = decay(previous['at'], now)
+    scores = {}
+    for post_id in {*previous['scores'], *increments}:
+        score = (
+            previous['scores'].get(post_id, 0) * factor
+            + increments[post_id]
+        )
+        if score >= MIN_VIEW_SCORE:
+            scores[post_id] = score
+    cache.set(VIEWS_KEY, {'at': now, 'log': last, 'scores': scores}, None)
+    return scores
+
+
+def post_scores(now):
+    scores = Counter()
+    for post_id, score in decayed_counts(
+        Comment.objects.filter(post__isnull=False), 'post_id', 'created', now
+    ).items():
+        scores[post_id] += score * settings.TRENDING_COMMENT_WEIGHT
+    for post_id, score in view_scores(now).items():
+        scores[post_id] += score * settings.TRENDING_VIEW_WEIGHT
+    return scores
+
+
+def group_scores(now):
+    return decayed_counts(
+        Post.objects.filter(group__isnull=False), 'group_id', 'pub_date', now
+    )
+
+
+def group_volumes(now):
+    volumes = Counter()
+    for part in shard_querysets(Post.objects.filter(
+        group__isnull=False, pub_date__gte=window_start(now)
+    )):
+        volumes.update(part.values_list('group_id', flat=True).iterator())
+    return volumes
+
+
+def rebuild(now=None):
+    """Пересчитывает оба рейтинга; возвращает число постов и групп."""
+    if now is None:
+        now = timezone.now()
+    posts = post_scores(now).most_common(settings.TRENDING_POSTS)
+    groups = group_scores(now).most_common(settings.TRENDING_GROUPS)
+    volumes = group_volumes(now)
+    with transaction.atomic(using=DEFAULT_DB_ALIAS):
+        TrendingPost.objects.all().delete()
+        TrendingPost.objects.bulk_create(
+            TrendingPost(post_id=post_id, score=score)
+            for post_id, score in posts
+        )
+        TrendingGroup.objects.all().delete()
+        TrendingGroup.objects.bulk_create(
+            TrendingGroup(
+                group_id=group_id, score=score, recent_posts=volumes[group_id]
+            )
+            for group_id, score in groups
+        )
+    bump('trending')
+    return len(posts), len(groups)
+
+
+def trending_posts(limit=None):
+    """Посты рейтинга в порядке убывания score."""
+    if limit is None:
+        limit = settings.TRENDING_POSTS
+    ids = list(
+        TrendingPost.objects.values_list('post_id', flat=True)[:limit]
+    )
+    posts = {}
+    for part in shard_querysets(Post.objects.filter(id__in=ids)):
+        posts.update(
+            (post.pk, post) for post in with_related(part, 'author', 'group')
+        )
+    return [posts[post_id] for post_id in ids if post_id in posts]
+
+
+def trending_groups(limit=None):
+    if limit is None:
+        limit = settings.TRENDING_GROUPS
+    return list(TrendingGroup.objects.select_related('group')[:limit])
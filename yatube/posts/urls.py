@@ -4,11 +4,35 @@ from posts import views
 
 app_name = 'posts'
 
+ARCHIVE_PERIODS = (
+    '<int:year>/',
+    '<int:year>/<int:month>/',
+    '<int:year>/<int:month>/<int:day>/',
+)
+
 urlpatterns = [
     path('', views.index, name='index'),
+    path('fragment/', views.index_fragment, name='index_fragment'),
+    path('trending/', views.trending, name='trending'),
+    path('groups/', views.group_directory, name='group_directory'),
     path('group/<slug:slug>/', views.group_list, name='group_list'),
+    path(
+        'group/<slug:slug>/fragment/',
+        views.group_fragment,
+        name='group_fragment'
+    ),
     path('profile/<str:username>/', views.profile, name='profile'),
+    path(
+        'profile/<str:username>/fragment/',
+        views.profile_fragment,
+        name='profile_fragment'
+    ),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
+    path(
+        'posts/<int:post_id>/comments/',
+        views.post_comments,
+        name='post_comments'
+    ),
     path('create/', views.post_create, name='post_create'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
     path(
@@ -17,6 +41,11 @@ urlpatterns = [
         name='add_comment'
     ),
     path('follow/', views.follow_index, name='follow_index'),
+    path(
+        'follow/fragment/',
+        views.follow_fragment,
+        name='follow_fragment'
+    ),
     path(
         'profile/<str:username>/follow/',
         views.profile_follow,
@@ -28,3 +57,18 @@ urlpatterns = [
         name='profile_unfollow'
     )
 ]
+
+for period in ARCHIVE_PERIODS:
+    urlpatterns += [
+        path(f'archive/{period}', views.archive, name='archive'),
+        path(
+            f'group/<slug:slug>/archive/{period}',
+            views.group_archive,
+            name='group_archive'
+        ),
+        path(
+            f'profile/<str:username>/archive/{period}',
+            views.profile_archive,
+            name='profile_archive'
+        ),
+    ]
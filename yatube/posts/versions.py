@@ -0,0 +1,157 @@
+"""Версии областей сайта для условных GET-запросов.
+
+Версия области — время её последнего изменения, хранится в кэше и
+обновляется сигналами Post, Comment, Follow и Group. Области:
+'feed' — все посты, 'group:<slug>', 'author:<username>', 'post:<id>'
+и 'follows:<user_id>' — подписки пользователя. По версиям
+без запросов к БД считаются ETag и Last-Modified.
+
+Реплика отстаёт от версий до следующего refresh_replica, поэтому
+страница, чья область изменилась после последней копии, читает
+основную БД: иначе её старое содержимое попало бы в кэш и в ETag
+под новой версией.
+"""
+import hashlib
+import time
+from datetime import datetime, timezone
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.views.decorators.http import condition
+
+from core.circuit import STALE_HEADER, strip_validators
+from core.routers import pin_if_replica_behind
+from posts.models import Post
+
+
+def version_key(scope):
+    return f'posts:version:{scope}'
+
+
+def get_versions(scopes):
+    keys = [version_key(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+    missing = {key: time.time() for key in keys if key not in versions}
+    if missing:
+        # Версия неизвестна (кэш очищен) — считаем, что область изменилась.
+        cache.set_many(missing, None)
+        versions.update(missing)
+    versions = [versions[key] for key in keys]
+    if versions:
+        pin_if_replica_behind(max(versions))
+    return versions
+
+
+def bump(*scopes):
+    now = time.time()
+    cache.set_many({version_key(scope): now for scope in scopes}, None)
+
+
+def viewer(request):
+    """Пользователь, его сессия и CSRF-кука: страница с формой несёт
+    токен, и после нового входа старая копия с ним не годится."""
+    if request.user.is_authenticated:
+        user = str(request.user.pk)
+    else:
+        user = 'anonymous'
+    return ':'.join((
+        user,
+        request.COOKIES.get(settings.SESSION_COOKIE_NAME, ''),
+        request.COOKIES.get(settings.CSRF_COOKIE_NAME, ''),
+    ))
+
+
+def make_etag(request, scopes):
+    versions = ':'.join(map(repr, get_versions(scopes)))
+    return hashlib.md5(
+        f'{viewer(request)}:{versions}'.encode()
+    ).hexdigest()
+
+
+def make_last_modified(request, scopes):
+    """Last-Modified только для анонимов: страница пользователя зависит
+    от его подписок и прав, а не только от времени изменения."""
+    if request.user.is_authenticated:
+        return None
+    return datetime.fromtimestamp(max(get_versions(scopes)), timezone.utc)
+
+
+def conditional(scopes):
+    """condition() с валидаторами из версий областей scopes(request, ...).
+
+    scopes сохраняется в version_scopes представления для
+    AnonymousPageCacheMiddleware. Старой копии страницы на время сбоя
+    БД condition() поставил бы ETag текущей версии, поэтому её
+    валидаторы снимаются.
+    """
+    def etag_func(request, *args, **kwargs):
+        return make_etag(request, scopes(request, *args, **kwargs))
+
+    def last_modified_func(request, *args, **kwargs):
+        return make_last_modified(request, scopes(request, *args, **kwargs))
+
+    def decorator(view_func):
+        conditional_view = condition(
+            etag_func=etag_func, last_modified_func=last_modified_func
+        )(view_func)
+
+        @wraps(conditional_view)
+        def wrapper(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            if STALE_HEADER in response:
+                strip_validators(response)
+            return response
+        wrapper.version_scopes = scopes
+        return wrapper
+    return decorator
+
+
+def post_scopes(post, group_slug=None):
+    scopes = ['feed', f'author:{post.author.username}', f'post:{post.pk}']
+    if group_slug:
+        scopes.append(f'group:{group_slug}')
+    return scopes
+
+
+def remember_group(sender, instance, raw=False, **kwargs):
+    """Запоминает прежнюю группу поста, её лента тоже меняется."""
+    instance._previous_group_id = None
+    instance._previous_group_slug = None
+    if raw or instance._state.adding:
+        return
+    previous = Post.objects.using(kwargs.get('using')).filter(
+        pk=instance.pk
+    ).values_list('group_id', 'group__slug').first()
+    if previous is not None:
+        (
+            instance._previous_group_id, instance._previous_group_slug
+        ) = previous
+
+
+def post_changed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    scopes = post_scopes(instance, instance.group and instance.group.slug)
+    previous = getattr(instance, '_previous_group_slug', None)
+    if previous:
+        scopes.append(f'group:{previous}')
+    bump(*scopes)
+
+
+def comment_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump(f'post:{instance.post_id}')
+
+
+def follow_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump(
+            f'author:{instance.author.username}',
+            f'follows:{instance.user_id}'
+        )
+
+
+def group_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump('feed', f'group:{instance.slug}')
@@ -1,46 +1,243 @@
+from datetime import date
+
 from django.core.paginator import Paginator
 from django.contrib.auth.decorators import login_required
+from django.http import HttpResponseBadRequest
 from django.shortcuts import render, get_object_or_404, redirect
-from django.views.decorators.cache import cache_page
+from django.urls import reverse
 
+from core.circuit import stale_if_error
+from core.db import save_files, write_alias, write_transaction
+from core.ratelimit import ratelimit
+from core.swr import cache_page_swr
 from yatube.settings import POSTS_PER_PAGE, CACHE_DURATION
 from posts.models import Post, Group, User, Follow
 from posts.forms import PostForm, CommentForm
+from posts.pagination import (
+    comments_page, cursor_page, decode_cursor, encode_cursor, with_related
+)
+from posts.archive import histogram, histogram_years, in_period
+from posts.group_stats import directory
+from posts.recommendations import who_to_follow
+from posts.sharding import feed, get_post_or_404
+from posts.trending import trending_groups, trending_posts
+from posts.versions import conditional
+
+
+# Поля карточки поста в лентах: выдержка вместо полного текста.
+CARD_FIELDS = (
+    'id', 'pub_date', 'excerpt', 'excerpt_truncated', 'image', 'author',
+    'group'
+)
+
+
+def card_queryset(queryset):
+    """Посты для карточек лент с авторами и группами."""
+    return with_related(queryset, 'author', 'group').only(*CARD_FIELDS)
 
 
-@cache_page(CACHE_DURATION, key_prefix='index_page')
+def next_url(page_obj, url):
+    """Адрес фрагмента с постами, идущими после страницы page_obj."""
+    if not page_obj.has_next():
+        return None
+    last = page_obj[len(page_obj) - 1]
+    return f'{url}?cursor={encode_cursor(last.pub_date, last.pk)}'
+
+
+def archive_navigation(counts, url_name, url_args):
+    """Годы и месяцы гистограммы со ссылками на их архивы."""
+    return [
+        (
+            reverse(url_name, args=[*url_args, year]),
+            year,
+            [
+                (
+                    reverse(url_name, args=[*url_args, year, month]),
+                    date(year, month, 1),
+                    count
+                )
+                for month, count in months
+            ]
+        )
+        for year, months in histogram_years(counts)
+    ]
+
+
+def archive_page(request, queryset, scope, url_name, url_args, period,
+                 **options):
+    """Посты периода (год, месяц, день) и навигация по месяцам."""
+    template = 'posts/archive.html'
+    post_list = feed(card_queryset(in_period(queryset, *period)))
+    paginator = Paginator(post_list, POSTS_PER_PAGE)
+    page_number = request.GET.get('page')
+    page_obj = paginator.get_page(page_number)
+    year, month, day = period
+    context = {
+        'page_obj': page_obj,
+        'period': date(year, month or 1, day or 1),
+        'month': month,
+        'day': day,
+        'years': archive_navigation(
+            histogram(scope, queryset), url_name, url_args
+        ),
+        **options
+    }
+    return render(request, template, context)
+
+
+def post_fragment(request, queryset, **options):
+    """Только карточки постов после курсора, без base.html."""
+    template = 'posts/includes/post_list.html'
+    after = decode_cursor(request.GET.get('cursor', ''))
+    if after is None:
+        return HttpResponseBadRequest()
+    posts, next_cursor = cursor_page(
+        card_queryset(queryset),
+        'pub_date',
+        after,
+        descending=True,
+        merge_shards=True
+    )
+    context = {
+        'posts': posts,
+        'next_url': next_cursor and f'{request.path}?cursor={next_cursor}',
+        **options
+    }
+    return render(request, template, context)
+
+
+@cache_page_swr(CACHE_DURATION, key_prefix='index_page')
+@conditional(lambda request: ['feed'])
+@stale_if_error
 def index(request):
     text = 'Последние обновления на сайте'
     template = 'posts/index.html'
-    post_list = Post.objects.all()
+    post_list = feed(card_queryset(Post.objects.all()))
     paginator = Paginator(post_list, POSTS_PER_PAGE)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     context = {
         'page_obj': page_obj,
         'text': text,
+        'next_url': next_url(page_obj, reverse('posts:index_fragment')),
     }
     return render(request, template, context)
 
 
+@conditional(lambda request: ['feed'])
+def index_fragment(request):
+    return post_fragment(request, Post.objects.all())
+
+
+@conditional(lambda request: ['trending'])
+@stale_if_error
+def trending(request):
+    template = 'posts/trending.html'
+    context = {
+        'posts': trending_posts(),
+        'groups': trending_groups(),
+        'trending': True,
+    }
+    return render(request, template, context)
+
+
+@conditional(lambda request: ['feed'])
+@stale_if_error
+def group_directory(request):
+    template = 'posts/groups.html'
+    context = {
+        'groups': directory(),
+    }
+    return render(request, template, context)
+
+
+@conditional(lambda request, year, month=None, day=None: ['feed'])
+@stale_if_error
+def archive(request, year, month=None, day=None):
+    return archive_page(
+        request,
+        Post.objects.all(),
+        'feed',
+        'posts:archive',
+        [],
+        (year, month, day),
+        text='Архив записей'
+    )
+
+
+@conditional(
+    lambda request, slug, year, month=None, day=None: [f'group:{slug}']
+)
+@stale_if_error
+def group_archive(request, slug, year, month=None, day=None):
+    group = get_object_or_404(Group, slug=slug)
+    return archive_page(
+        request,
+        Post.objects.filter(group=group),
+        f'group:{group.pk}',
+        'posts:group_archive',
+        [slug],
+        (year, month, day),
+        text=f'Архив сообщества "{group.title}"',
+        hide_group=True
+    )
+
+
+@conditional(
+    lambda request, username, year, month=None, day=None: [
+        f'author:{username}'
+    ]
+)
+@stale_if_error
+def profile_archive(request, username, year, month=None, day=None):
+    author = get_object_or_404(User, username=username)
+    return archive_page(
+        request,
+        Post.objects.filter(author=author),
+        f'author:{author.pk}',
+        'posts:profile_archive',
+        [username],
+        (year, month, day),
+        text=f'Архив записей {author.get_full_name() or author.username}',
+        hide_author=True
+    )
+
+
+@conditional(lambda request, slug: [f'group:{slug}'])
+@stale_if_error
 def group_list(request, slug):
     template = 'posts/group_list.html'
     group = get_object_or_404(Group, slug=slug)
-    post_list = group.posts.all()
+    post_list = feed(card_queryset(group.posts.all()))
     paginator = Paginator(post_list, POSTS_PER_PAGE)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     context = {
         'group': group,
         'page_obj': page_obj,
+        'next_url': next_url(
+            page_obj, reverse('posts:group_fragment', args=[slug])
+        ),
     }
     return render(request, template, context)
 
 
+@conditional(lambda request, slug: [f'group:{slug}'])
+def group_fragment(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    return post_fragment(
+        request, Post.objects.filter(group=group), hide_group=True
+    )
+
+
+@conditional(
+    lambda request, username: [f'author:{username}', 'who_to_follow']
+)
+@stale_if_error
 def profile(request, username):
     template = 'posts/profile.html'
     user = get_object_or_404(User, username=username)
-    post_list = user.posts.all()
+    post_list = card_queryset(user.posts.all())
     paginator = Paginator(post_list, POSTS_PER_PAGE)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
@@ -53,27 +250,59 @@ def profile(request, username):
     context = {
         'author': user,
         'page_obj': page_obj,
-        'following': following
+        'following': following,
+        'next_url': next_url(
+            page_obj, reverse('posts:profile_fragment', args=[username])
+        ),
+        'who_to_follow': who_to_follow(request.user),
     }
     return render(request, template, context)
 
 
+@conditional(lambda request, username: [f'author:{username}'])
+def profile_fragment(request, username):
+    author = get_object_or_404(User, username=username)
+    return post_fragment(
+        request, Post.objects.filter(author=author), hide_author=True
+    )
+
+
+@conditional(lambda request, post_id: ['feed', f'post:{post_id}'])
+@stale_if_error
 def post_detail(request, post_id):
     template = 'posts/post_detail.html'
-    post = get_object_or_404(Post, id=post_id)
+    post = get_post_or_404(post_id)
     form = CommentForm()
-    comments = post.comments.all()
+    comments, next_cursor = comments_page(post)
     context = {
         'post': post,
         'form': form,
-        'comments': comments
+        'comments': comments,
+        'next_cursor': next_cursor
     }
     if request.user == post.author:
         context['is_edit'] = True
     return render(request, template, context)
 
 
+@conditional(lambda request, post_id: [f'post:{post_id}'])
+def post_comments(request, post_id):
+    template = 'posts/includes/comments.html'
+    after = decode_cursor(request.GET.get('cursor', ''))
+    if after is None:
+        return HttpResponseBadRequest()
+    post = get_post_or_404(post_id)
+    comments, next_cursor = comments_page(post, after)
+    context = {
+        'post': post,
+        'comments': comments,
+        'next_cursor': next_cursor
+    }
+    return render(request, template, context)
+
+
 @login_required
+@ratelimit('post', methods=('POST',))
 def post_create(request):
     template = 'posts/create_post.html'
     if request.method != 'POST':
@@ -87,14 +316,15 @@ def post_create(request):
         return render(request, template, {'form': form})
     new_post = form.save(commit=False)
     new_post.author = request.user
-    new_post.save()
+    save_files(new_post)
+    write_transaction(new_post.save, using=write_alias(new_post))()
     return redirect('posts:profile', username=new_post.author)
 
 
 @login_required
 def post_edit(request, post_id):
     template = 'posts/create_post.html'
-    post = get_object_or_404(Post, id=post_id)
+    post = get_post_or_404(post_id)
     if request.user != post.author:
         return redirect('posts:post_detail', post_id=post_id)
     form = PostForm(
@@ -109,43 +339,67 @@ def post_edit(request, post_id):
     }
     if not form.is_valid():
         return render(request, template, context)
-    form.save()
+    save_files(form.instance)
+    write_transaction(form.save, using=write_alias(form.instance))()
     return redirect('posts:post_detail', post_id=post_id)
 
 
 @login_required
+@ratelimit('comment', methods=('POST',))
 def add_comment(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
+    post = get_post_or_404(post_id)
     form = CommentForm(request.POST or None)
     if form.is_valid():
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = post
-        comment.save()
+        write_transaction(comment.save, using=write_alias(comment))()
     return redirect('posts:post_detail', post_id=post_id)
 
 
 @login_required
+@conditional(
+    lambda request: ['feed', f'follows:{request.user.pk}', 'who_to_follow']
+)
 def follow_index(request):
     text = 'Последние посты авторов из Ваших подписок'
     template = 'posts/follow.html'
-    post_list = Post.objects.filter(author__following__user=request.user)
+    authors = Follow.objects.filter(
+        user=request.user
+    ).values_list('author', flat=True)
+    post_list = feed(
+        card_queryset(Post.objects.filter(author__in=list(authors)))
+    )
     paginator = Paginator(post_list, POSTS_PER_PAGE)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     context = {
         'page_obj': page_obj,
         'text': text,
+        'next_url': next_url(page_obj, reverse('posts:follow_fragment')),
+        'who_to_follow': who_to_follow(request.user),
     }
     return render(request, template, context)
 
 
 @login_required
+@conditional(lambda request: ['feed', f'follows:{request.user.pk}'])
+def follow_fragment(request):
+    authors = Follow.objects.filter(
+        user=request.user
+    ).values_list('author', flat=True)
+    return post_fragment(
+        request, Post.objects.filter(author__in=list(authors))
+    )
+
+
+@login_required
+@ratelimit('follow')
 def profile_follow(request, username):
     follower = request.user
     following = get_object_or_404(User, username=username)
     if follower != following:
-        Follow.objects.get_or_create(
+        write_transaction(Follow.objects.get_or_create)(
             user=follower,
             author=following
         )
@@ -159,5 +413,5 @@ def profile_unfollow(request, username):
         author__username=username
     )
     if follow_object.exists():
-        follow_object.delete()
+        write_transaction(follow_object.delete)()
     return redirect('posts:profile', username=username)
@@ -0,0 +1,204 @@
+"""Прогрев кэша горячих страниц.
+
+Статистика обращений копится в памяти процесса и раз в
+WARMING_FLUSH_INTERVAL секунд сливается в кэш. Горячими считаются
+первые WARMING_INDEX_PAGES страниц главной, группы и авторы с постами
+за последние WARMING_RECENT_DAYS дней — самые посещаемые из них.
+
+Страницы рисуются гостевым запросом через тот же WSGI-обработчик, что
+и обычные, с адресом сайта (схема и Host) последнего настоящего
+запроса, поэтому попадают под те же ключи кэша, что и у гостей.
+Запросы прогрева несут заголовок X-Cache-Warming и в статистику
+обращений не попадают.
+"""
+import io
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from functools import partial
+from threading import Lock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connections, transaction
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import Group, Post, User
+
+ACCESS_KEY = 'posts:warming:access'
+ORIGIN_KEY = 'posts:warming:origin'
+WARMING_HEADER = 'HTTP_X_CACHE_WARMING'
+
+_access = Counter()
+_access_lock = Lock()
+_last_flush = [time.monotonic()]
+_executor = []
+_handler = []
+
+
+def is_warming(request):
+    return WARMING_HEADER in request.META
+
+
+def record_access(request):
+    """Считает обращение к странице; запросы прогрева не считаются."""
+    if is_warming(request):
+        return
+    with _access_lock:
+        _access[request.get_full_path()] += 1
+        now = time.monotonic()
+        if now - _last_flush[0] < settings.WARMING_FLUSH_INTERVAL:
+            return
+        pending = _access.copy()
+        _access.clear()
+        _last_flush[0] = now
+    counts = Counter(cache.get(ACCESS_KEY, {}))
+    counts.update(pending)
+    cache.set_many({
+        ACCESS_KEY: dict(counts.most_common(settings.WARMING_TRACKED_PATHS)),
+        ORIGIN_KEY: (request.scheme, request.get_host()),
+    }, None)
+
+
+def access_counts():
+    return cache.get(ACCESS_KEY, {})
+
+
+def recent_values(field):
+    """Значения field постов за WARMING_RECENT_DAYS во всех шардах."""
+    since = timezone.now() - timedelta(days=settings.WARMING_RECENT_DAYS)
+    values = set()
+    for alias in settings.POST_SHARDS or (None,):
+        queryset = Post.objects.filter(pub_date__gte=since)
+        if alias is not None:
+            queryset = queryset.using(alias)
+        values.update(queryset.values_list(field, flat=True).distinct())
+    values.discard(None)
+    return values
+
+
+def most_accessed(paths, limit):
+    counts = access_counts()
+    return sorted(paths, key=lambda path: -counts.get(path, 0))[:limit]
+
+
+def index_paths():
+    """Первые WARMING_INDEX_PAGES страниц главной."""
+    index = reverse('posts:index')
+    return [index] + [
+        f'{index}?page={number}'
+        for number in range(2, settings.WARMING_INDEX_PAGES + 1)
+    ]
+
+
+def hot_paths():
+    paths = index_paths()
+    groups = Group.objects.filter(
+        id__in=recent_values('group_id')
+    ).values_list('slug', flat=True)
+    paths += most_accessed(
+        [reverse('posts:group_list', args=[slug]) for slug in groups],
+        settings.WARMING_GROUPS
+    )
+    authors = User.objects.filter(
+        id__in=recent_values('author_id')
+    ).values_list('username', flat=True)
+    paths += most_accessed(
+        [reverse('posts:profile', args=[username]) for username in authors],
+        settings.WARMING_AUTHORS
+    )
+    return paths
+
+
+def warming_origin():
+    """Схема и Host настоящих запросов; до первого — WARMING_HOST."""
+    return cache.get(ORIGIN_KEY) or ('http', settings.WARMING_HOST)
+
+
+def warming_environ(path, scheme, host):
+    path_info, _, query_string = path.partition('?')
+    server_name, _, port = host.partition(':')
+    return {
+        'REQUEST_METHOD': 'GET',
+        'SCRIPT_NAME': '',
+        'PATH_INFO': path_info,
+        'QUERY_STRING': query_string,
+        'SERVER_NAME': server_name,
+        'SERVER_PORT': port or ('443' if scheme == 'https' else '80'),
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': host,
+        'REMOTE_ADDR': '127.0.0.1',
+        WARMING_HEADER: '1',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scheme,
+        'wsgi.input': io.BytesIO(),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+
+
+def get_handler():
+    if not _handler:
+        _handler.append(WSGIHandler())
+    return _handler[0]
+
+
+def warm_page(path, origin=None):
+    """Рисует path гостевым запросом через все middleware."""
+    scheme, host = origin or warming_origin()
+    started = time.perf_counter()
+    response = get_handler()(
+        warming_environ(path, scheme, host), lambda status, headers: None
+    )
+    response.close()
+    return path, response.status_code, time.perf_counter() - started
+
+
+def warm_page_in_thread(path):
+    try:
+        return warm_page(path)
+    finally:
+        connections.close_all()
+
+
+def get_executor():
+    if not _executor:
+        _executor.append(
+            ThreadPoolExecutor(max_workers=settings.WARMING_WORKERS)
+        )
+    return _executor[0]
+
+
+def warm(paths, wait=True):
+    """Рисует paths в пуле потоков; с wait=False не ждёт результатов."""
+    futures = [get_executor().submit(warm_page_in_thread, p) for p in paths]
+    if wait:
+        return [future.result() for future in futures]
+    return futures
+
+
+def post_paths(post):
+    paths = index_paths() + [
+        reverse('posts:profile', args=[post.author.username]),
+        reverse('posts:post_detail', args=[post.pk]),
+    ]
+    if post.group_id:
+        paths.append(reverse('posts:group_list', args=[post.group.slug]))
+    return paths
+
+
+def post_written(sender, instance, raw=False, **kwargs):
+    """После записи поста или комментария прогревает затронутые страницы."""
+    if raw or not settings.WARMING_ON_WRITE:
+        return
+    post = getattr(instance, 'post', instance)
+    transaction.on_commit(
+        partial(warm, post_paths(post), wait=False),
+        using=kwargs.get('using')
+    )
@@ -0,0 +1,31 @@
+// Ссылка с data-load-more заменяется HTML-фрагментом по адресу из
+// атрибута (или из href). После первой подгрузки элементы с
+// data-load-more-hide, например постраничная навигация, скрываются.
+document.addEventListener('click', function (event) {
+  var link = event.target.closest('[data-load-more]');
+  if (!link) {
+    return;
+  }
+  event.preventDefault();
+  link.classList.add('disabled');
+  fetch(link.dataset.loadMore || link.href, {
+    headers: {'X-Requested-With': 'XMLHttpRequest'}
+  })
+    .then(function (response) {
+      if (!response.ok) {
+        throw new Error(response.status);
+      }
+      return response.text();
+    })
+    .then(function (html) {
+      link.outerHTML = html;
+      document.querySelectorAll('[data-load-more-hide]').forEach(
+        function (element) {
+          element.hidden = true;
+        }
+      );
+    })
+    .catch(function () {
+      link.classList.remove('disabled');
+    });
+});
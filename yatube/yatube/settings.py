@@ -43,16 +43,32 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'BACKEND': 'core.cache.TwoTierCache',
+        'LOCATION': 'shared',
+        'OPTIONS': {
+            'L1_MAX_ENTRIES': 1000,
+            'L1_TIMEOUT': 5,
+            'GENERATION_CHECK_INTERVAL': 1,
+        },
+    },
+    'shared': {
+        'BACKEND': 'core.cache.LockedFileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache'),
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
     },
 }
 
+TEST_RUNNER = 'core.testing.TestRunner'
+
 INSTALLED_APPS = [
     'sorl.thumbnail',
     'about.apps.AboutConfig',
     'core.apps.CoreConfig',
     'users.apps.UsersConfig',
     'posts.apps.PostsConfig',
+    'api.apps.ApiConfig',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -63,10 +79,18 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.replica.ReplicaStickinessMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'posts.middleware.PageAccessMiddleware',
+    # Попадания в кэш гостевых страниц не занимают места в группах
+    # AdmissionControlMiddleware.
+    'posts.middleware.AnonymousPageCacheMiddleware',
+    'core.middleware.admission.AdmissionControlMiddleware',
+    'core.middleware.profiling.ProfilingMiddleware',
+    'core.middleware.memory.MemoryTrackingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -91,6 +115,27 @@ TEMPLATES = [
     },
 ]
 
+# Необязательный Jinja2 (пакет Jinja2) для лент и страницы поста.
+# Шаблоны, которых нет в jinja2/, по-прежнему рисует DjangoTemplates.
+JINJA2_TEMPLATES = os.environ.get('DJANGO_JINJA2_TEMPLATES') == '1'
+
+JINJA2_ENGINE = {
+    'BACKEND': 'django.template.backends.jinja2.Jinja2',
+    'DIRS': [os.path.join(BASE_DIR, 'jinja2')],
+    'APP_DIRS': False,
+    'OPTIONS': {
+        'environment': 'core.jinja2.environment',
+        'context_processors': [
+            'django.template.context_processors.request',
+            'django.contrib.auth.context_processors.auth',
+            'core.context_processors.year.year',
+        ],
+    },
+}
+
+if JINJA2_TEMPLATES:
+    TEMPLATES.insert(0, JINJA2_ENGINE)
+
 WSGI_APPLICATION = 'yatube.wsgi.application'
 
 
@@ -99,11 +144,47 @@ WSGI_APPLICATION = 'yatube.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'core.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
-    }
+        'CONN_MAX_AGE': 60,
+    },
+    'replica': {
+        'ENGINE': 'core.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'db_replica.sqlite3'),
+        'CONN_MAX_AGE': 60,
+        'TEST': {'MIRROR': 'default'},
+    },
 }
 
+DATABASE_ROUTERS = [
+    'posts.sharding.ShardRouter',
+    'core.routers.PrimaryReplicaRouter',
+]
+
+REPLICA_DATABASE = 'replica'
+REPLICA_APPS = ('posts',)
+REPLICA_STICKY_SECONDS = 15
+REPLICA_STICKY_COOKIE = 'primary_until'
+# Запас на транзакции, зафиксированные чуть позже изменения версии.
+REPLICA_LAG_MARGIN = 1
+
+POST_SHARDS = ()
+# Сколько move_author ждёт записей процессов со старым шардом автора:
+# не меньше L1_TIMEOUT кэша default.
+SHARD_MOVE_SETTLE = 5
+
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -20000,
+    'busy_timeout': 5000,
+}
+SQLITE_WRITE_RETRIES = 5
+SQLITE_RETRY_BACKOFF = 0.05
+# Сумма пауз между повторами записи в потоке запроса, в секундах.
+SQLITE_RETRY_MAX_WAIT = 0.5
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -153,4 +234,145 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
 POSTS_PER_PAGE = 10
+COMMENTS_PER_PAGE = 20
 CACHE_DURATION = 15
+CACHE_STALE_DURATION = 60
+SWR_LOCK_TIMEOUT = 10
+SWR_LOCK_WAIT = 2
+SWR_BACKGROUND_REFRESH = True
+
+ANONYMOUS_PAGE_CACHE_VIEWS = (
+    'posts:trending',
+    'posts:group_directory',
+    'posts:archive',
+    'posts:group_archive',
+    'posts:profile_archive',
+    'posts:group_list',
+    'posts:profile',
+    'posts:post_detail',
+    'posts:index_fragment',
+    'posts:group_fragment',
+    'posts:profile_fragment',
+)
+ANONYMOUS_PAGE_CACHE_TIMEOUT = 300
+
+WARMING_INDEX_PAGES = 3
+WARMING_GROUPS = 10
+WARMING_AUTHORS = 10
+WARMING_RECENT_DAYS = 7
+WARMING_WORKERS = 4
+# Host для прогрева, пока не пришёл ни один настоящий запрос.
+WARMING_HOST = 'localhost'
+WARMING_ON_WRITE = True
+WARMING_FLUSH_INTERVAL = 10
+WARMING_TRACKED_PATHS = 1000
+
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_SLOW_SECONDS = 2
+BREAKER_RESET_TIMEOUT = 10
+BREAKER_STALE_TIMEOUT = 60 * 60 * 24
+
+ADMISSION_GROUPS = {
+    'uploads': {
+        'views': ('posts:post_create', 'posts:post_edit'),
+        'limit': 2,
+        'queue_timeout': 1,
+    },
+    'writes': {
+        'views': (
+            'posts:add_comment',
+            'posts:profile_follow',
+            'posts:profile_unfollow',
+        ),
+        'limit': 4,
+        'queue_timeout': 0.5,
+    },
+    'personal': {
+        'views': ('posts:follow_index', 'posts:follow_fragment'),
+        'limit': 4,
+        'queue_timeout': 0.5,
+    },
+    'longpoll': {
+        'views': ('api:poll',),
+        'limit': 16,
+        'queue_timeout': 0,
+    },
+    'pages': {
+        'views': (
+            'posts:trending',
+            'posts:group_directory',
+            'posts:archive',
+            'posts:group_archive',
+            'posts:profile_archive',
+            'posts:group_list',
+            'posts:profile',
+            'posts:post_detail',
+            'posts:post_comments',
+            'posts:index_fragment',
+            'posts:group_fragment',
+            'posts:profile_fragment',
+            'api:group_posts',
+            'api:profile_posts',
+            'api:follow_posts',
+            'api:post_detail',
+            'api:post_comments',
+        ),
+        'limit': 8,
+        'queue_timeout': 0.5,
+    },
+}
+ADMISSION_RETRY_AFTER = 5
+
+POLL_INTERVAL = 1
+POLL_MAX_WAIT = 25
+POLL_MAX_IDS = 50
+# Кэш отметок новых постов: общий для процессов, мимо L1, с set_max().
+POLL_CACHE = 'shared'
+
+RATELIMIT_ENABLED = True
+# Кэш счётчиков: общий для процессов, с атомарными add() и incr().
+RATELIMIT_CACHE = 'shared'
+# Область: (запросов, за какое скользящее окно в секундах).
+RATELIMITS = {
+    'post': (10, 60 * 60),
+    'comment': (10, 60),
+    'follow': (30, 60),
+}
+
+PROFILING_ROOT = os.path.join(BASE_DIR, 'profiles')
+PROFILING_QUERY_PARAM = 'profile'
+PROFILING_TOP_FUNCTIONS = 30
+PROFILING_MAX_REPORTS = 100
+
+MEMORY_TRACKING = False
+MEMORY_TRACEBACK_FRAMES = 1
+MEMORY_SNAPSHOT_ROOT = os.path.join(BASE_DIR, 'memory_snapshots')
+MEMORY_TOP_SITES = 30
+
+RECOMMENDATIONS_LIMIT = 5
+# Рекомендации считаются только для заходивших за это число дней.
+RECOMMENDATIONS_ACTIVE_DAYS = 30
+# Сколько соседей каждой вершины просматривается при обходе графа.
+RECOMMENDATIONS_FANOUT = 100
+RECOMMENDATIONS_TIMEOUT = 60 * 60 * 24
+
+VIEW_COUNTING = True
+VIEW_FLUSH_MAX_PENDING = 100
+VIEW_FLUSH_INTERVAL = 10
+# Сбрасывать просмотры из фонового потока; иначе только при выходе.
+VIEW_FLUSH_IN_BACKGROUND = True
+# Кэш журнала записанных просмотров: общий для процессов, с incr().
+VIEW_LOG_CACHE = 'shared'
+
+# Окно и период полураспада веса для рейтинга популярного, в секундах.
+TRENDING_WINDOW = 60 * 60 * 48
+TRENDING_HALF_LIFE = 60 * 60 * 6
+TRENDING_COMMENT_WEIGHT = 1
+TRENDING_VIEW_WEIGHT = 0.1
+TRENDING_POSTS = 20
+TRENDING_GROUPS = 10
+
+ARCHIVE_HISTOGRAM_TIMEOUT = 60 * 60 * 24
+
+# Прогревать процесс в wsgi.py; включено в settings_production.
+WARMUP_ON_START = False
@@ -0,0 +1,56 @@
+"""Настройки боевого запуска.
+
+Выбираются окружением: DJANGO_SETTINGS_MODULE=yatube.settings_production.
+Секретный ключ и хосты берутся из DJANGO_SECRET_KEY и
+DJANGO_ALLOWED_HOSTS (через запятую); без них настройки не загрузятся.
+"""
+import os
+
+from yatube.settings import *  # noqa: F401,F403
+from yatube.settings import TEMPLATES
+
+DEBUG = False
+
+SECRET_KEY = os.environ['DJANGO_SECRET_KEY']
+
+ALLOWED_HOSTS = os.environ['DJANGO_ALLOWED_HOSTS'].split(',')
+
+DEBUG_CONTEXT_PROCESSORS = (
+    'django.template.context_processors.debug',
+)
+
+DJANGO_BACKEND = 'django.template.backends.django.DjangoTemplates'
+
+
+def production_engine(engine):
+    """DjangoTemplates с кэширующим загрузчиком: каждый шаблон
+    компилируется один раз за процесс."""
+    if engine['BACKEND'] != DJANGO_BACKEND:
+        return engine
+    options = engine['OPTIONS']
+    return {
+        **engine,
+        'APP_DIRS': False,
+        'OPTIONS': {
+            **options,
+            'debug': False,
+            'context_processors': [
+                processor for processor in options['context_processors']
+                if processor not in DEBUG_CONTEXT_PROCESSORS
+            ],
+            'loaders': [
+                (
+                    'django.template.loaders.cached.Loader',
+                    [
+                        'django.template.loaders.filesystem.Loader',
+                        'django.template.loaders.app_directories.Loader',
+                    ]
+                ),
+            ],
+        },
+    }
+
+
+TEMPLATES = [production_engine(engine) for engine in TEMPLATES]
+
+WARMUP_ON_START = True